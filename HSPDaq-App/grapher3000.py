@@ -2,19 +2,51 @@ import dearpygui.dearpygui as dpg
 import pandas as pd
 import os 
 
+from hspdaq import columnar
+from hspdaq.decimate import decimate
+
+# Plots are at most this wide; each series is reduced to a min/max pair per pixel column
+PLOT_WIDTH_PX = 1920
+
 file_name = input("Enter the file name: ")
 file_path = "data/"+file_name 
-df = pd.read_csv(file_path)
-
-# Time axis 
-if "Timestamp" in df.columns:
-    #
-    df['Timestamp'] = pd.to_datetime(df['Timestamp'], format='%H:%M:%S:%f')
-    # 
-    df['TimeSeconds'] = (df['Timestamp'] - df['Timestamp'].iloc[0]).dt.total_seconds()
+
+# series name -> (seconds from start of recording, values)
+series = {}
+if columnar.is_dataset(file_path):
+    # Parquet dataset: read only the requested time window
+    span = columnar.time_range_ns(file_path)
+    window = input("Time window in seconds from start, e.g. 10-60 (blank for all): ").strip()
+    start_ns = end_ns = None
+    if span and window:
+        lo, hi = (float(part) for part in window.split("-"))
+        start_ns, end_ns = span[0] + int(lo * 1e9), span[0] + int(hi * 1e9)
+    elif window:
+        print("No time statistics in this dataset; plotting all of it.")
+    table = columnar.read_window(file_path, start_ns, end_ns)
+    if span:
+        t0_ns = span[0]
+    else:  # empty, or written without statistics: measure from the first sample read
+        t0_ns = int(table.column(columnar.TIME_COLUMN).to_numpy().min()) if table.num_rows else 0
+    for channel, sub in columnar.iter_channels(table):
+        t = sub.column(columnar.TIME_COLUMN).to_numpy()
+        series[channel] = ((t - t0_ns) / 1e9, sub.column("value").to_numpy())
 else:
-    # 
-    df['TimeSeconds'] = df.index.tolist()
+    df = pd.read_csv(file_path)
+
+    # Time axis 
+    if "Timestamp" in df.columns:
+        #
+        df['Timestamp'] = pd.to_datetime(df['Timestamp'], format='%H:%M:%S:%f')
+        # 
+        df['TimeSeconds'] = (df['Timestamp'] - df['Timestamp'].iloc[0]).dt.total_seconds()
+    else:
+        # 
+        df['TimeSeconds'] = df.index.tolist()
+
+    for col in df.columns:
+        if col not in ['Timestamp', 'TimeSeconds']:
+            series[col] = (df["TimeSeconds"].to_numpy(), pd.to_numeric(df[col], errors="coerce").to_numpy())
 
 # Column label mapping
 column_labels = {
@@ -25,23 +57,22 @@ column_labels = {
     "AIN68": "PT-ETH-01"
 }
 
-columns_to_plot = [col for col in df.columns if col not in ['Timestamp', 'TimeSeconds']]
-
 dpg.create_context()
 dpg.create_viewport(title='All Channels vs Time', width=820, height=800)
 dpg.setup_dearpygui()
 
 with dpg.window(label="All Data Plots", width=1920, height=1080):
-    for col in columns_to_plot:
+    for col, (times, values) in series.items():
         label = column_labels.get(col, col)  
         with dpg.plot(label=f"{label} vs Time", height=250, width=-1):
             # X-axis for TimeSeconds
             dpg.add_plot_axis(dpg.mvXAxis, label="Time (seconds)")
             # Y-axis for the current column
             y_axis = dpg.add_plot_axis(dpg.mvYAxis, label=label)
+            x, y = decimate(times, values, PLOT_WIDTH_PX)
             dpg.add_line_series(
-                df["TimeSeconds"].tolist(),
-                df[col].tolist(),
+                x.tolist(),
+                y.tolist(),
                 label=label,
                 parent=y_axis
             )
@@ -0,0 +1,177 @@
+"""
+Fixed‑rate acquisition thread + single‑producer ring buffer of snapshots.
+
+The Acquirer thread calls read_snapshot() at ACQUISITION_RATE_HZ and appends
+each snapshot to a SnapshotRing. Consumers never block the producer: each one
+owns a RingReader cursor and pulls whatever arrived since its last call.
+
+  * the GUI loop reads at its own refresh rate and only draws the latest value;
+  * RecorderPump drains its own cursor on a background thread so every sample
+    reaches the CSV, however long a GUI frame takes.
+
+No locks: the producer fills a slot *before* publishing it by bumping `head`,
+and an int store is atomic under the GIL. A reader that falls more than
+`capacity` samples behind skips forward and counts the lost samples.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from typing import Callable
+
+from hspdaq.recorder import ParquetRecorder, Recorder
+
+
+# --------------------------------------------------------------------------- #
+# Ring buffer
+# --------------------------------------------------------------------------- #
+class SnapshotRing:
+    """Fixed‑size ring of snapshot dicts written by exactly one thread."""
+
+    def __init__(self, capacity: int) -> None:
+        if capacity <= 0:
+            raise ValueError(f"Ring capacity must be positive, got {capacity}")
+        self.capacity = capacity
+        self._slots: list[dict | None] = [None] * capacity
+        self.head = 0  # total samples ever published
+
+    def publish(self, snapshot: dict) -> None:
+        self._slots[self.head % self.capacity] = snapshot
+        self.head += 1
+
+    def latest(self) -> dict | None:
+        head = self.head
+        return self._slots[(head - 1) % self.capacity] if head else None
+
+    def reader(self, from_start: bool = False) -> "RingReader":
+        """New cursor; by default it only sees samples published from now on."""
+        return RingReader(self, 0 if from_start else self.head)
+
+
+class RingReader:
+    """One consumer's position in a SnapshotRing."""
+
+    def __init__(self, ring: SnapshotRing, position: int) -> None:
+        self._ring = ring
+        self.position = position
+        self.dropped = 0  # samples overwritten before this reader got to them
+
+    def read_new(self, max_items: int | None = None) -> list[dict]:
+        """Every snapshot published since the last call (oldest first)."""
+        ring = self._ring
+        head = ring.head
+        if head - self.position > ring.capacity:
+            self.dropped += head - self.position - ring.capacity
+            self.position = head - ring.capacity
+        end = head if max_items is None else min(head, self.position + max_items)
+        slots, capacity = ring._slots, ring.capacity
+        items = [slots[i % capacity] for i in range(self.position, end)]
+        # The producer may have lapped us while copying; anything it overwrote is gone.
+        overrun = ring.head - capacity - self.position
+        if overrun > 0:
+            items = items[overrun:]
+            self.dropped += overrun
+        self.position = end
+        return items
+
+
+# --------------------------------------------------------------------------- #
+# Producer
+# --------------------------------------------------------------------------- #
+class Acquirer:
+    """
+    Calls `read_fn()` every 1/rate_hz seconds on a daemon thread and publishes the
+    result. Deadlines are absolute, so jitter in one read doesn't shift the rest;
+    if a read overruns by more than a period the missed ticks are skipped (and
+    counted) instead of bursting to catch up.
+
+    If read_fn raises, the thread stops and the exception is kept in `error` for
+    the GUI loop to re‑raise, as the old single loop would have.
+    """
+
+    def __init__(self, read_fn: Callable[[], dict], ring: SnapshotRing, rate_hz: float) -> None:
+        if rate_hz <= 0:
+            raise ValueError(f"Acquisition rate must be positive, got {rate_hz}")
+        self.read_fn = read_fn
+        self.ring = ring
+        self.period_s = 1.0 / rate_hz
+        self.error: BaseException | None = None
+        self.missed_ticks = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="HSPDAQ-acquire", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self, timeout: float = 2.0) -> None:
+        self._stop.set()
+        self._thread.join(timeout)
+
+    @property
+    def running(self) -> bool:
+        return self._thread.is_alive()
+
+    def _run(self) -> None:
+        next_deadline = time.perf_counter()
+        while not self._stop.is_set():
+            try:
+                self.ring.publish(self.read_fn())
+            except BaseException as exc:  # surfaced to the GUI loop via .error
+                self.error = exc
+                return
+            next_deadline += self.period_s
+            delay = next_deadline - time.perf_counter()
+            if delay > 0:
+                self._stop.wait(delay)
+            elif delay < -self.period_s:
+                skipped = int(-delay / self.period_s)
+                self.missed_ticks += skipped
+                next_deadline += skipped * self.period_s
+
+
+# --------------------------------------------------------------------------- #
+# Recorder consumer
+# --------------------------------------------------------------------------- #
+class RecorderPump:
+    """
+    Background consumer that writes every sample from the ring to a Recorder
+    while `recording` is set. Rows are built by `row_fn(snapshot)`.
+    """
+
+    def __init__(
+        self,
+        ring: SnapshotRing,
+        recorder: Recorder | ParquetRecorder,
+        row_fn: Callable[[dict], list],
+        interval_s: float,
+    ) -> None:
+        self.reader = ring.reader()
+        self.recorder = recorder
+        self.row_fn = row_fn
+        self.interval_s = interval_s
+        self.recording = threading.Event()
+        self.recording.set()
+        self.rows_written = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="HSPDAQ-record", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self, timeout: float = 2.0) -> None:
+        """Drain what is left in the ring, then stop. The Recorder is left open."""
+        self._stop.set()
+        self._thread.join(timeout)
+
+    def _drain(self) -> None:
+        snapshots = self.reader.read_new()
+        if not self.recording.is_set():
+            return
+        for snap in snapshots:
+            self.recorder.append(self.row_fn(snap))
+        self.rows_written += len(snapshots)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_s):
+            self._drain()
+        self._drain()
@@ -8,21 +8,33 @@ lives in the sub‑modules; this file just orchestrates them.
 from __future__ import annotations
 
 import pathlib
+import time
 from datetime import datetime
 
-import numpy as np
 import PySimpleGUI as sg
 
+from hspdaq.acquisition import Acquirer, RecorderPump, SnapshotRing
 from hspdaq.constants import (
+    ACQUISITION_RATE_HZ,
     AIN_CHANNELS,
     COLORS,
+    ETA_PREDICT_HZ,
+    ETA_RUN_PRESSURE_PSI,
+    GUI_REFRESH_HZ,
+    HISTORY_CAPACITY,
     OFFSET_X,
     OFFSET_Y,
+    PLOT_WINDOW_S,
+    RECORD_FORMAT,
+    RECORDER_DRAIN_S,
+    RING_CAPACITY,
     STARTING_SIZE,
 )
 from hspdaq.hardware import open_device, close_device, read_snapshot
-from hspdaq.model import predict_remaining_time
-from hspdaq.recorder import Recorder
+from hspdaq.eta import DISPLAY_METHODS, EtaEngine, FillSample
+from hspdaq.model import start_background_load
+from hspdaq.recorder import ParquetRecorder, Recorder
+from hspdaq.timeseries import TimeSeriesStore
 from hspdaq.gui import (
     build_file_prompt,
     build_main_window,
@@ -34,10 +46,14 @@ from hspdaq.gui import (
 )
 
 
+# Snapshot key behind each entry of the sensors list built by _init_sensors.
+SENSOR_KEYS = [f"AIN{i+1}" for i in range(6)] + ["total_weight"] + [f"TC_{i}" for i in range(1, 4)]
+
+
 # --------------------------------------------------------------------------- #
 # helper to build sensors list & draw static axes once
 # --------------------------------------------------------------------------- #
-def _init_sensors(window: sg.Window) -> list[Sensor]:
+def _init_sensors(window: sg.Window, store: TimeSeriesStore) -> list[Sensor]:
     sensors = [
         Sensor(window["PT-ETH-01"], "PT-ETH-01", "psi", COLORS[0][1]),
         Sensor(window["PT-ETH-02"], "PT-ETH-02", "psi", COLORS[1][1]),
@@ -63,13 +79,34 @@ def _init_sensors(window: sg.Window) -> list[Sensor]:
     sensors[8].draw_axes(-500, 95, -20, 100, 10)
     sensors[9].draw_axes(-500, 95, -20, 100, 10)
 
+    for s, key in zip(sensors, SENSOR_KEYS):
+        s.series = store[key]
     return sensors
 
 
+def _csv_row(snap: dict) -> list:
+    """One CSV row (matching the recorder header) from a snapshot."""
+    return [
+        snap["timestamp"],
+        *(snap[f"AIN{i+1}"] for i in range(6)),
+        snap["total_weight"],
+        snap["TC_1"],
+        snap["TC_2"],
+        snap["TC_3"],
+    ]
+
+
+def _parquet_row(snap: dict) -> list:
+    """Same values as _csv_row, keyed by the Unix time of the read."""
+    return [snap["time_s"], *_csv_row(snap)[1:]]
+
+
 # --------------------------------------------------------------------------- #
 # main function
 # --------------------------------------------------------------------------- #
 def main() -> None:
+    start_background_load()  # saved ETA model loads while the operator names the file
+
     # 1) ask for CSV file name -------------------------------------------------
     prompt = build_file_prompt()
     event, values = prompt.read()
@@ -81,116 +118,110 @@ def main() -> None:
 
     # 2) build main window & sensors ------------------------------------------
     window = build_main_window()
-    sensors = _init_sensors(window)
+    store = TimeSeriesStore(SENSOR_KEYS, HISTORY_CAPACITY)  # live history per sensor
+    sensors = _init_sensors(window, store)
 
     # 3) open LabJack + CSV recorder ------------------------------------------
     handle = open_device()
     header = ["Timestamp"] + AIN_CHANNELS + ["Total_Weight"] + [f"TC_{i}" for i in range(1, 4)]
     data_dir = pathlib.Path.cwd() / "data"
     data_dir.mkdir(exist_ok=True)
-    recorder = Recorder(data_dir / f"{csv_name}.csv", header)
+    if RECORD_FORMAT == "parquet":
+        recorder, row_fn = ParquetRecorder(data_dir / f"{csv_name}.parquet", header), _parquet_row
+    else:
+        recorder, row_fn = Recorder(data_dir / f"{csv_name}.csv", header), _csv_row
+
+    # 4) acquisition thread -> ring buffer -> {recorder thread, this GUI loop}
+    ring = SnapshotRing(RING_CAPACITY)
+    acquirer = Acquirer(lambda: read_snapshot(handle), ring, ACQUISITION_RATE_HZ)
+    pump = RecorderPump(ring, recorder, row_fn, RECORDER_DRAIN_S)
+    pump.start()
+    acquirer.start()
 
     # variables mirroring original script -------------------------------------
-    x_coord = -500
-    write_csv = True
     first_tare_done = False
     load_tare = 0.0
-    mass_samples: list[float] = []
-    time_samples: list[float] = []
-    poly_coeff_ref = np.array([1.72501276, -24.80675432, 95.42369204])
+    gui_reader = ring.reader()
+    fill_t0 = 0.0
+    # Method1..4 estimators, fed one sample per frame while filling (hspdaq.eta)
+    eta_engine = EtaEngine.from_names(DISPLAY_METHODS.values(), forest_rate_hz=ETA_PREDICT_HZ)
+
+    frame_s = 1.0 / GUI_REFRESH_HZ
+    next_frame = time.perf_counter()
 
     try:
         while True:
             # ---------------------------------------------------------------- #
-            # handle PySimpleGUI events first
+            # handle PySimpleGUI events first; the timeout paces redraws
             # ---------------------------------------------------------------- #
-            event, values = window.read(timeout=0)
+            timeout_ms = max(0, int((next_frame - time.perf_counter()) * 1000))
+            event, values = window.read(timeout=timeout_ms)
             if event == sg.WIN_CLOSED:
                 break
             if event == "START_WRITING":
-                write_csv = True
+                pump.recording.set()
             if event == "STOP_WRITING":
-                write_csv = False
+                pump.recording.clear()
             if values.get("TABLE"):
                 handle_table_click(values, window, sensors)
-            if event:
-                # data_line not yet known here; tare after reading snapshot
-                pending_tare_event = event
-            else:
-                pending_tare_event = None
+
+            if acquirer.error is not None:
+                raise acquirer.error
+
+            # tare if requested (against the newest snapshot) ----------------
+            if event and ring.head:
+                handle_tare(event, sensors, list(ring.latest().values()))
 
             # ---------------------------------------------------------------- #
-            # read one snapshot from hardware
+            # redraw at GUI_REFRESH_HZ from the time‑series store
             # ---------------------------------------------------------------- #
-            snap = read_snapshot(handle)
+            now = time.perf_counter()
+            if now < next_frame:
+                continue
+            next_frame += frame_s
+            if next_frame < now:  # fell behind (e.g. window drag); don't burst
+                next_frame = now + frame_s
+            new_snaps = gui_reader.read_new()
+            if not new_snaps:  # nothing new since the last redraw
+                continue
+            store.extend([snap["time_s"] for snap in new_snaps], new_snaps)
+            latest = {key: store[key].last_value for key in SENSOR_KEYS}
 
             # update sensors ---------------------------------------------------
-            for idx, s in enumerate(sensors):
-                # first six sensors correspond to scaled AIN values
-                if idx < 6:
-                    s.assign(snap[f"AIN{idx+1}"])
-                elif idx == 6:
-                    s.assign(snap["total_weight"])
-                else:  # thermocouples
-                    s.assign(snap[f"TC_{idx-6}"])
-
-            # tare if requested -----------------------------------------------
-            if pending_tare_event:
-                handle_tare(pending_tare_event, sensors, list(snap.values()))
+            for s, key in zip(sensors, SENSOR_KEYS):
+                s.assign(latest[key])
 
             # update table -----------------------------------------------------
             window["TABLE"].update(values=[s.get_display() for s in sensors], row_colors=COLORS)
 
-            # plot points ------------------------------------------------------
+            # redraw traces (fixed canvas items, decimated to pixel columns) --
+            t_end = store[SENSOR_KEYS[0]].last()[0]
             for s in sensors:
                 if s.visible:
-                    s.plot_point(x_coord)
+                    s.render(t_end, PLOT_WINDOW_S)
 
             # ---------------------------------------------------------------- #
-            # ETA prediction logic (same as original)
+            # ETA prediction (Method1..4, see hspdaq.eta)
             # ---------------------------------------------------------------- #
-            if snap["AIN4"] > 400.0:  # run_pressure threshold
+            if latest["AIN4"] > ETA_RUN_PRESSURE_PSI:  # run_pressure threshold
+                t_now = store["total_weight"].last()[0]
                 if not first_tare_done:
-                    load_tare = abs(snap["total_weight"])
+                    load_tare = abs(latest["total_weight"])
+                    fill_t0 = t_now
                     first_tare_done = True
 
-                feature_dict = {
-                    "supply_pressure": snap["AIN3"],
-                    "supply_temperature": snap["TC_1"],
-                    "run_pressure": snap["AIN4"],
-                    "run_temperature": snap["TC_2"],
-                    "current_mass": abs(snap["total_weight"]) - load_tare,
-                }
-                eta = predict_remaining_time(feature_dict)
-                window["Method2"].update(round(eta, 2))
-
-                # polynomial fit replicating legacy code ----------------------
-                current_mass = abs(snap["total_weight"]) - load_tare
-                if current_mass >= 5:
-                    now = datetime.now()
-                    elapsed = now.timestamp()
-                    mass_samples.append(current_mass)
-                    time_samples.append(elapsed)
-
-                    if len(mass_samples) >= 3 and len(set(time_samples)) > 1:
-                        coeff_live = np.polyfit(mass_samples, time_samples, 2)
-                        window["Method1"].update(round(np.polyval(coeff_live, 17) - time_samples[-1]))
-                        window["Method3"].update(round(np.polyval(poly_coeff_ref, 17) - time_samples[-1]))
-                        window["Method4"].update(round(np.polyval(poly_coeff_ref, 17) - time_samples[-1]))
-
-            # ---------------------------------------------------------------- #
-            # write CSV buffer
-            # ---------------------------------------------------------------- #
-            if write_csv:
-                row = [
-                    snap["timestamp"],
-                    *(snap[f"AIN{i+1}"] for i in range(6)),
-                    snap["total_weight"],
-                    snap["TC_1"],
-                    snap["TC_2"],
-                    snap["TC_3"],
-                ]
-                recorder.append(row)
+                eta_engine.update(FillSample(
+                    t_now - fill_t0,
+                    latest["AIN3"],                                 # supply_pressure
+                    latest["TC_1"],                                 # supply_temperature
+                    latest["AIN4"],                                 # run_pressure
+                    latest["TC_2"],                                 # run_temperature
+                    abs(latest["total_weight"]) - load_tare,        # tared mass
+                ))
+                etas = eta_engine.predictions()
+                for key, name in DISPLAY_METHODS.items():
+                    if etas[name] is not None:  # None until that estimator has enough data
+                        window[key].update(round(etas[name], 2) if name == "forest" else round(etas[name]))
 
             # ---------------------------------------------------------------- #
             # PID overlay absolute placement (unchanged numbers)
@@ -216,15 +247,10 @@ def main() -> None:
             update_pid(window, "PID_TC02", sensors[8].data, " F")
             update_pid(window, "PID_TC03", sensors[9].data, " F")
 
-            # scroll graphs every 500 points ----------------------------------
-            x_coord += 1
-            if x_coord == 500:
-                x_coord = -250
-                for s in sensors:
-                    s.draw_axes(-250, 1520 if s.unit == "psi" else 95, -20, 1600, 250, -750)
-
     finally:
-        # graceful shutdown
+        # graceful shutdown: stop reading, let the recorder drain, then close
+        acquirer.stop()
+        pump.stop()
         recorder.close()
         close_device(handle)
         window.close()
@@ -0,0 +1,413 @@
+"""
+Microbenchmarks for the HSPDAQ acquisition loop, runnable without a LabJack:
+
+    python -m hspdaq.benchmarks snapshot [--seconds S] [--round-trip-ms MS] [--per-value-us US]
+    python -m hspdaq.benchmarks decimate [--minutes M] [--rate-hz HZ] [--width-px PX]
+    python -m hspdaq.benchmarks eta [--seconds S] [--check-rows N]
+    python -m hspdaq.benchmarks etafit [--csv FILL.csv] [--target-mass LB]
+    python -m hspdaq.benchmarks thermocouple [--samples N] [--seconds S]
+
+`snapshot` swaps ``hspdaq.hardware.ljm`` for a latency-model stand-in (every
+LJM call costs one command/response round trip plus a small per-value cost)
+and reports snapshots/sec for the per-channel eReadName path read_snapshot
+used to take versus the current single eReadAddresses call.
+
+`decimate` builds a synthetic capture (noise plus a few one-sample spikes),
+times each reducer in hspdaq.decimate and an off-screen matplotlib render of
+its output, and checks the spikes are still in the plotted points.
+
+`eta` loads the saved ETA model (training it first if needed) and times one
+Method2 prediction three ways: the old one-row DataFrame + sklearn predict,
+a NumPy row + sklearn predict, and the flattened forest (hspdaq.forest). It
+also checks the flat forest agrees with sklearn on rows of the training CSV
+and reports bytes allocated per flat prediction.
+
+`etafit` replays a recorded fill (time, current_mass columns; default the
+model's trainingData.csv) through the Method1/Method3 quadratic fits the way
+the live loop does, once with np.polyfit over the growing history and once
+with hspdaq.streamfit, and reports the largest ETA difference and the time
+each took.
+
+`thermocouple` checks hspdaq.thermocouple against NIST table values, round
+trips each inverse range through the forward function (against NIST's stated
+inverse errors), compares the lookup table with the polynomials, and times
+a block of voltages and a 3-channel snapshot through the old 41 µV/°C
+per-value conversion, the polynomials and the table. Exits non-zero if any
+accuracy check fails.
+"""
+from __future__ import annotations
+
+import argparse
+import copy
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+from hspdaq import hardware
+from hspdaq.decimate import decimate
+from hspdaq.eta import REFERENCE_COEFF
+from hspdaq.constants import AIN_CHANNELS, DIFF_PAIRS, TC_PAIRS
+from hspdaq.streamfit import StreamingQuadraticFit
+from hspdaq.scaling import apply_scaling, apply_differential_scaling
+from hspdaq import thermocouple as tc
+from hspdaq.thermocouple import thermocouple_voltage_to_temperature
+
+
+# --------------------------------------------------------------------------- #
+# LJM stand-in
+# --------------------------------------------------------------------------- #
+class LatencyModelLjm:
+    """
+    Just enough of ``labjack.ljm`` for open_device/read_snapshot/close_device.
+    Each call blocks for round_trip_s + n_values * per_value_s, roughly how a
+    T7 over USB behaves (one command/response per call, small per-register cost).
+    """
+
+    def __init__(self, round_trip_s: float = 0.001, per_value_s: float = 10e-6):
+        self.round_trip_s = round_trip_s
+        self.per_value_s = per_value_s
+        self.calls = 0
+
+    def _io(self, n_values: int) -> None:
+        self.calls += 1
+        deadline = time.perf_counter() + self.round_trip_s + n_values * self.per_value_s
+        while time.perf_counter() < deadline:  # spin: sleep() is too coarse at these latencies
+            pass
+
+    @staticmethod
+    def _value(name: str) -> float:
+        return 298.15 if name == hardware.CJ_TEMP_REGISTER else 0.75
+
+    def openS(self, device_type: str, connection_type: str, identifier: str) -> int:
+        return 1
+
+    def close(self, handle: int) -> None:
+        pass
+
+    def eWriteName(self, handle: int, name: str, value: float) -> None:
+        self._io(1)
+
+    def namesToAddresses(self, num_frames: int, names: list[str]) -> tuple[list[int], list[int]]:
+        # Local lookup in LJM's constants file; no device traffic.
+        self._names = list(names[:num_frames])
+        return list(range(num_frames)), [3] * num_frames
+
+    def eReadName(self, handle: int, name: str) -> float:
+        self._io(1)
+        return self._value(name)
+
+    def eReadAddresses(self, handle: int, num_frames: int, addresses: list[int], data_types: list[int]) -> list[float]:
+        self._io(num_frames)
+        return [self._value(self._names[a]) for a in addresses[:num_frames]]
+
+
+def _read_snapshot_per_channel(ljm, handle: int) -> dict[str, float]:
+    """read_snapshot as it was before batching: one eReadName per channel."""
+    ain_voltages = [ljm.eReadName(handle, ch) for ch in AIN_CHANNELS]
+    scaled_ain = [apply_scaling(v, ch) for v, ch in zip(ain_voltages, AIN_CHANNELS)]
+    total_weight = sum(apply_differential_scaling(ljm.eReadName(handle, p[0])) for p in DIFF_PAIRS)
+    cj_temp_c = ljm.eReadName(handle, "TEMPERATURE_DEVICE_K") - 273.15
+    tc_temps_f = [thermocouple_voltage_to_temperature(ljm.eReadName(handle, p[0]), cj_temp_c) for p in TC_PAIRS]
+    return {
+        **{f"AIN{i+1}": val for i, val in enumerate(scaled_ain)},
+        "total_weight": total_weight,
+        **{f"TC_{i+1}": temp for i, temp in enumerate(tc_temps_f)},
+    }
+
+
+def _rate(fn, seconds: float) -> tuple[float, int]:
+    """Calls fn repeatedly for ~seconds; returns (calls/sec, calls)."""
+    n = 0
+    t0 = time.perf_counter()
+    while time.perf_counter() - t0 < seconds:
+        fn()
+        n += 1
+    return n / (time.perf_counter() - t0), n
+
+
+def bench_snapshot(seconds: float, round_trip_ms: float, per_value_us: float) -> None:
+    mock = LatencyModelLjm(round_trip_ms / 1000.0, per_value_us / 1e6)
+    real_ljm = hardware.ljm
+    hardware.ljm = mock
+    try:
+        handle = hardware.open_device()
+        mock.calls = 0
+        legacy_rate, legacy_n = _rate(lambda: _read_snapshot_per_channel(mock, handle), seconds)
+        legacy_calls = mock.calls / legacy_n
+        mock.calls = 0
+        batched_rate, batched_n = _rate(lambda: hardware.read_snapshot(handle), seconds)
+        batched_calls = mock.calls / batched_n
+        hardware.close_device(handle)
+    finally:
+        hardware.ljm = real_ljm
+
+    n_names = len(hardware.SNAPSHOT_NAMES)
+    print(f"snapshot ({n_names} registers, model: {round_trip_ms:g} ms/round trip + {per_value_us:g} us/value)")
+    print(f"  per-channel eReadName:  {legacy_rate:8.1f} snapshots/s ({legacy_calls:.0f} LJM calls each)")
+    print(f"  batched eReadAddresses: {batched_rate:8.1f} snapshots/s ({batched_calls:.0f} LJM call each)")
+    print(f"  speedup: {batched_rate / legacy_rate:.1f}x")
+
+
+# --------------------------------------------------------------------------- #
+# Plot decimation
+# --------------------------------------------------------------------------- #
+def _render_s(x: np.ndarray, y: np.ndarray, width_px: int) -> float:
+    """Seconds for matplotlib (Agg) to draw one line of (x, y) into a width_px-wide PNG buffer."""
+    import io
+
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    t0 = time.perf_counter()
+    fig = plt.figure(figsize=(width_px / 100, 3), dpi=100)
+    plt.plot(x, y, linewidth=1)
+    fig.savefig(io.BytesIO(), format="png")
+    plt.close(fig)
+    return time.perf_counter() - t0
+
+
+def bench_decimate(minutes: float, rate_hz: float, width_px: int, render_full: bool) -> None:
+    n = int(minutes * 60 * rate_hz)
+    rng = np.random.default_rng(0)
+    x = np.arange(n) / rate_hz
+    y = rng.normal(0.0, 1.0, n)
+    spikes = rng.choice(n, 5, replace=False)
+    y[spikes] = 50.0 * np.sign(rng.normal(size=5))
+    print(f"decimate ({n:,} samples = {minutes:g} min @ {rate_hz:g} Hz -> {width_px} px)")
+
+    if render_full:
+        print(f"  {'none':7s} render {_render_s(x, y, width_px):7.3f} s")
+    for method in ("minmax", "lttb"):
+        t0 = time.perf_counter()
+        xs, ys = decimate(x, y, width_px, method)
+        reduce_s = time.perf_counter() - t0
+        render_s = _render_s(xs, ys, width_px)
+        kept = np.isin(x[spikes], xs).sum()
+        print(
+            f"  {method:7s} {len(xs):6d} pts  reduce {reduce_s:7.3f} s  render {render_s:7.3f} s"
+            f"  spikes kept {kept}/{len(spikes)}"
+        )
+
+
+# --------------------------------------------------------------------------- #
+# ETA inference
+# --------------------------------------------------------------------------- #
+def bench_eta(seconds: float, check_rows: int) -> None:
+    import tracemalloc
+
+    import pandas as pd
+
+    from hspdaq import model as eta
+    from hspdaq.forest import FlatForest
+
+    forest = eta.load_model()
+    t0 = time.perf_counter()
+    flat = FlatForest.from_sklearn(forest)
+    compile_s = time.perf_counter() - t0
+
+    data = pd.read_csv(eta.DATA_PATH)
+    X = data[eta.FEATURE_COLUMNS].to_numpy(dtype=np.float64)
+    X = X[np.random.default_rng(0).choice(len(X), min(check_rows, len(X)), replace=False)]
+    diff = np.abs(flat.predict(X) - forest.predict(X))
+    row_diff = max(abs(flat.predict_row(x) - r) for x, r in zip(X[:200], forest.predict(X[:200])))
+
+    row = X[0].copy()
+    feature_dict = dict(zip(eta.FEATURE_COLUMNS, row))
+    named = copy.copy(forest)  # as the model used to be fitted: on a DataFrame, with feature names
+    named.feature_names_in_ = np.array(eta.FEATURE_COLUMNS, dtype=object)
+    variants = [
+        ("DataFrame + sklearn", lambda: named.predict(pd.DataFrame([feature_dict], columns=eta.FEATURE_COLUMNS))),
+        ("ndarray + sklearn", lambda: forest.predict(row.reshape(1, -1))),
+        ("flat forest", lambda: flat.predict_row(row)),
+    ]
+    print(f"eta ({flat.n_trees} trees, {len(flat.value):,} nodes, depth {flat.max_depth}; compile {compile_s * 1e3:.0f} ms)")
+    rates = []
+    for label, fn in variants:
+        fn()  # warm up
+        rate, _ = _rate(fn, seconds)
+        rates.append(rate)
+        print(f"  {label:20s} {1e6 / rate:9.1f} us/prediction")
+    print(f"  flat vs DataFrame path: {rates[2] / rates[0]:.0f}x")
+
+    tracemalloc.start()
+    flat.predict_row(row)
+    before = tracemalloc.take_snapshot()
+    for _ in range(1000):
+        flat.predict_row(row)
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    grown = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    print(f"  flat forest net allocation over 1000 predictions: {grown} bytes")
+    print(f"  max |flat - sklearn| over {len(X)} rows: {diff.max():.2e} s (batch), {row_diff:.2e} s (predict_row)")
+
+
+# --------------------------------------------------------------------------- #
+# Live fill-time fit
+# --------------------------------------------------------------------------- #
+FILL_CSV = Path(__file__).resolve().parents[1] / "data" / "trainingData.csv"
+
+
+def bench_etafit(csv_path: Path, target_mass: float, min_mass: float = 5.0) -> None:
+    import pandas as pd
+
+    fill = pd.read_csv(csv_path, usecols=["time", "current_mass"])
+    fill = fill[fill["current_mass"] >= min_mass]  # the live loop only fits once 5 lb are in
+    t = fill["time"].to_numpy(dtype=np.float64)
+    m = fill["current_mass"].to_numpy(dtype=np.float64)
+    ref_m = np.arange(0, 200, dtype=np.float64)
+    ref_t = np.polyval(REFERENCE_COEFF, ref_m)
+
+    # as before: rebuild arrays and refit everything on every sample
+    t0 = time.perf_counter()
+    legacy = np.full((len(t), 2), np.nan)
+    for i in range(2, len(t)):
+        live = np.polyfit(m[: i + 1], t[: i + 1], 2)
+        seeded = np.polyfit(np.r_[ref_m, m[: i + 1]], np.r_[ref_t, t[: i + 1]], 2)
+        legacy[i] = np.polyval(live, target_mass) - t[i], np.polyval(seeded, target_mass) - t[i]
+    legacy_s = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    streamed = np.full((len(t), 2), np.nan)
+    live_fit, seeded_fit = StreamingQuadraticFit(), StreamingQuadraticFit()
+    seeded_fit.extend(ref_m, ref_t)
+    for i in range(len(t)):
+        live_fit.update(m[i], t[i])
+        seeded_fit.update(m[i], t[i])
+        fill_time = live_fit.predict(target_mass)
+        if fill_time is not None:
+            streamed[i] = fill_time - t[i], seeded_fit.predict(target_mass) - t[i]
+    streamed_s = time.perf_counter() - t0
+
+    both = ~np.isnan(legacy[:, 0]) & ~np.isnan(streamed[:, 0])
+    err = np.abs(legacy[both] - streamed[both]).max(axis=0)
+    print(f"etafit ({csv_path.name}: {len(t)} samples >= {min_mass:g} lb, ETA to {target_mass:g} lb)")
+    print(f"  np.polyfit per sample: {legacy_s:7.3f} s ({legacy_s / len(t) * 1e6:8.1f} us/sample avg)")
+    print(f"  streaming fit:         {streamed_s:7.3f} s ({streamed_s / len(t) * 1e6:8.1f} us/sample)")
+    print(f"  max |ETA difference|: Method1 {err[0]:.2e} s, Method3 {err[1]:.2e} s over {both.sum()} samples")
+
+
+# --------------------------------------------------------------------------- #
+# Thermocouple conversion
+# --------------------------------------------------------------------------- #
+# (type, °C, mV) from the NIST ITS-90 reference tables
+NIST_POINTS = [
+    ("K", -200.0, -5.891), ("K", -100.0, -3.554), ("K", 0.0, 0.000), ("K", 100.0, 4.096),
+    ("K", 500.0, 20.644), ("K", 1000.0, 41.276), ("K", 1372.0, 54.886),
+    ("J", -210.0, -8.095), ("J", -100.0, -4.633), ("J", 0.0, 0.000), ("J", 100.0, 5.269),
+    ("J", 500.0, 27.393), ("J", 760.0, 42.919), ("J", 1000.0, 57.953), ("J", 1200.0, 69.553),
+]
+# (type, °C range, stated inverse error band in °C) for each inverse polynomial
+INVERSE_BANDS = [
+    ("K", (-200.0, 0.0), (-0.02, 0.04)), ("K", (0.0, 500.0), (-0.05, 0.04)),
+    ("K", (500.0, 1372.0), (-0.05, 0.06)),
+    ("J", (-210.0, 0.0), (-0.05, 0.03)), ("J", (0.0, 760.0), (-0.04, 0.04)),
+    ("J", (760.0, 1200.0), (-0.04, 0.03)),
+]
+
+
+def _legacy_tc_f(voltages, cj_temp_c: float) -> list[float]:
+    """The conversion read_snapshot used to do: 41 µV/°C linear, one value at a time."""
+    return [(cj_temp_c + v / 0.000041) * 9 / 5 + 32 for v in voltages]
+
+
+def _check(label: str, ok: bool, detail: str) -> bool:
+    print(f"  {'PASS' if ok else 'FAIL'}  {label:<34} {detail}")
+    return ok
+
+
+def bench_thermocouple(samples: int, seconds: float) -> bool:
+    ok = True
+    print("thermocouple accuracy")
+    for tc_type in tc.TYPES:
+        pts = [(t, mv) for typ, t, mv in NIST_POINTS if typ == tc_type]
+        temps, mvs = np.array(pts).T
+        fwd = np.abs(tc.emf_mv(temps, tc_type) - mvs).max()
+        ok &= _check(f"Type {tc_type} forward vs NIST table", fwd <= 0.0005, f"max {fwd * 1000:.2f} uV")
+        inv = np.abs(tc.temperature_from_emf(mvs, tc_type) - temps).max()
+        ok &= _check(f"Type {tc_type} inverse vs NIST table", inv <= 0.1, f"max {inv:.3f} C")
+    for tc_type, (lo, hi), (err_lo, err_hi) in INVERSE_BANDS:
+        temps = np.linspace(lo, hi, 20001)
+        err = tc.temperature_from_emf(tc.emf_mv(temps, tc_type), tc_type) - temps
+        within = err.min() >= err_lo - 0.01 and err.max() <= err_hi + 0.01  # + the forward function's own ~0.5 uV
+        ok &= _check(f"Type {tc_type} round trip {lo:g}..{hi:g} C", within,
+                     f"{err.min():+.3f}..{err.max():+.3f} C (stated {err_lo:+.2f}..{err_hi:+.2f})")
+    for tc_type in tc.TYPES:
+        table = tc.lookup_table(tc_type)
+        mv = np.linspace(table.lo_mv, table.hi_mv, 1_000_003)
+        diff = np.abs(table(mv) - tc.temperature_from_emf(mv, tc_type))
+        ok &= _check(f"Type {tc_type} table vs polynomials", np.percentile(diff, 99.9) < 1e-3 and diff.max() < 0.1,
+                     f"99.9% {np.percentile(diff, 99.9):.1e} C, max {diff.max():.3f} C (range seams)")
+    cj = 22.5
+    v = np.array([0.0012, 0.0025, -0.0004])
+    scalar = [thermocouple_voltage_to_temperature(x, cj) for x in v]
+    block = thermocouple_voltage_to_temperature(v, cj)
+    ok &= _check("scalar and array calls agree", np.allclose(scalar, block, rtol=0, atol=1e-12), "")
+
+    rng = np.random.default_rng(0)
+    volts = rng.uniform(-0.002, 0.010, samples)  # roughly -60..250 °C Type K at a 22.5 °C cold junction
+    print(f"thermocouple throughput ({samples:,} voltages, cold junction {cj} C)")
+    block_variants = [
+        ("old linear, per value", lambda: _legacy_tc_f(volts, cj)),
+        ("NIST polynomials, array", lambda: thermocouple_voltage_to_temperature(volts, cj)),
+        ("lookup table, array", lambda: thermocouple_voltage_to_temperature(volts, cj, use_table=True)),
+    ]
+    for label, fn in block_variants:
+        t0 = time.perf_counter()
+        fn()
+        dt = time.perf_counter() - t0
+        print(f"  {label:<26} {dt * 1e3:8.1f} ms  ({samples / dt / 1e6:6.1f} M values/s)")
+    snap = volts[:len(TC_PAIRS)].tolist()
+    snap_variants = [
+        ("old linear, per value", lambda: _legacy_tc_f(snap, cj)),
+        ("NIST polynomials, array", lambda: thermocouple_voltage_to_temperature(np.asarray(snap), cj).tolist()),
+        ("lookup table, array", lambda: thermocouple_voltage_to_temperature(np.asarray(snap), cj, use_table=True).tolist()),
+    ]
+    print(f"  per snapshot ({len(snap)} thermocouples):")
+    for label, fn in snap_variants:
+        rate, _ = _rate(fn, seconds)
+        print(f"  {label:<26} {1e6 / rate:8.1f} us")
+    print("all accuracy checks passed" if ok else "ACCURACY CHECK FAILED")
+    return ok
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="HSPDAQ acquisition microbenchmarks.")
+    sub = parser.add_subparsers(dest="bench", required=True)
+    p_snap = sub.add_parser("snapshot", help="read_snapshot rate against a mocked LJM latency model")
+    p_snap.add_argument("--seconds", type=float, default=2.0, help="Time spent on each variant")
+    p_snap.add_argument("--round-trip-ms", type=float, default=1.0, help="Cost of one LJM command/response")
+    p_snap.add_argument("--per-value-us", type=float, default=10.0, help="Extra cost per register in a call")
+    p_dec = sub.add_parser("decimate", help="plot decimation of a long synthetic capture")
+    p_dec.add_argument("--minutes", type=float, default=30.0, help="Capture length")
+    p_dec.add_argument("--rate-hz", type=float, default=5000.0, help="Sample rate of the capture")
+    p_dec.add_argument("--width-px", type=int, default=1920, help="Target plot width")
+    p_dec.add_argument("--render-full", action="store_true", help="Also time rendering every sample (slow)")
+    p_eta = sub.add_parser("eta", help="Method2 inference: DataFrame/sklearn vs flattened forest")
+    p_eta.add_argument("--seconds", type=float, default=2.0, help="Time spent on each variant")
+    p_eta.add_argument("--check-rows", type=int, default=5000, help="Training rows compared against sklearn")
+    p_fit = sub.add_parser("etafit", help="Method1/Method3 fits: np.polyfit per sample vs streaming sums")
+    p_fit.add_argument("--csv", type=Path, default=FILL_CSV, help="Recorded fill with time and current_mass columns")
+    p_fit.add_argument("--target-mass", type=float, default=17.0, help="Mass the ETA counts down to")
+    p_tc = sub.add_parser("thermocouple", help="NIST accuracy checks and conversion throughput")
+    p_tc.add_argument("--samples", type=int, default=1_000_000, help="Voltages in the block timing")
+    p_tc.add_argument("--seconds", type=float, default=1.0, help="Time spent on each per-snapshot variant")
+    args = parser.parse_args()
+
+    if args.bench == "snapshot":
+        bench_snapshot(args.seconds, args.round_trip_ms, args.per_value_us)
+    elif args.bench == "decimate":
+        bench_decimate(args.minutes, args.rate_hz, args.width_px, args.render_full)
+    elif args.bench == "eta":
+        bench_eta(args.seconds, args.check_rows)
+    elif args.bench == "etafit":
+        bench_etafit(args.csv, args.target_mass)
+    elif args.bench == "thermocouple":
+        if not bench_thermocouple(args.samples, args.seconds):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
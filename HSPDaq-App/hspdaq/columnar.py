@@ -0,0 +1,318 @@
+"""
+Columnar (Parquet) storage for recorded test data.
+
+Layout – a directory holding a hive‑partitioned Parquet dataset, one
+partition per channel:
+
+    <root>/channel=<name>/part-<run>-<seq>.parquet
+
+with the columns
+
+    timestamp_ns  int64    Unix time of the sample, nanoseconds (UTC)
+    value         float64
+    unit          string   (may be null)
+
+Readers only touch the channels and columns they ask for, and the time window
+is pushed down to Parquet row‑group statistics, so a few seconds out of a long
+run reads a few row groups instead of re‑parsing a whole CSV.
+
+    python -m hspdaq.columnar convert run.csv run.parquet   # CSV -> dataset
+    python -m hspdaq.columnar info run.parquet
+
+Requires pyarrow; it is imported lazily so the rest of hspdaq works without it.
+"""
+from __future__ import annotations
+
+import argparse
+import time
+import uuid
+from datetime import date, datetime
+from pathlib import Path
+from typing import Iterable, Mapping, Sequence
+from urllib.parse import quote
+
+import numpy as np
+
+CHANNEL_KEY = "channel"
+TIME_COLUMN = "timestamp_ns"
+DEFAULT_FLUSH_ROWS = 65536
+
+
+def _pyarrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.dataset as ds
+        import pyarrow.parquet as pq
+    except ImportError as exc:  # pragma: no cover - depends on the environment
+        raise ImportError("Parquet recording/reading needs pyarrow (pip install pyarrow)") from exc
+    return pa, ds, pq
+
+
+def schema():
+    pa, _, _ = _pyarrow()
+    return pa.schema([(TIME_COLUMN, pa.int64()), ("value", pa.float64()), ("unit", pa.string())])
+
+
+def is_dataset(path: str | Path) -> bool:
+    """True for a directory written by ColumnarWriter (as opposed to a CSV file)."""
+    return Path(path).is_dir()
+
+
+def seconds_to_ns(seconds) -> np.ndarray:
+    return np.round(np.asarray(seconds, dtype=np.float64) * 1e9).astype(np.int64)
+
+
+# --------------------------------------------------------------------------- #
+# Writing
+# --------------------------------------------------------------------------- #
+class ColumnarWriter:
+    """
+    Buffers per‑channel arrays in memory and writes one Parquet file per
+    channel every `flush_rows` samples (and on close). Not thread‑safe: call
+    it from one thread, e.g. a recorder's writer thread.
+    """
+
+    def __init__(self, root: str | Path, flush_rows: int = DEFAULT_FLUSH_ROWS, compression: str = "zstd") -> None:
+        _pyarrow()  # fail at construction, not at the first flush
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.flush_rows = flush_rows
+        self.compression = compression
+        self.rows_written = 0
+        self._run = f"{time.strftime('%Y%m%d%H%M%S')}-{uuid.uuid4().hex[:6]}"  # several runs may share a root
+        self._seq = 0
+        self._buffers: dict[str, tuple[list[np.ndarray], list[np.ndarray], str | None]] = {}
+        self._buffered = 0
+
+    def write(self, channel: str, timestamps_ns: Sequence[int] | np.ndarray,
+              values: Sequence[float] | np.ndarray, unit: str | None = None) -> None:
+        """Append samples of one channel (int64 ns timestamps, float values)."""
+        t = np.asarray(timestamps_ns, dtype=np.int64)
+        v = np.asarray(values, dtype=np.float64)
+        if len(t) != len(v):
+            raise ValueError(f"{len(t)} timestamps but {len(v)} values for channel {channel!r}")
+        ts_parts, val_parts, _ = self._buffers.setdefault(channel, ([], [], unit))
+        ts_parts.append(t)
+        val_parts.append(v)
+        self._buffered += len(t)
+        if self._buffered >= self.flush_rows:
+            self.flush()
+
+    def write_rows(self, timestamps_ns: Sequence[int] | np.ndarray,
+                   rows: Mapping[str, Sequence[float] | np.ndarray],
+                   units: Mapping[str, str] | None = None) -> None:
+        """Wide form: one timestamp column shared by every channel in `rows`."""
+        units = units or {}
+        for channel, values in rows.items():
+            self.write(channel, timestamps_ns, values, units.get(channel))
+
+    def flush(self) -> None:
+        if not self._buffered:
+            return
+        pa, _, pq = _pyarrow()
+        for channel, (ts_parts, val_parts, unit) in self._buffers.items():
+            if not ts_parts:
+                continue
+            t = np.concatenate(ts_parts)
+            table = pa.table(
+                {TIME_COLUMN: t, "value": np.concatenate(val_parts),
+                 "unit": pa.array([unit] * len(t), pa.string())},
+                schema=schema(),
+            )
+            part_dir = self.root / f"{CHANNEL_KEY}={quote(str(channel), safe='')}"
+            part_dir.mkdir(exist_ok=True)
+            pq.write_table(table, part_dir / f"part-{self._run}-{self._seq:06d}.parquet", compression=self.compression)
+            self.rows_written += len(t)
+            ts_parts.clear()
+            val_parts.clear()
+        self._seq += 1
+        self._buffered = 0
+
+    def close(self) -> None:
+        self.flush()
+
+
+# --------------------------------------------------------------------------- #
+# Reading
+# --------------------------------------------------------------------------- #
+def open_dataset(root: str | Path):
+    pa, ds, _ = _pyarrow()
+    partitioning = ds.partitioning(pa.schema([(CHANNEL_KEY, pa.string())]), flavor="hive")
+    return ds.dataset(str(root), format="parquet", partitioning=partitioning, schema=schema().append(
+        pa.field(CHANNEL_KEY, pa.string())))
+
+
+def channels(root: str | Path) -> list[str]:
+    """Channel names in the dataset (from the directory names; no data is read)."""
+    from urllib.parse import unquote
+    prefix = f"{CHANNEL_KEY}="
+    return sorted(unquote(p.name[len(prefix):]) for p in Path(root).iterdir()
+                  if p.is_dir() and p.name.startswith(prefix))
+
+
+def time_range_ns(root: str | Path) -> tuple[int, int] | None:
+    """(first, last) timestamp in the dataset from row‑group statistics alone."""
+    lo = hi = None
+    for fragment in open_dataset(root).get_fragments():
+        metadata = fragment.metadata
+        col = metadata.schema.to_arrow_schema().get_field_index(TIME_COLUMN)
+        for i in range(metadata.num_row_groups):
+            stats = metadata.row_group(i).column(col).statistics
+            if stats is None or not stats.has_min_max:
+                continue
+            lo = stats.min if lo is None else min(lo, stats.min)
+            hi = stats.max if hi is None else max(hi, stats.max)
+    return None if lo is None else (lo, hi)
+
+
+def read_window(
+    root: str | Path,
+    start_ns: int | None = None,
+    end_ns: int | None = None,
+    channels: Iterable[str] | None = None,
+    columns: Sequence[str] = (TIME_COLUMN, "value"),
+):
+    """
+    pyarrow Table of `columns` plus "channel" for samples with
+    start_ns <= timestamp_ns <= end_ns (either bound optional), sorted by
+    channel then time. Channel and time filters are pushed down to the scan.
+    """
+    _, ds, _ = _pyarrow()
+    dataset = open_dataset(root)
+    expr = None
+    for cond in (
+        ds.field(TIME_COLUMN) >= start_ns if start_ns is not None else None,
+        ds.field(TIME_COLUMN) <= end_ns if end_ns is not None else None,
+        ds.field(CHANNEL_KEY).isin(list(channels)) if channels is not None else None,
+    ):
+        if cond is not None:
+            expr = cond if expr is None else expr & cond
+    projection = list(dict.fromkeys([*columns, TIME_COLUMN, CHANNEL_KEY]))
+    table = dataset.to_table(columns=projection, filter=expr)
+    return table.sort_by([(CHANNEL_KEY, "ascending"), (TIME_COLUMN, "ascending")])
+
+
+def iter_channels(table):
+    """Yield (channel, sub‑table) for a table sorted by channel, as read_window returns."""
+    if not table.num_rows:
+        return
+    keys = table.column(CHANNEL_KEY).to_numpy(zero_copy_only=False)
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    ends = np.r_[starts[1:], len(keys)]
+    for s, e in zip(starts, ends):
+        yield keys[s], table.slice(s, e - s)
+
+
+# --------------------------------------------------------------------------- #
+# CSV conversion
+# --------------------------------------------------------------------------- #
+_LONG_SCHEMAS = (  # control‑panel sensor_data_log.csv layouts (see sensor_plot._map_columns)
+    ("date_time", "ms", "tag", "value", "units"),
+    ("timestamp", "timestamp_ms", "name", "value", "unit"),
+)
+
+
+def _local_midnight_ns(day: date) -> int:
+    return int(time.mktime(datetime(day.year, day.month, day.day).timetuple())) * 1_000_000_000
+
+
+def convert_long_csv(csv_path: Path, writer: ColumnarWriter, chunk_rows: int = 1_000_000) -> None:
+    """Control‑panel layout: one row per sample with date, ms, name, value, unit columns."""
+    import pandas as pd
+
+    header = pd.read_csv(csv_path, nrows=0, encoding="utf-8-sig").columns
+    lc = {c.lower().strip(): c for c in header}
+    for names in _LONG_SCHEMAS:
+        if set(names) <= lc.keys():
+            date_c, ms_c, tag_c, val_c, unit_c = (lc[n] for n in names)
+            break
+    else:
+        raise ValueError(f"{csv_path}: not a recognised long-format sensor log")
+    for chunk in pd.read_csv(csv_path, usecols=[date_c, ms_c, tag_c, val_c, unit_c], chunksize=chunk_rows,
+                             encoding="utf-8-sig", skipinitialspace=True, on_bad_lines="skip",
+                             dtype={date_c: str, tag_c: str, unit_c: str}):
+        # Same reading of the wall-clock columns as sensor_plot (taken as UTC)
+        ts = pd.to_datetime(chunk[date_c], format="%Y-%m-%d %H:%M:%S", errors="coerce", utc=True)
+        ms = pd.to_numeric(chunk[ms_c], errors="coerce")
+        values = pd.to_numeric(chunk[val_c], errors="coerce")
+        ok = ts.notna() & ms.notna() & values.notna()
+        t_ns = (ts[ok].dt.tz_convert(None).to_numpy("datetime64[ns]").astype(np.int64)
+                + ms[ok].to_numpy(np.int64) * 1_000_000)
+        frame = pd.DataFrame({"tag": chunk[tag_c][ok].to_numpy(), "unit": chunk[unit_c][ok].to_numpy(),
+                              "t": t_ns, "v": values[ok].to_numpy(np.float64)})
+        for (tag, unit), grp in frame.groupby(["tag", "unit"], sort=False, dropna=False):
+            writer.write(tag, grp["t"].to_numpy(), grp["v"].to_numpy(), None if pd.isna(unit) else unit)
+
+
+def convert_wide_csv(csv_path: Path, writer: ColumnarWriter, day: date | None = None, time_col: str | None = None) -> None:
+    """
+    hspdaq Recorder layout: a time column then one column per channel.
+    "Timestamp" is the recorder's local time of day (HH:MM:SS:mmm) on `day`
+    (default: the file's modification date), wrapping past midnight; any other
+    time column is taken as seconds.
+    """
+    import pandas as pd
+
+    df = pd.read_csv(csv_path)
+    time_col = time_col or df.columns[0]
+    if time_col == "Timestamp":
+        tod = pd.to_datetime(df[time_col], format="%H:%M:%S:%f", errors="coerce")
+        ns = (tod - tod.dt.normalize()).to_numpy().astype("timedelta64[ns]").astype(np.int64)
+        ns += np.cumsum(np.r_[0, np.diff(ns) < 0]) * 86_400_000_000_000  # midnight rollover
+        day = day or date.fromtimestamp(csv_path.stat().st_mtime)
+        t_ns = _local_midnight_ns(day) + ns
+        keep = tod.notna().to_numpy()
+    else:
+        seconds = pd.to_numeric(df[time_col], errors="coerce").to_numpy(np.float64)
+        keep = np.isfinite(seconds)
+        t_ns = seconds_to_ns(np.where(keep, seconds, 0.0))
+    for col in df.columns:
+        if col == time_col:
+            continue
+        values = pd.to_numeric(df[col], errors="coerce").to_numpy(np.float64)
+        writer.write(col, t_ns[keep], values[keep])
+
+
+def convert_csv(csv_path: str | Path, root: str | Path, day: date | None = None,
+                flush_rows: int = 1_000_000) -> int:
+    """Convert either CSV layout to a dataset at `root`; returns rows written."""
+    import pandas as pd
+
+    csv_path = Path(csv_path)
+    writer = ColumnarWriter(root, flush_rows=flush_rows)
+    cols = {c.lower().strip() for c in pd.read_csv(csv_path, nrows=0, encoding="utf-8-sig").columns}
+    if any(set(names) <= cols for names in _LONG_SCHEMAS):
+        convert_long_csv(csv_path, writer)
+    else:
+        convert_wide_csv(csv_path, writer, day)
+    writer.close()
+    return writer.rows_written
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Channel-partitioned Parquet datasets for recorded test data.")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p_conv = sub.add_parser("convert", help="Convert an hspdaq or control-panel CSV to a Parquet dataset")
+    p_conv.add_argument("csv", type=Path)
+    p_conv.add_argument("out", type=Path, help="Dataset directory to create")
+    p_conv.add_argument("--date", type=date.fromisoformat,
+                        help="Day of a time-of-day 'Timestamp' column (default: CSV modification date)")
+    p_info = sub.add_parser("info", help="Channels, rows and time span of a dataset")
+    p_info.add_argument("root", type=Path)
+    args = parser.parse_args()
+
+    if args.cmd == "convert":
+        t0 = time.perf_counter()
+        n = convert_csv(args.csv, args.out, args.date)
+        print(f"Wrote {n} samples to {args.out} in {time.perf_counter() - t0:.1f} s")
+    elif args.cmd == "info":
+        span = time_range_ns(args.root)
+        print(f"{len(channels(args.root))} channels: {', '.join(channels(args.root))}")
+        print(f"{open_dataset(args.root).count_rows()} samples")
+        if span:
+            t0, t1 = (datetime.fromtimestamp(t / 1e9) for t in span)
+            print(f"{t0:%Y-%m-%d %H:%M:%S.%f} .. {t1:%Y-%m-%d %H:%M:%S.%f} (local)")
+
+
+if __name__ == "__main__":
+    main()
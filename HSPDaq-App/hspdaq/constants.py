@@ -41,8 +41,24 @@ AIN_CHANNELS = ["AIN68", "AIN65", "AIN67", "AIN63", "AIN64", "AIN66"]  # Single
 DIFF_PAIRS   = [("AIN48", "AIN56"), ("AIN49", "AIN57"),
                 ("AIN50", "AIN58"), ("AIN51", "AIN59")]               # Load cells
 TC_PAIRS     = [("AIN54", "AIN62"), ("AIN53", "AIN61"), ("AIN52", "AIN60")]
+TC_TYPE      = "K"         # thermocouple type on TC_PAIRS ("J" or "K"), see hspdaq.thermocouple
+TC_LOOKUP_TABLE = False    # dense 1 µV inverse table instead of the polynomials (pays off on blocks, not 3‑value snapshots)
 
 BUFFER_LIMIT = 5000        # rows before flushing CSV buffer
+RECORD_FORMAT = "csv"      # "csv", or "parquet" for a channel-partitioned dataset (needs pyarrow)
+
+# --- Acquisition / display rates ---
+ACQUISITION_RATE_HZ = 200  # snapshots/s read by the acquisition thread (all logged)
+GUI_REFRESH_HZ      = 30   # table / graph / PID redraws per second
+RING_CAPACITY       = 8192 # snapshots kept for slow consumers (~40 s at 200 Hz)
+RECORDER_DRAIN_S    = 0.05 # how often the recorder thread pulls new snapshots
+HISTORY_CAPACITY    = 12000 # samples kept per channel for live views (60 s at 200 Hz)
+PLOT_WINDOW_S       = 30   # seconds of history shown on each sensor graph
+ETA_PREDICT_HZ      = 5    # Method2 (random-forest) predictions per second while filling
+ETA_RUN_PRESSURE_PSI = 400.0 # run pressure above which a fill is in progress (tare + ETAs)
+ETA_TARGET_MASS     = 17.0 # lb of tared run-tank mass that counts as full
+ETA_MIN_FIT_MASS    = 5.0  # lb before the curve-based ETAs (Methods 1, 3, 4) start
+ETA_COMPILE_FOREST  = True # predict with the flattened forest (hspdaq.forest) instead of sklearn
 STARTING_SIZE = (1920, 1080)
 
 # Small offsets for absolute‑placement tweaks in PID overlay
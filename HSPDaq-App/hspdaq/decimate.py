@@ -0,0 +1,122 @@
+"""
+Point‑count reduction for plotting: never hand a renderer more points than it
+has pixels.
+
+Two reducers, both taking x (non‑decreasing, e.g. seconds) and y arrays:
+
+  * min/max envelope – split the x range into equal‑width buckets (one per
+    pixel column) and keep the lowest and highest sample of each, in time
+    order. Every peak and dip survives, so nothing that would have been
+    visible at full resolution disappears.
+  * LTTB (Largest‑Triangle‑Three‑Buckets) – keeps one point per bucket, the
+    one forming the largest triangle with its neighbours. Smoother‑looking
+    line at a given point budget, but single‑sample spikes can be dropped.
+
+decimate(x, y, width_px) picks between them; inputs already at or under the
+budget come back unchanged. Non‑finite y values are dropped.
+
+Only NumPy here—safe to import from any GUI or CLI.
+"""
+from __future__ import annotations
+
+import numpy as np
+
+METHODS = ("minmax", "lttb", "none")
+
+
+def _finite(x: np.ndarray, y: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    if len(x) != len(y):
+        raise ValueError(f"x has {len(x)} points but y has {len(y)}")
+    keep = np.isfinite(y)
+    if not keep.all():
+        x, y = x[keep], y[keep]
+    if len(x) > 1 and np.any(x[1:] < x[:-1]):
+        order = np.argsort(x, kind="stable")
+        x, y = x[order], y[order]
+    return x, y
+
+
+def bucket_index(x: np.ndarray, x0: float, x1: float, n_buckets: int) -> np.ndarray:
+    """Equal‑width bucket (0..n_buckets-1) of each x over [x0, x1]; out‑of‑range x is clamped."""
+    span = (x1 - x0) or 1.0
+    idx = ((np.asarray(x, dtype=np.float64) - x0) * (n_buckets / span)).astype(np.int64)
+    np.clip(idx, 0, n_buckets - 1, out=idx)
+    return idx
+
+
+def minmax_buckets(x: np.ndarray, y: np.ndarray, x0: float, x1: float, n_buckets: int):
+    """
+    (bucket, lo, hi) for every non‑empty bucket of sorted x over [x0, x1].
+    Values only, no positions – the cheap form for a live per‑pixel trace.
+    Buckets containing a NaN are left out.
+    """
+    if not len(x):
+        return np.empty(0, np.int64), np.empty(0), np.empty(0)
+    bucket = bucket_index(x, x0, x1, n_buckets)
+    starts = np.flatnonzero(np.r_[True, bucket[1:] != bucket[:-1]])
+    lo = np.minimum.reduceat(y, starts)
+    hi = np.maximum.reduceat(y, starts)
+    keep = np.isfinite(lo) & np.isfinite(hi)
+    return bucket[starts][keep], lo[keep], hi[keep]
+
+
+def minmax_decimate(x: np.ndarray, y: np.ndarray, n_buckets: int) -> tuple[np.ndarray, np.ndarray]:
+    """Min/max envelope with at most 2 * n_buckets real samples, in their original order."""
+    x, y = _finite(x, y)
+    if len(x) <= 2 * n_buckets:
+        return x, y
+    bucket = bucket_index(x, x[0], x[-1], n_buckets)
+    starts = np.flatnonzero(np.r_[True, bucket[1:] != bucket[:-1]])
+    counts = np.diff(np.r_[starts, len(x)])
+    group = np.repeat(np.arange(len(starts)), counts)
+    # First sample in each bucket equal to the bucket's min (resp. max).
+    lo = np.repeat(np.minimum.reduceat(y, starts), counts)
+    hi = np.repeat(np.maximum.reduceat(y, starts), counts)
+    _, i_lo = np.unique(group[y == lo], return_index=True)
+    _, i_hi = np.unique(group[y == hi], return_index=True)
+    i_lo = np.flatnonzero(y == lo)[i_lo]
+    i_hi = np.flatnonzero(y == hi)[i_hi]
+    idx = np.stack([np.minimum(i_lo, i_hi), np.maximum(i_lo, i_hi)], axis=1).ravel()
+    idx = idx[np.r_[True, idx[1:] != idx[:-1]]]  # flat buckets: min and max are the same sample
+    return x[idx], y[idx]
+
+
+def lttb(x: np.ndarray, y: np.ndarray, n_out: int) -> tuple[np.ndarray, np.ndarray]:
+    """Largest‑Triangle‑Three‑Buckets down to n_out points (first and last always kept)."""
+    x, y = _finite(x, y)
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return x, y
+    # Interior points split into n_out - 2 buckets by count, as in the reference algorithm.
+    edges = (np.arange(n_out - 1) * ((n - 2) / (n_out - 2))).astype(np.int64) + 1
+    edges[-1] = n - 1
+    # Mean of each bucket (the "third point" for the bucket before it), from cumulative sums.
+    cx = np.r_[0.0, np.cumsum(x)]
+    cy = np.r_[0.0, np.cumsum(y)]
+    width = edges[1:] - edges[:-1]
+    avg_x = np.r_[(cx[edges[1:]] - cx[edges[:-1]]) / width, x[-1]]
+    avg_y = np.r_[(cy[edges[1:]] - cy[edges[:-1]]) / width, y[-1]]
+
+    out = np.empty(n_out, dtype=np.int64)
+    out[0], out[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        ax, ay = x[a], y[a]
+        area = np.abs((ax - avg_x[i + 1]) * (y[lo:hi] - ay) - (ax - x[lo:hi]) * (avg_y[i + 1] - ay))
+        a = lo + int(np.argmax(area))
+        out[i + 1] = a
+    return x[out], y[out]
+
+
+def decimate(x, y, width_px: int, method: str = "minmax") -> tuple[np.ndarray, np.ndarray]:
+    """Reduce (x, y) for a plot `width_px` pixels wide. method: 'minmax', 'lttb' or 'none'."""
+    if method == "minmax":
+        return minmax_decimate(x, y, max(1, int(width_px)))
+    if method == "lttb":
+        return lttb(x, y, max(3, 2 * int(width_px)))
+    if method == "none":
+        return _finite(x, y)
+    raise ValueError(f"Unknown decimation method {method!r}; expected one of {METHODS}")
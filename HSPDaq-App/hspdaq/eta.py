@@ -0,0 +1,429 @@
+# hspdaq/eta.py
+"""
+Fill‑ETA estimators behind one interface, and a backtester for them.
+
+Every estimator takes FillSamples through update(sample) and answers
+predict() with the seconds left until the run tank reaches the target mass
+(None while it has nothing to say yet). The four numbers the GUIs show:
+
+  live_fit      Method1  quadratic time‑vs‑mass fit over this fill
+  forest        Method2  random forest on the current sensor readings
+  seeded_fit    Method3  the same fit, seeded with the reference fill curve
+  reference     Method4  the reference fill curve alone
+
+live_fit_ewls (the live fit with a forgetting factor) is there to be
+compared, not shown. EtaEngine runs a set of them side by side.
+
+Backtesting replays recorded fills through each estimator, one process per
+(file, estimator) pair, and reports error against the actual fill time and
+the cost of each update+predict:
+
+    python -m hspdaq.eta backtest FILL.csv [FILL2.csv ...] [--estimators a,b]
+                                  [--target-mass LB] [--summary out.csv] [--jobs N]
+
+A fill CSV is either an hspdaq recording (Timestamp, AIN…, Total_Weight,
+TC_1…) or a training‑style table (time, supply_pressure, …, current_mass,
+optionally full_fill_time). Without full_fill_time the fill is taken to end
+when the (median‑smoothed) tared mass first reaches the target.
+"""
+from __future__ import annotations
+
+import abc
+import argparse
+import csv
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, NamedTuple
+
+import numpy as np
+
+from hspdaq.constants import (
+    AIN_CHANNELS,
+    ETA_MIN_FIT_MASS,
+    ETA_RUN_PRESSURE_PSI,
+    ETA_TARGET_MASS,
+)
+from hspdaq.streamfit import StreamingQuadraticFit
+
+# time (s since the mass first reached ETA_MIN_FIT_MASS) as a quadratic in mass, from earlier fills
+REFERENCE_COEFF = np.array([1.72501276, -24.80675432, 95.42369204])
+
+
+class FillSample(NamedTuple):
+    time_s: float               # seconds since the fill started (run pressure above threshold)
+    supply_pressure: float      # psi
+    supply_temperature: float   # °F
+    run_pressure: float         # psi
+    run_temperature: float      # °F
+    mass: float                 # tared run‑tank mass, lb
+
+
+# --------------------------------------------------------------------------- #
+# Estimators
+# --------------------------------------------------------------------------- #
+class EtaEstimator(abc.ABC):
+    """Base class: feed samples in time order with update(), read predict()."""
+
+    def reset(self) -> None:
+        pass
+
+    @abc.abstractmethod
+    def update(self, sample: FillSample) -> None:
+        """Take the next sample of the fill."""
+
+    @abc.abstractmethod
+    def predict(self) -> float | None:
+        """Seconds until the target mass, or None while there isn't enough data."""
+
+
+class QuadraticFitEstimator(EtaEstimator):
+    """
+    Fit time as a quadratic in mass over the fill (streaming, O(1) per sample)
+    and extrapolate to the target mass. Samples below min_mass are ignored;
+    time is counted from the first sample at or above it, as the reference
+    curve is. `reference` seeds the fit with that curve over 0..199 lb.
+    """
+
+    def __init__(
+        self,
+        target_mass: float = ETA_TARGET_MASS,
+        min_mass: float = ETA_MIN_FIT_MASS,
+        forgetting: float = 1.0,
+        reference: np.ndarray | None = None,
+    ) -> None:
+        self.target_mass = target_mass
+        self.min_mass = min_mass
+        self.forgetting = forgetting
+        self.reference = reference
+        self.reset()
+
+    def reset(self) -> None:
+        self.fit = StreamingQuadraticFit(self.forgetting)
+        if self.reference is not None:
+            masses = np.arange(0, 200, dtype=np.float64)
+            self.fit.extend(masses, np.polyval(self.reference, masses))
+        self._t0 = None
+        self._t = 0.0
+        self._live = 0  # samples of this fill in the fit
+
+    def update(self, sample: FillSample) -> None:
+        if not sample.mass >= self.min_mass:
+            return
+        if self._t0 is None:
+            self._t0 = sample.time_s
+        self._t = sample.time_s - self._t0
+        self.fit.update(sample.mass, self._t)
+        self._live += 1
+
+    def predict(self) -> float | None:
+        if self._live < 3:
+            return None
+        fill_time = self.fit.predict(self.target_mass)
+        return None if fill_time is None else fill_time - self._t
+
+
+class ReferenceCurveEstimator(EtaEstimator):
+    """Time to target mass read off the reference curve, clocked like QuadraticFitEstimator."""
+
+    def __init__(
+        self,
+        coeff: np.ndarray = REFERENCE_COEFF,
+        target_mass: float = ETA_TARGET_MASS,
+        min_mass: float = ETA_MIN_FIT_MASS,
+    ) -> None:
+        self.fill_time = float(np.polyval(coeff, target_mass))
+        self.min_mass = min_mass
+        self.reset()
+
+    def reset(self) -> None:
+        self._t0 = None
+        self._t = 0.0
+
+    def update(self, sample: FillSample) -> None:
+        if not sample.mass >= self.min_mass:
+            return
+        if self._t0 is None:
+            self._t0 = sample.time_s
+        self._t = sample.time_s - self._t0
+
+    def predict(self) -> float | None:
+        return None if self._t0 is None else self.fill_time - self._t
+
+
+class ForestEstimator(EtaEstimator):
+    """
+    Random‑forest prediction from the latest sample (hspdaq.model). With
+    rate_hz set, predicts at most that often in sample time and repeats the
+    last value in between.
+    """
+
+    def __init__(self, handle=None, rate_hz: float | None = None) -> None:
+        from hspdaq import model  # sklearn/joblib only for the estimators that need them
+
+        self.handle = (handle or model.default_handle()).start()
+        self.min_interval_s = 1.0 / rate_hz if rate_hz else 0.0
+        self._row = np.empty(len(model.FEATURE_COLUMNS))
+        self.reset()
+
+    def reset(self) -> None:
+        self._sample: FillSample | None = None
+        self._last: float | None = None
+        self._next_t = -np.inf
+
+    def update(self, sample: FillSample) -> None:
+        self._sample = sample
+
+    def predict(self) -> float | None:
+        sample = self._sample
+        if sample is None or sample.time_s < self._next_t:
+            return self._last
+        self._row[:] = sample[1:]  # FillSample fields after time_s are in FEATURE_COLUMNS order
+        eta = self.handle.predict_row(self._row)
+        if eta is not None:  # still loading: try again next sample
+            self._last = eta
+            self._next_t = sample.time_s + self.min_interval_s
+        return self._last
+
+
+ESTIMATORS: dict[str, Callable[..., EtaEstimator]] = {
+    "live_fit": QuadraticFitEstimator,
+    "forest": ForestEstimator,
+    "seeded_fit": lambda: QuadraticFitEstimator(reference=REFERENCE_COEFF),
+    "reference": ReferenceCurveEstimator,
+    "live_fit_ewls": lambda: QuadraticFitEstimator(forgetting=0.995),
+}
+
+# GUI field -> estimator shown in it
+DISPLAY_METHODS = {
+    "Method1": "live_fit",
+    "Method2": "forest",
+    "Method3": "seeded_fit",
+    "Method4": "reference",
+}
+
+
+class EtaEngine:
+    """Several estimators fed the same samples."""
+
+    def __init__(self, estimators: dict[str, EtaEstimator]) -> None:
+        self.estimators = estimators
+
+    @classmethod
+    def from_names(cls, names, forest_rate_hz: float | None = None) -> "EtaEngine":
+        built = {}
+        for name in names:
+            if name == "forest":
+                built[name] = ForestEstimator(rate_hz=forest_rate_hz)
+            else:
+                built[name] = ESTIMATORS[name]()
+        return cls(built)
+
+    def reset(self) -> None:
+        for est in self.estimators.values():
+            est.reset()
+
+    def update(self, sample: FillSample) -> None:
+        for est in self.estimators.values():
+            est.update(sample)
+
+    def predictions(self) -> dict[str, float | None]:
+        return {name: est.predict() for name, est in self.estimators.items()}
+
+
+# --------------------------------------------------------------------------- #
+# Recorded fills
+# --------------------------------------------------------------------------- #
+class Fill(NamedTuple):
+    samples: list[FillSample]
+    remaining_s: np.ndarray     # actual seconds to target mass at each sample
+
+
+def _clock_seconds(stamps) -> np.ndarray:
+    """HH:MM:SS:mmm recorder timestamps -> seconds, continuing past midnight."""
+    parts = np.array([s.split(":") for s in stamps], dtype=np.float64)
+    t = parts[:, 0] * 3600 + parts[:, 1] * 60 + parts[:, 2] + parts[:, 3] * 1e-3
+    t += 86400.0 * np.cumsum(np.r_[False, np.diff(t) < 0])
+    return t
+
+
+@lru_cache(maxsize=8)
+def load_fill(path: Path, target_mass: float = ETA_TARGET_MASS) -> Fill:
+    """Samples of one recorded fill from the run‑pressure threshold on, and the true time left at each."""
+    import pandas as pd
+
+    df = pd.read_csv(path, skipinitialspace=True)
+    if "current_mass" in df.columns:  # training-style table, mass already tared
+        t = df["time"].to_numpy(dtype=np.float64)
+        cols = ["supply_pressure", "supply_temperature", "run_pressure", "run_temperature"]
+        sp, st, rp, rt = (df[c].to_numpy(dtype=np.float64) for c in cols)
+        mass = df["current_mass"].to_numpy(dtype=np.float64)
+    else:  # hspdaq recording: same sensors the live loop reads
+        t = _clock_seconds(df["Timestamp"].astype(str))
+        sp = df[AIN_CHANNELS[2]].to_numpy(dtype=np.float64)
+        rp = df[AIN_CHANNELS[3]].to_numpy(dtype=np.float64)
+        st = df["TC_1"].to_numpy(dtype=np.float64)
+        rt = df["TC_2"].to_numpy(dtype=np.float64)
+        mass = np.abs(df["Total_Weight"].to_numpy(dtype=np.float64))
+
+    active = np.flatnonzero(rp > ETA_RUN_PRESSURE_PSI)
+    if not len(active):
+        raise ValueError(f"{path}: run pressure never exceeds {ETA_RUN_PRESSURE_PSI:g} psi")
+    start = active[0]
+    if "current_mass" not in df.columns:
+        mass = mass - mass[start]  # tare at fill start, as the live loop does
+
+    if "full_fill_time" in df.columns:
+        remaining = df["full_fill_time"].to_numpy(dtype=np.float64)
+    else:
+        smooth = pd.Series(mass).rolling(9, center=True, min_periods=1).median().to_numpy()
+        reached = np.flatnonzero((smooth >= target_mass) & (np.arange(len(t)) >= start))
+        if not len(reached):
+            raise ValueError(f"{path}: mass never reaches {target_mass:g} lb after fill start")
+        remaining = t[reached[0]] - t
+
+    sl = slice(start, None)
+    samples = [FillSample(*row) for row in zip((t[sl] - t[start]).tolist(), sp[sl].tolist(), st[sl].tolist(),
+                                               rp[sl].tolist(), rt[sl].tolist(), mass[sl].tolist())]
+    return Fill(samples, remaining[sl])
+
+
+# --------------------------------------------------------------------------- #
+# Backtesting
+# --------------------------------------------------------------------------- #
+SUMMARY_FIELDS = ("file", "estimator", "samples", "coverage", "mae_s", "rmse_s", "p90_abs_s",
+                  "mae_last30_s", "update_mean_us", "update_p99_us")
+
+
+def replay(estimator: EtaEstimator, fill: Fill) -> tuple[np.ndarray, np.ndarray]:
+    """(prediction or NaN, update+predict ns) per sample of the fill."""
+    n = len(fill.samples)
+    pred = np.full(n, np.nan)
+    cost = np.empty(n, dtype=np.int64)
+    clock = time.perf_counter_ns
+    for i, sample in enumerate(fill.samples):
+        t0 = clock()
+        estimator.update(sample)
+        eta = estimator.predict()
+        cost[i] = clock() - t0
+        if eta is not None:
+            pred[i] = eta
+    return pred, cost
+
+
+def _backtest_task(path: Path, name: str, target_mass: float) -> dict:
+    """One (fill, estimator) job; returns the raw per-sample arrays for pooling."""
+    fill = load_fill(path, target_mass)
+    estimator = ESTIMATORS[name]()
+    if isinstance(estimator, ForestEstimator):
+        estimator.handle.wait()  # time predictions, not model loading
+    pred, cost = replay(estimator, fill)
+    before_end = fill.remaining_s >= 0  # score only while the fill is still going
+    return {
+        "file": str(path), "estimator": name,
+        "error": (pred - fill.remaining_s)[before_end],
+        "remaining": fill.remaining_s[before_end],
+        "cost_ns": cost,
+    }
+
+
+def _score(file: str, name: str, error: np.ndarray, remaining: np.ndarray, cost_ns: np.ndarray) -> dict:
+    have = ~np.isnan(error)
+    abs_err = np.abs(error[have])
+    late = abs_err[remaining[have] <= 30.0]
+
+    def stat(values: np.ndarray, fn) -> float | None:
+        return round(float(fn(values)), 3) if len(values) else None
+
+    return {
+        "file": file, "estimator": name, "samples": int(len(error)),
+        "coverage": round(float(have.mean()), 3) if len(error) else 0.0,
+        "mae_s": stat(abs_err, np.mean),
+        "rmse_s": stat(abs_err, lambda e: np.sqrt(np.mean(e * e))),
+        "p90_abs_s": stat(abs_err, lambda e: np.percentile(e, 90)),
+        "mae_last30_s": stat(late, np.mean),
+        "update_mean_us": round(float(cost_ns.mean()) / 1e3, 2),
+        "update_p99_us": round(float(np.percentile(cost_ns, 99)) / 1e3, 2),
+    }
+
+
+def backtest(files, names, *, target_mass: float = ETA_TARGET_MASS, jobs: int | None = None) -> list[dict]:
+    """
+    Scores every (file, estimator) pair on a process pool. Returns one row per
+    pair (input order) followed by one pooled row per estimator (file 'ALL').
+    """
+    tasks = [(Path(path), name) for path in files for name in names]
+    results: dict[int, dict] = {}
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = {pool.submit(_backtest_task, path, name, target_mass): i for i, (path, name) in enumerate(tasks)}
+        for n_done, future in enumerate(as_completed(futures), 1):
+            i = futures[future]
+            results[i] = future.result()
+            path, name = tasks[i]
+            print(f"[{n_done}/{len(tasks)}] {path.name} {name}")
+
+    raw = [results[i] for i in range(len(tasks))]
+    rows = [_score(r["file"], r["estimator"], r["error"], r["remaining"], r["cost_ns"]) for r in raw]
+    for name in names:
+        mine = [r for r in raw if r["estimator"] == name]
+        rows.append(_score("ALL", name, *(np.concatenate([r[k] for r in mine]) for k in ("error", "remaining", "cost_ns"))))
+    return rows
+
+
+def write_summary(rows: list[dict], out_path: Path) -> None:
+    with open(out_path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=SUMMARY_FIELDS)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def _print_table(rows: list[dict]) -> None:
+    def fmt(value) -> str:
+        return "-" if value is None else f"{value:g}"
+
+    print(f"{'estimator':14s} {'coverage':>8s} {'MAE s':>8s} {'RMSE s':>8s} {'p90 s':>8s} "
+          f"{'MAE<=30s':>8s} {'us/upd':>8s} {'p99 us':>8s}")
+    ranked = sorted(rows, key=lambda r: np.inf if r["mae_s"] is None else r["mae_s"])
+    for r in ranked:
+        print(f"{r['estimator']:14s} {fmt(r['coverage']):>8s} {fmt(r['mae_s']):>8s} {fmt(r['rmse_s']):>8s} "
+              f"{fmt(r['p90_abs_s']):>8s} {fmt(r['mae_last30_s']):>8s} {fmt(r['update_mean_us']):>8s} "
+              f"{fmt(r['update_p99_us']):>8s}")
+
+
+# --------------------------------------------------------------------------- #
+# CLI
+# --------------------------------------------------------------------------- #
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Fill-ETA estimators.")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p_bt = sub.add_parser("backtest", help="Replay recorded fills through the estimators and score them")
+    p_bt.add_argument("files", nargs="+", type=Path, help="Recorded fill CSVs")
+    p_bt.add_argument("--estimators", default=",".join(ESTIMATORS),
+                      help=f"Comma-separated subset of: {', '.join(ESTIMATORS)}")
+    p_bt.add_argument("--target-mass", type=float, default=ETA_TARGET_MASS, help="Mass (lb) that ends the fill")
+    p_bt.add_argument("--summary", type=Path, help="Also write every row (per file and pooled) to this CSV")
+    p_bt.add_argument("--jobs", type=int, default=os.cpu_count(), help="Worker processes (default: all cores)")
+    args = parser.parse_args()
+
+    names = [n.strip() for n in args.estimators.split(",") if n.strip()]
+    unknown = sorted(set(names) - set(ESTIMATORS))
+    if unknown:
+        parser.error(f"unknown estimator(s): {', '.join(unknown)}")
+    missing = [str(f) for f in args.files if not f.exists()]
+    if missing:
+        parser.error(f"file not found: {', '.join(missing)}")
+
+    t0 = time.perf_counter()
+    rows = backtest(args.files, names, target_mass=args.target_mass, jobs=args.jobs)
+    print(f"\n{len(args.files)} fill(s) x {len(names)} estimator(s) on {args.jobs} workers "
+          f"in {time.perf_counter() - t0:.1f} s; pooled over all fills, best MAE first:")
+    _print_table([r for r in rows if r["file"] == "ALL"])
+    if args.summary:
+        write_summary(rows, args.summary)
+        print(f"summary: {args.summary}")
+
+
+if __name__ == "__main__":
+    main()
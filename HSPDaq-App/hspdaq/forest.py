@@ -0,0 +1,118 @@
+"""
+A fitted scikit‑learn regression forest flattened into a few NumPy arrays.
+
+Every tree's nodes are concatenated into one table (split feature, threshold,
+children, leaf value). Prediction walks all trees at once: one step moves
+every tree's cursor one level down with a handful of `np.take` calls, so a
+single row costs ~max_depth × 6 small vectorised operations instead of a
+sklearn `predict` call (input validation, joblib dispatch, per‑tree Python
+loop, DataFrame handling).
+
+Leaves point back at themselves, so cursors that reach a leaf early just
+stay there until the deepest tree finishes—no masking needed.
+
+predict_row() reuses preallocated buffers and allocates nothing per call;
+a FlatForest is therefore not safe to share between threads for
+predict_row (predict() is).
+
+Only NumPy here; sklearn is needed only by from_sklearn().
+"""
+from __future__ import annotations
+
+import numpy as np
+
+
+class FlatForest:
+    def __init__(
+        self,
+        feature: np.ndarray,
+        threshold: np.ndarray,
+        children: np.ndarray,
+        value: np.ndarray,
+        roots: np.ndarray,
+        max_depth: int,
+        n_features: int,
+    ) -> None:
+        self.feature = feature        # (nodes,) split feature; 0 at leaves
+        self.threshold = threshold    # (nodes,) go left if x <= threshold; +inf at leaves
+        self.children = children      # (2*nodes,) [left, right] pairs; leaves point at themselves
+        self.value = value            # (nodes,) mean target of the node
+        self.roots = roots            # (trees,) global index of each tree's root
+        self.max_depth = max_depth
+        self.n_features = n_features
+
+        n_trees = len(roots)
+        self._x = np.empty(n_features, dtype=np.float32)
+        self._node = np.empty(n_trees, dtype=np.int64)
+        self._next = np.empty(n_trees, dtype=np.int64)
+        self._f = np.empty(n_trees, dtype=np.int64)
+        self._xv = np.empty(n_trees, dtype=np.float32)
+        self._th = np.empty(n_trees, dtype=np.float64)
+        self._right = np.empty(n_trees, dtype=bool)
+        self._leaf = np.empty(n_trees, dtype=np.float64)
+
+    @classmethod
+    def from_sklearn(cls, forest) -> "FlatForest":
+        """Compile a fitted RandomForestRegressor / ExtraTreesRegressor (single output)."""
+        trees = [est.tree_ for est in forest.estimators_]
+        if trees[0].value.shape[1] != 1:
+            raise ValueError("only single-output forests can be flattened")
+        sizes = np.array([t.node_count for t in trees])
+        offsets = np.r_[0, np.cumsum(sizes)[:-1]]
+        n_nodes = int(sizes.sum())
+
+        feature = np.empty(n_nodes, dtype=np.int64)
+        threshold = np.empty(n_nodes, dtype=np.float64)
+        children = np.empty((n_nodes, 2), dtype=np.int64)
+        value = np.empty(n_nodes, dtype=np.float64)
+        for tree, off, size in zip(trees, offsets, sizes):
+            sl = slice(off, off + size)
+            leaf = tree.children_left == -1
+            own = np.arange(off, off + size)
+            feature[sl] = np.where(leaf, 0, tree.feature)
+            threshold[sl] = np.where(leaf, np.inf, tree.threshold)
+            children[sl, 0] = np.where(leaf, own, tree.children_left + off)
+            children[sl, 1] = np.where(leaf, own, tree.children_right + off)
+            value[sl] = tree.value[:, 0, 0]
+        return cls(
+            feature,
+            threshold,
+            children.ravel(),
+            value,
+            offsets.astype(np.int64),
+            max(t.max_depth for t in trees),
+            int(forest.n_features_in_),
+        )
+
+    @property
+    def n_trees(self) -> int:
+        return len(self.roots)
+
+    def predict_row(self, row: np.ndarray) -> float:
+        """Prediction for one feature row; allocates nothing."""
+        x, node, nxt = self._x, self._node, self._next
+        x[:] = row  # sklearn trees compare float32 inputs against float64 thresholds
+        node[:] = self.roots
+        for _ in range(self.max_depth):
+            np.take(self.feature, node, out=self._f)
+            np.take(x, self._f, out=self._xv)
+            np.take(self.threshold, node, out=self._th)
+            np.greater(self._xv, self._th, out=self._right)
+            np.multiply(node, 2, out=node)
+            np.add(node, self._right, out=node)
+            np.take(self.children, node, out=nxt)
+            node, nxt = nxt, node
+        np.take(self.value, node, out=self._leaf)
+        return float(self._leaf.mean())
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        """Predictions for a (rows, features) array, all rows and trees at once."""
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim != 2 or X.shape[1] != self.n_features:
+            raise ValueError(f"expected (rows, {self.n_features}) features, got {X.shape}")
+        rows = np.arange(len(X))[:, None]
+        node = np.broadcast_to(self.roots, (len(X), self.n_trees)).copy()
+        for _ in range(self.max_depth):
+            right = X[rows, self.feature[node]] > self.threshold[node]
+            node = self.children[2 * node + right]
+        return self.value[node].mean(axis=1)
@@ -1,20 +1,36 @@
 from __future__ import annotations
+import numpy as np
 import PySimpleGUI as sg
 
 from hspdaq.constants import FONTANDSIZE
+from hspdaq.decimate import minmax_buckets
+from hspdaq.timeseries import ChannelRing
+
+# Trace area in graph units (left of PLOT_X_MIN are the axis ticks/labels).
+PLOT_X_MIN = -450
+PLOT_X_MAX = 500
 
 
 class Sensor:
-    def __init__(self, graph: sg.Graph, name: str, unit: str, color: str) -> None:
+    def __init__(
+        self,
+        graph: sg.Graph,
+        name: str,
+        unit: str,
+        color: str,
+        series: ChannelRing | None = None,
+    ) -> None:
         self.graph = graph
         self.title = name
         self.unit = unit
         self.color = color
+        self.series = series  # live history drawn by render()
 
         self.visible = True
         self.tare = 0.0
         self.data = 0.0
         self._prev = 0.0
+        self._trace_id = None  # the one polyline item reused every frame
 
     def assign(self, value: float) -> None:
         self._prev = self.data
@@ -53,9 +69,39 @@ class Sensor:
                 self.graph.DrawLine((-500, y), (-450, y))
                 self.graph.DrawText(y, (-400, y), color="gray", font=FONTANDSIZE)
 
-    def plot_point(self, x: int) -> None:
-        """Plot latest value at X; join to previous if large jump."""
-        if abs(self.data - self._prev) < 1:
-            self.graph.DrawCircle((x, self.data), 1, line_color=self.color)
-        else:
-            self.graph.DrawLine((x, self._prev), (x, self.data), self.color, 2)
+    def render(self, t_end: float, window_s: float) -> None:
+        """
+        Redraw the trace for the `window_s` seconds of `series` ending at t_end.
+
+        The canvas keeps one polyline per sensor; each frame only its
+        coordinates change, decimated to one min/max pair per pixel column,
+        so frame cost depends on the window, not on how long the app has run.
+        """
+        canvas = self.graph.TKCanvas
+        if self._trace_id is None:
+            self._trace_id = self.graph.DrawLines(
+                [(PLOT_X_MIN, 0), (PLOT_X_MIN, 0)], color=self.color, width=1
+            )
+        if self.series is None:
+            return
+        t0 = t_end - window_s
+        t, v = self.series.since(t0)
+        width_px = self.graph.CanvasSize[0]
+        (gx0, gy0), (gx1, gy1) = self.graph.BottomLeft, self.graph.TopRight
+        n_cols = max(1, int(width_px * (PLOT_X_MAX - PLOT_X_MIN) / (gx1 - gx0)))
+        cols, lo, hi = minmax_buckets(t, v - self.tare, t0, t_end, n_cols)
+        if not len(cols):
+            canvas.itemconfigure(self._trace_id, state="hidden")
+            return
+
+        # graph units -> canvas pixels (same transform PySimpleGUI applies)
+        x = PLOT_X_MIN + (np.asarray(cols) + 0.5) * ((PLOT_X_MAX - PLOT_X_MIN) / n_cols)
+        px = (x - gx0) * (width_px / (gx1 - gx0))
+        height_px = self.graph.CanvasSize[1]
+        scale_y = -height_px / (gy1 - gy0)
+        coords = np.empty((len(px), 2, 2))
+        coords[:, :, 0] = px[:, None]
+        coords[:, 0, 1] = height_px + scale_y * (lo - gy0)
+        coords[:, 1, 1] = height_px + scale_y * (hi - gy0)
+        canvas.coords(self._trace_id, coords.ravel().tolist())
+        canvas.itemconfigure(self._trace_id, state="normal")
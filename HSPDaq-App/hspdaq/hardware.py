@@ -4,17 +4,21 @@ Keeps *all* hardware‑specific code in one place so the rest of the app is test
 """
 from __future__ import annotations
 
+import time
 from datetime import datetime
 
+import numpy as np
 from labjack import ljm
 
 from hspdaq.constants import (
     AIN_CHANNELS,
     DIFF_PAIRS,
+    TC_LOOKUP_TABLE,
     TC_PAIRS,
+    TC_TYPE,
 )
 from hspdaq.scaling import apply_scaling, apply_differential_scaling
-from hspdaq.thermocouple import thermocouple_voltage_to_temperature
+from hspdaq.thermocouple import lookup_table, thermocouple_voltage_to_temperature
 
 
 # --------------------------------------------------------------------------- #
@@ -29,21 +33,53 @@ def _configure_differential_pairs(handle, pairs: list[tuple[str, str]]) -> None:
         ljm.eWriteName(handle, f"{pos}_NEGATIVE_CH", int(neg[3:]))
 
 
+# --------------------------------------------------------------------------- #
+# Snapshot scan list
+# --------------------------------------------------------------------------- #
+# Every register read_snapshot needs, in one fixed order, so a snapshot is a
+# single eReadAddresses round trip instead of one eReadName per channel.
+CJ_TEMP_REGISTER = "TEMPERATURE_DEVICE_K"
+SNAPSHOT_NAMES: list[str] = (
+    list(AIN_CHANNELS)
+    + [pos for pos, _ in DIFF_PAIRS]
+    + [CJ_TEMP_REGISTER]
+    + [pos for pos, _ in TC_PAIRS]
+)
+_AIN_SLICE  = slice(0, len(AIN_CHANNELS))
+_DIFF_SLICE = slice(_AIN_SLICE.stop, _AIN_SLICE.stop + len(DIFF_PAIRS))
+_CJ_INDEX   = _DIFF_SLICE.stop
+_TC_SLICE   = slice(_CJ_INDEX + 1, _CJ_INDEX + 1 + len(TC_PAIRS))
+
+# handle -> (addresses, data types), filled by open_device
+_scan_lists: dict[int, tuple[list[int], list[int]]] = {}
+
+
+def _resolve_scan_list(handle: int) -> tuple[list[int], list[int]]:
+    addresses, data_types = ljm.namesToAddresses(len(SNAPSHOT_NAMES), SNAPSHOT_NAMES)
+    _scan_lists[handle] = (list(addresses), list(data_types))
+    return _scan_lists[handle]
+
+
 # --------------------------------------------------------------------------- #
 # Device lifecycle helpers
 # --------------------------------------------------------------------------- #
 def open_device() -> int:
     """
-    Open *any* connected LabJack, configure all differential pairs, return handle.
+    Open *any* connected LabJack, configure all differential pairs, resolve the
+    snapshot scan list (and build the thermocouple table), return handle.
     """
     handle = ljm.openS("ANY", "ANY", "ANY")                   # :contentReference[oaicite:5]{index=5}
     _configure_differential_pairs(handle, DIFF_PAIRS)
     _configure_differential_pairs(handle, TC_PAIRS)
+    _resolve_scan_list(handle)
+    if TC_LOOKUP_TABLE:
+        lookup_table(TC_TYPE)  # ~50 ms once, not inside the first timed read
     return handle
 
 
 def close_device(handle: int) -> None:
     """Close the LabJack handle if open."""
+    _scan_lists.pop(handle, None)
     ljm.close(handle)
 
 
@@ -54,28 +90,34 @@ def read_snapshot(handle: int) -> dict[str, float]:
     """
     Read all sensors once and return a dict with *scaled* engineering units.
     Keys:
-      timestamp, scaled_AINx…, total_weight, TC_1, TC_2, TC_3
+      timestamp, scaled_AINx…, total_weight, TC_1, TC_2, TC_3, time_s
+    (time_s is the Unix time of the read, for the live time‑series store)
     """
-    timestamp = datetime.now().strftime("%H:%M:%S:%f")[:-3]
+    time_s = time.time()
+    timestamp = datetime.fromtimestamp(time_s).strftime("%H:%M:%S:%f")[:-3]
+
+    # --- One batched read of every channel ------------------------------------
+    addresses, data_types = _scan_lists.get(handle) or _resolve_scan_list(handle)
+    values = ljm.eReadAddresses(handle, len(addresses), addresses, data_types)
 
     # --- Single‑ended pressures ------------------------------------------------
-    ain_voltages = [ljm.eReadName(handle, ch) for ch in AIN_CHANNELS]
+    ain_voltages = values[_AIN_SLICE]
     scaled_ain   = [
         apply_scaling(v, ch) for v, ch in zip(ain_voltages, AIN_CHANNELS)
     ]
 
     # --- Differential load‑cell weights ---------------------------------------
-    diff_voltages = [ljm.eReadName(handle, p[0]) for p in DIFF_PAIRS]
+    diff_voltages = values[_DIFF_SLICE]
     scaled_weights = [apply_differential_scaling(v) for v in diff_voltages]
     total_weight   = sum(scaled_weights)
 
     # --- Thermocouples ---------------------------------------------------------
-    cj_temp_k  = ljm.eReadName(handle, "TEMPERATURE_DEVICE_K")
+    cj_temp_k  = values[_CJ_INDEX]
     cj_temp_c  = cj_temp_k - 273.15
-    tc_voltages = [ljm.eReadName(handle, p[0]) for p in TC_PAIRS]
-    tc_temps_f  = [
-        thermocouple_voltage_to_temperature(v, cj_temp_c) for v in tc_voltages
-    ]
+    tc_voltages = np.asarray(values[_TC_SLICE])
+    tc_temps_f  = thermocouple_voltage_to_temperature(  # NIST ITS‑90, all pairs at once
+        tc_voltages, cj_temp_c, TC_TYPE, use_table=TC_LOOKUP_TABLE
+    ).tolist()
 
     # Assemble dictionary -------------------------------------------------------
     snapshot: dict[str, float] = {
@@ -83,5 +125,6 @@ def read_snapshot(handle: int) -> dict[str, float]:
         **{f"AIN{i+1}": val for i, val in enumerate(scaled_ain)},
         "total_weight": total_weight,
         **{f"TC_{i+1}": temp for i, temp in enumerate(tc_temps_f)},
+        "time_s": time_s,
     }
     return snapshot
@@ -1,23 +1,49 @@
 # hspdaq/model.py
 """
-Train‑once / predict‑many Random‑Forest ETA model.
-Keeps the fitted model in a module‑level singleton so importing is cheap.
+Train‑offline / predict‑many Random‑Forest ETA model.
+
+The forest is fitted once by `python -m hspdaq.model train` and saved as a
+versioned joblib artifact next to the training data. Alongside the estimator
+the artifact records
+
+  * a hash of the feature/target schema and training hyper‑parameters, and
+  * the SHA‑256 of the training CSV it was fitted on,
+
+so a stale artifact (CSV edited, columns changed) is detected and refitted
+instead of silently used. At runtime the app calls start_background_load()
+before opening the GUI; predictions return None until the model is in
+memory, so neither startup nor the first prediction waits on training.
+
+Live predictions take a plain NumPy feature row (FEATURE_COLUMNS order) and,
+with ETA_COMPILE_FOREST, run on a FlatForest (hspdaq.forest) compiled from
+the estimator at load time instead of going through sklearn/pandas per call.
 """
 from __future__ import annotations
 
+import argparse
+import hashlib
+import json
+import os
 import pathlib
-from functools import lru_cache
+import threading
+import time
+from datetime import datetime, timezone
 
+import joblib
 import numpy as np
 import pandas as pd
 from sklearn.ensemble import RandomForestRegressor
 from sklearn.model_selection import train_test_split
 
+from hspdaq.constants import ETA_COMPILE_FOREST
+from hspdaq.forest import FlatForest
+
 # --------------------------------------------------------------------------- #
 # Configuration
 # --------------------------------------------------------------------------- #
 PROJECT_ROOT = pathlib.Path(__file__).resolve().parents[1]
 DATA_PATH    = PROJECT_ROOT / "data" / "trainingData.csv"
+MODEL_PATH   = PROJECT_ROOT / "data" / "eta_model.joblib"
 
 FEATURE_COLUMNS = [
     "supply_pressure",
@@ -28,32 +54,236 @@ FEATURE_COLUMNS = [
 ]
 TARGET_COLUMN = "full_fill_time"
 
+# Bump when the artifact layout changes; older artifacts are then refitted.
+# 2: fitted on plain arrays (no feature names) so NumPy rows predict without pandas.
+ARTIFACT_VERSION = 2
+TRAIN_PARAMS = {"n_estimators": 100, "random_state": 42, "test_size": 0.2, "split_seed": 42}
+
+
+# --------------------------------------------------------------------------- #
+# Artifact metadata
+# --------------------------------------------------------------------------- #
+def schema_hash() -> str:
+    """Hash of everything besides the data that shapes the fitted model."""
+    spec = {"features": FEATURE_COLUMNS, "target": TARGET_COLUMN, "params": TRAIN_PARAMS}
+    return hashlib.sha256(json.dumps(spec, sort_keys=True).encode()).hexdigest()
+
+
+def file_sha256(path: pathlib.Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def stale_reason(meta: dict, data_path: pathlib.Path = DATA_PATH) -> str | None:
+    """Why an artifact with this metadata can't be used, or None if it can."""
+    if meta.get("version") != ARTIFACT_VERSION:
+        return f"artifact version {meta.get('version')} != {ARTIFACT_VERSION}"
+    if meta.get("schema_hash") != schema_hash():
+        return "feature/target schema changed"
+    if meta.get("data_sha256") != file_sha256(data_path):
+        return f"{data_path.name} changed since training"
+    return None
+
 
 # --------------------------------------------------------------------------- #
 # Model training / loading
 # --------------------------------------------------------------------------- #
-@lru_cache(maxsize=1)
-def _train_model() -> RandomForestRegressor:
+def _fit(data_path: pathlib.Path) -> RandomForestRegressor:
     """Load data, train Random‑Forest, return the fitted estimator."""
-    data = pd.read_csv(DATA_PATH)                          # :contentReference[oaicite:1]{index=1}
-    X_train, X_test, y_train, y_test = train_test_split(   # :contentReference[oaicite:2]{index=2}
-        data[FEATURE_COLUMNS],
-        data[TARGET_COLUMN],
-        test_size=0.2,
-        random_state=42,
+    data = pd.read_csv(data_path)
+    X_train, X_test, y_train, y_test = train_test_split(
+        data[FEATURE_COLUMNS].to_numpy(dtype=np.float64),
+        data[TARGET_COLUMN].to_numpy(dtype=np.float64),
+        test_size=TRAIN_PARAMS["test_size"],
+        random_state=TRAIN_PARAMS["split_seed"],
+    )
+    model = RandomForestRegressor(
+        n_estimators=TRAIN_PARAMS["n_estimators"], random_state=TRAIN_PARAMS["random_state"]
     )
-    model = RandomForestRegressor(n_estimators=100, random_state=42)  # :contentReference[oaicite:3]{index=3}
     model.fit(X_train, y_train)
     return model
 
 
+def train_and_save(
+    data_path: pathlib.Path = DATA_PATH, model_path: pathlib.Path = MODEL_PATH
+) -> dict:
+    """Fit on `data_path` and write the artifact to `model_path`; returns its metadata."""
+    data_path, model_path = pathlib.Path(data_path), pathlib.Path(model_path)
+    data_sha256 = file_sha256(data_path)  # hash first: a CSV edited mid‑fit reads as stale next time
+    t0 = time.perf_counter()
+    model = _fit(data_path)
+    meta = {
+        "version": ARTIFACT_VERSION,
+        "schema_hash": schema_hash(),
+        "data_sha256": data_sha256,
+        "data_file": data_path.name,
+        "features": list(FEATURE_COLUMNS),
+        "target": TARGET_COLUMN,
+        "trained_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "fit_s": round(time.perf_counter() - t0, 2),
+    }
+    # write‑then‑rename so a reader never sees a half‑written artifact
+    tmp = model_path.with_name(f"{model_path.name}.{os.getpid()}.tmp")
+    joblib.dump({"meta": meta, "model": model}, tmp)
+    os.replace(tmp, model_path)
+    return meta
+
+
+def read_artifact(model_path: pathlib.Path = MODEL_PATH) -> tuple[RandomForestRegressor, dict]:
+    artifact = joblib.load(model_path)
+    return artifact["model"], artifact["meta"]
+
+
+def load_model(
+    model_path: pathlib.Path = MODEL_PATH,
+    data_path: pathlib.Path = DATA_PATH,
+    retrain: bool = True,
+) -> RandomForestRegressor:
+    """
+    Return the saved model if it matches the current training CSV and schema.
+
+    Otherwise refit (and re‑save) when `retrain` is set, or raise RuntimeError.
+    """
+    model_path, data_path = pathlib.Path(model_path), pathlib.Path(data_path)
+    reason = "no saved model"
+    if model_path.exists():
+        try:
+            model, meta = read_artifact(model_path)
+            reason = stale_reason(meta, data_path)
+        except Exception as exc:  # truncated / foreign file, sklearn mismatch, ...
+            reason = f"unreadable artifact ({exc})"
+        if reason is None:
+            return model
+    if not retrain:
+        raise RuntimeError(f"{model_path}: {reason}")
+    print(f"ETA model: {reason}; retraining from {data_path.name}")
+    train_and_save(data_path, model_path)
+    return read_artifact(model_path)[0]
+
+
+class ModelHandle:
+    """
+    A model loaded on a daemon thread; `.model` is None until it is ready.
+
+    With compile=True the forest is also flattened (see hspdaq.forest) on the
+    loading thread and predict_row() uses that instead of sklearn.
+    """
+
+    def __init__(
+        self,
+        model_path: pathlib.Path = MODEL_PATH,
+        data_path: pathlib.Path = DATA_PATH,
+        compile: bool = True,
+    ) -> None:
+        self.model_path = model_path
+        self.data_path = data_path
+        self.compile = compile
+        self.model: RandomForestRegressor | None = None
+        self.flat: FlatForest | None = None
+        self.error: Exception | None = None
+        self._ready = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    def start(self) -> "ModelHandle":
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._load, name="eta-model-load", daemon=True)
+                self._thread.start()
+        return self
+
+    def _load(self) -> None:
+        try:
+            model = load_model(self.model_path, self.data_path)
+            if self.compile:
+                self.flat = FlatForest.from_sklearn(model)
+            self.model = model  # published last: a non-None model means ready
+        except Exception as exc:
+            self.error = exc
+            print(f"ETA model unavailable: {exc}")
+        finally:
+            self._ready.set()
+
+    def wait(self, timeout: float | None = None) -> RandomForestRegressor | None:
+        self.start()
+        self._ready.wait(timeout)
+        return self.model
+
+    def predict_row(self, row: np.ndarray) -> float | None:
+        """ETA (s) for one FEATURE_COLUMNS‑ordered row; None if not loaded or row has NaN/inf."""
+        model = self.model
+        if model is None or not np.isfinite(row).all():
+            return None
+        if self.flat is not None:
+            return self.flat.predict_row(row)
+        return float(model.predict(row.reshape(1, -1))[0])
+
+
+_handle = ModelHandle(compile=ETA_COMPILE_FOREST)
+_row = np.empty(len(FEATURE_COLUMNS))
+
+
 # --------------------------------------------------------------------------- #
 # Public helpers
 # --------------------------------------------------------------------------- #
-def predict_remaining_time(feature_dict: dict[str, float]) -> float:
+def default_handle() -> ModelHandle:
+    """The app‑wide model (artifact at MODEL_PATH), shared by every caller in the process."""
+    return _handle
+
+
+def start_background_load() -> None:
+    """Begin loading (or, if stale, refitting) the model without blocking."""
+    _handle.start()
+
+
+def predict_remaining_time(features: np.ndarray | dict[str, float]) -> float | None:
     """
-    Given a dict with keys exactly equal to FEATURE_COLUMNS, return ETA (seconds).
+    ETA (seconds) from a NumPy row in FEATURE_COLUMNS order (preferred: no
+    per‑call allocation) or a dict keyed by FEATURE_COLUMNS.
+    None while the model is still loading (or failed to load).
     """
-    model = _train_model()
-    features_df = pd.DataFrame([feature_dict], columns=FEATURE_COLUMNS)
-    return float(model.predict(features_df)[0])
+    if isinstance(features, dict):
+        for i, name in enumerate(FEATURE_COLUMNS):
+            _row[i] = features[name]
+        features = _row
+    return _handle.start().predict_row(features)
+
+
+# --------------------------------------------------------------------------- #
+# CLI
+# --------------------------------------------------------------------------- #
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Offline training for the fill ETA model.")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p_train = sub.add_parser("train", help="Fit the model and save the artifact")
+    p_train.add_argument("--data", type=pathlib.Path, default=DATA_PATH)
+    p_train.add_argument("--out", type=pathlib.Path, default=MODEL_PATH)
+    p_train.add_argument("--force", action="store_true", help="Refit even if the artifact is current")
+    p_info = sub.add_parser("info", help="Show an artifact's metadata and whether it is current")
+    p_info.add_argument("--data", type=pathlib.Path, default=DATA_PATH)
+    p_info.add_argument("--model", type=pathlib.Path, default=MODEL_PATH)
+    args = parser.parse_args()
+
+    if args.cmd == "train":
+        if not args.force and args.out.exists():
+            try:
+                reason = stale_reason(read_artifact(args.out)[1], args.data)
+            except Exception as exc:
+                reason = f"unreadable artifact ({exc})"
+            if reason is None:
+                print(f"{args.out} is current; use --force to refit")
+                return
+        meta = train_and_save(args.data, args.out)
+        print(f"Wrote {args.out} ({args.out.stat().st_size / 1e6:.1f} MB, fit {meta['fit_s']} s)")
+    elif args.cmd == "info":
+        _, meta = read_artifact(args.model)
+        for key, value in meta.items():
+            print(f"{key:12s} {value}")
+        print(f"{'status':12s} {stale_reason(meta, args.data) or 'current'}")
+
+
+if __name__ == "__main__":
+    main()
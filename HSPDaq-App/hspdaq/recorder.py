@@ -6,12 +6,19 @@ Usage
 rec = Recorder(csv_path, header)
 rec.append(row)   # row is a list matching header length
 rec.close()       # flush any remaining rows
+
+ParquetRecorder has the same interface but writes a channel‑partitioned
+Parquet dataset (see hspdaq.columnar); the first column of every row must be
+the Unix time of the sample in seconds.
 """
 from __future__ import annotations
 import csv
 from pathlib import Path
 from typing import List
 
+import numpy as np
+
+from hspdaq.columnar import ColumnarWriter, seconds_to_ns
 from hspdaq.constants import BUFFER_LIMIT
 
 
@@ -48,3 +55,38 @@ class Recorder:
         self._file.flush()
         self.buffer.clear()
         print(f"Written {BUFFER_LIMIT} rows to {self.file_path.name}")
+
+
+class ParquetRecorder:
+    def __init__(self, dir_path: str | Path, header: List[str]) -> None:
+        self.file_path = Path(dir_path)
+        self.channels = header[1:]  # header[0] names the time column
+        self.buffer: List[List] = []
+        # one Parquet file per channel per BUFFER_LIMIT rows
+        self._writer = ColumnarWriter(self.file_path, flush_rows=BUFFER_LIMIT * len(self.channels))
+
+    # ------------------------------------------------------------------ #
+    # public API
+    # ------------------------------------------------------------------ #
+    def append(self, row: List) -> None:
+        """Add one row [time_s, value, ...]; flush when BUFFER_LIMIT is reached."""
+        self.buffer.append(row)
+        if len(self.buffer) >= BUFFER_LIMIT:
+            self._flush()
+
+    def close(self) -> None:
+        """Write remaining rows and finish the dataset."""
+        if self.buffer:
+            self._flush()
+        self._writer.close()
+
+    # ------------------------------------------------------------------ #
+    # internals
+    # ------------------------------------------------------------------ #
+    def _flush(self) -> None:
+        block = np.asarray(self.buffer, dtype=np.float64)
+        t_ns = seconds_to_ns(block[:, 0])
+        self._writer.write_rows(t_ns, {name: block[:, i + 1] for i, name in enumerate(self.channels)})
+        n_rows = len(self.buffer)
+        self.buffer.clear()
+        print(f"Written {n_rows} rows to {self.file_path.name}")
@@ -0,0 +1,134 @@
+"""
+Streaming quadratic least‑squares fit, y ≈ c2·x² + c1·x + c0.
+
+The live fill‑time estimate (time as a quadratic in tank mass) used to rebuild
+arrays and call np.polyfit over the whole fill on every sample—O(n) per
+sample, O(n²) per fill. StreamingQuadraticFit keeps the running sums behind
+the normal equations instead,
+
+    Σ w·u^k  (k = 0..4)   and   Σ w·u^k·y  (k = 0..2),   u = x − x_ref,
+
+so update() is O(1) and the coefficients come from a 3×3 solve. x is shifted
+by the first sample (x_ref) to keep the sums well conditioned; results are
+returned for unshifted x, highest power first like np.polyfit.
+
+With forgetting < 1 every earlier sample's weight is multiplied by that
+factor on each update (exponentially weighted least squares—the solution
+recursive least squares with a forgetting factor tracks), letting the fit
+follow a fill whose rate changes. forgetting = 1 reproduces np.polyfit
+over all samples.
+
+Only NumPy here—no GUI or hardware imports.
+"""
+from __future__ import annotations
+
+import math
+
+import numpy as np
+
+
+class StreamingQuadraticFit:
+    def __init__(self, forgetting: float = 1.0) -> None:
+        if not 0.0 < forgetting <= 1.0:
+            raise ValueError(f"forgetting factor must be in (0, 1], got {forgetting}")
+        self.forgetting = forgetting
+        self.reset()
+
+    def reset(self) -> None:
+        self.n = 0               # samples used (non‑finite ones are skipped)
+        self.x_ref = None        # shift applied to x, set from the first sample
+        self._s = [0.0] * 5      # Σ w·u^k
+        self._t = [0.0] * 3      # Σ w·u^k·y
+        self._x_min = math.inf
+        self._x_max = -math.inf
+        self._coef = None        # cached shifted coefficients, cleared on update
+
+    # ------------------------------------------------------------------ #
+    # feeding
+    # ------------------------------------------------------------------ #
+    def update(self, x: float, y: float) -> None:
+        """Add one (x, y) sample; NaN/inf samples are ignored."""
+        if not (math.isfinite(x) and math.isfinite(y)):
+            return
+        if self.x_ref is None:
+            self.x_ref = x
+        u = x - self.x_ref
+        u2 = u * u
+        s, t = self._s, self._t
+        lam = self.forgetting
+        if lam != 1.0:
+            for k in range(5):
+                s[k] *= lam
+            for k in range(3):
+                t[k] *= lam
+        s[0] += 1.0
+        s[1] += u
+        s[2] += u2
+        s[3] += u2 * u
+        s[4] += u2 * u2
+        t[0] += y
+        t[1] += u * y
+        t[2] += u2 * y
+        self.n += 1
+        self._x_min = min(self._x_min, x)
+        self._x_max = max(self._x_max, x)
+        self._coef = None
+
+    def extend(self, xs, ys) -> None:
+        """Add many samples at once (e.g. seeding with a reference curve); same result as update() in a loop."""
+        xs = np.asarray(xs, dtype=np.float64)
+        ys = np.asarray(ys, dtype=np.float64)
+        keep = np.isfinite(xs) & np.isfinite(ys)
+        xs, ys = xs[keep], ys[keep]
+        if not len(xs):
+            return
+        if self.x_ref is None:
+            self.x_ref = float(xs[0])
+        u = xs - self.x_ref
+        lam = self.forgetting
+        w = lam ** np.arange(len(xs) - 1, -1, -1, dtype=np.float64) if lam != 1.0 else np.ones(len(xs))
+        decay = lam ** len(xs)
+        upow = u[None, :] ** np.arange(5)[:, None]
+        for k in range(5):
+            self._s[k] = self._s[k] * decay + float(np.dot(w, upow[k]))
+        for k in range(3):
+            self._t[k] = self._t[k] * decay + float(np.dot(w, upow[k] * ys))
+        self.n += len(xs)
+        self._x_min = min(self._x_min, float(xs.min()))
+        self._x_max = max(self._x_max, float(xs.max()))
+        self._coef = None
+
+    # ------------------------------------------------------------------ #
+    # reading
+    # ------------------------------------------------------------------ #
+    @property
+    def ready(self) -> bool:
+        """At least 3 samples spread over more than one x value."""
+        return self.n >= 3 and self._x_max > self._x_min
+
+    def _shifted(self) -> np.ndarray | None:
+        if self._coef is None and self.ready:
+            s, t = self._s, self._t
+            normal = np.array([[s[4], s[3], s[2]], [s[3], s[2], s[1]], [s[2], s[1], s[0]]])
+            try:
+                self._coef = np.linalg.solve(normal, np.array([t[2], t[1], t[0]]))
+            except np.linalg.LinAlgError:  # only two distinct x values: not a quadratic
+                return None
+        return self._coef
+
+    def coefficients(self) -> np.ndarray | None:
+        """[c2, c1, c0] for unshifted x (np.polyfit order), or None until ready."""
+        coef = self._shifted()
+        if coef is None:
+            return None
+        a, b, c = coef
+        r = self.x_ref
+        return np.array([a, b - 2.0 * a * r, a * r * r - b * r + c])
+
+    def predict(self, x: float) -> float | None:
+        """Fitted y at x, or None until ready."""
+        coef = self._shifted()
+        if coef is None:
+            return None
+        u = x - self.x_ref
+        return float((coef[0] * u + coef[1]) * u + coef[2])
@@ -1,47 +1,240 @@
 """
-K/J‑type thermocouple helper utilities.
+Type J / K thermocouple conversion with the NIST ITS‑90 reference functions.
+
+  * emf_mv(temp_c, type)            – forward: junction temperature -> EMF (mV)
+  * temperature_from_emf(mv, type)  – inverse polynomials: EMF (mV) -> °C
+  * thermocouple_temperature_c(v, cj_c, type) – a measured voltage with
+    cold‑junction compensation: the CJ temperature is turned into its EMF
+    with the forward function and added before inverting, which is what the
+    NIST tables assume (reference junction at 0 °C).
+
+Everything takes scalars or NumPy arrays of any shape (a stream block of
+voltages with one CJ reading, or matching arrays) and returns the same
+shape; values outside a polynomial's range come back as NaN. Scalars in,
+floats out.
+
+For large blocks, lookup_table(type) builds (once) a dense, uniform table of
+the inverse function at 1 µV steps; interpolating in it is a few array
+operations per block with no per‑range masking. It matches the polynomials
+to ~1e‑5 °C, except within 1 µV of a range boundary, where the published
+polynomials themselves disagree by up to ~0.07 °C. Pass use_table=True to
+the conversion functions to use it. Inputs of a few values (one snapshot's
+thermocouples) are evaluated with plain floats, which is quicker than
+either NumPy path at that size.
+
+Coefficients: NIST ITS‑90 Thermocouple Database (Monograph 175). Stated
+inverse‑polynomial errors over the three ranges: K −0.02…0.04, −0.05…0.04,
+−0.05…0.06 °C; J −0.05…0.03, −0.04…0.04, −0.04…0.03 °C.
+
 Only depends on NumPy; safe to import anywhere.
 """
 from __future__ import annotations
+
+import math
+from functools import lru_cache
+
 import numpy as np
 
-# --- NIST Type J reference tables (°C vs mV) ---
-TEMP_TABLE_C = np.array([
-    -200, -195, -190, -185, -180, -175, -170, -165, -160, -155,
-    -150, -145, -140, -135, -130, -125, -120, -115, -110, -105,
-    -100,  -95,  -90,  -85,  -80,  -75,  -70,  -65,  -60,  -55,
-     -50,  -45,  -40,  -35,  -30,  -25,  -20,  -15,  -10,   -5,
-       0,    5,   10,   15,   20,   25,   30,   35,   40,   45,
-      50,   55,   60,   65,   70,   75,   80,   85,   90,   95,
-     100,  105,  110,  115,  120,  125,  130,  135,  140,  145,
-     150,  155,  160,  165,  170,  175,  180,  185,  190,  195,  200
-])
-
-MV_TABLE = np.array([
-    -5.891, -5.813, -5.730, -5.642, -5.550, -5.454, -5.354, -5.250, -5.141, -5.029,
-    -4.913, -4.793, -4.669, -4.542, -4.411, -4.276, -4.138, -3.997, -3.852, -3.705,
-    -3.554, -3.400, -3.243, -3.083, -2.920, -2.755, -2.587, -2.416, -2.243, -2.067,
-    -1.889, -1.709, -1.527, -1.343, -1.156, -0.968, -0.778, -0.586, -0.392, -0.197,
-     0.000,  0.198,  0.397,  0.597,  0.798,  1.000,  1.203,  1.407,  1.612,  1.817,
-     2.023,  2.230,  2.436,  2.644,  2.851,  3.059,  3.267,  3.474,  3.682,  3.889,
-     4.096,  4.303,  4.509,  4.715,  4.920,  5.124,  5.328,  5.532,  5.735,  5.937,
-     6.138,  6.339,  6.540,  6.741,  6.941,  7.140,  7.340,  7.540,  7.739,  7.939,  8.138
-])
-
-
-def type_j_temp_from_mv(voltage_mv: float | np.ndarray) -> float | np.ndarray:
-    """Interpolate a Type‑J thermocouple temperature (°C) from millivolts."""
-    return np.interp(voltage_mv, MV_TABLE, TEMP_TABLE_C)
-
-
-def thermocouple_voltage_to_temperature(thermo_v: float, cj_temp_c: float) -> float:
-    """
-    Quick linear K‑type approximation.
-      dT (°C) ≈ thermo_v (V) / 41 µV per °C
-      TC °C   = CJ °C + dT
-      TC °F   = (TC °C × 9/5) + 32
-    Note: valid only over a limited range; your original script accepted that.
-    """
-    dT_c = thermo_v / 0.000041
-    tc_c = cj_temp_c + dT_c
-    return tc_c * 9/5 + 32
+TYPES = ("J", "K")
+_SMALL_BLOCK = 8  # inputs up to this size are evaluated value by value
+
+# --------------------------------------------------------------------------- #
+# NIST ITS-90 coefficients, (low, high, c0..cn) — stored highest power first
+# for np.polyval.
+# --------------------------------------------------------------------------- #
+def _ranges(*spec: tuple[float, float, list[float]], edge: float = 0.0) -> list[tuple[float, float, np.ndarray]]:
+    ranges = [[lo, hi, np.array(coeffs[::-1])] for lo, hi, coeffs in spec]
+    ranges[0][0] -= edge   # published range ends are rounded; let the
+    ranges[-1][1] += edge  # exact end points themselves convert
+    return [tuple(r) for r in ranges]
+
+
+# temperature (°C) -> EMF (mV)
+_FORWARD = {
+    "K": _ranges(
+        (-270.0, 0.0, [
+            0.000000000000E+00, 0.394501280250E-01, 0.236223735980E-04, -0.328589067840E-06,
+            -0.499048287770E-08, -0.675090591730E-10, -0.574103274280E-12, -0.310888728940E-14,
+            -0.104516093650E-16, -0.198892668780E-19, -0.163226974860E-22,
+        ]),
+        (0.0, 1372.0, [
+            -0.176004136860E-01, 0.389212049750E-01, 0.185587700320E-04, -0.994575928740E-07,
+            0.318409457190E-09, -0.560728448890E-12, 0.560750590590E-15, -0.320207200030E-18,
+            0.971511471520E-22, -0.121047212750E-25,
+        ]),
+    ),
+    "J": _ranges(
+        (-210.0, 760.0, [
+            0.000000000000E+00, 0.503811878150E-01, 0.304758369300E-04, -0.856810657200E-07,
+            0.132281952950E-09, -0.170529583370E-12, 0.209480906970E-15, -0.125383953360E-18,
+            0.156317256970E-22,
+        ]),
+        (760.0, 1200.0, [
+            0.296456256810E+03, -0.149761277860E+01, 0.317871039240E-02, -0.318476867010E-05,
+            0.157208190040E-08, -0.306913690560E-12,
+        ]),
+    ),
+}
+# Type K above 0 °C adds a0·exp(a1·(t − a2)²)
+_K_EXP = (0.118597600000E+00, -0.118343200000E-03, 0.126968600000E+03)
+
+# EMF (mV) -> temperature (°C)
+_INVERSE = {
+    "K": _ranges(
+        (-5.891, 0.0, [
+            0.0000000E+00, 2.5173462E+01, -1.1662878E+00, -1.0833638E+00, -8.9773540E-01,
+            -3.7342377E-01, -8.6632643E-02, -1.0450598E-02, -5.1920577E-04,
+        ]),
+        (0.0, 20.644, [
+            0.000000E+00, 2.508355E+01, 7.860106E-02, -2.503131E-01, 8.315270E-02,
+            -1.228034E-02, 9.804036E-04, -4.413030E-05, 1.057734E-06, -1.052755E-08,
+        ]),
+        (20.644, 54.886, [
+            -1.318058E+02, 4.830222E+01, -1.646031E+00, 5.464731E-02, -9.650715E-04,
+            8.802193E-06, -3.110810E-08,
+        ]),
+        edge=0.001,
+    ),
+    "J": _ranges(
+        (-8.095, 0.0, [
+            0.0000000E+00, 1.9528268E+01, -1.2286185E+00, -1.0752178E+00, -5.9086933E-01,
+            -1.7256713E-01, -2.8131513E-02, -2.3963370E-03, -8.3823321E-05,
+        ]),
+        (0.0, 42.919, [
+            0.000000E+00, 1.978425E+01, -2.001204E-01, 1.036969E-02, -2.549687E-04,
+            3.585153E-06, -5.344285E-08, 5.099890E-10,
+        ]),
+        (42.919, 69.553, [
+            -3.11358187E+03, 3.00543684E+02, -9.94773230E+00, 1.70276630E-01,
+            -1.43033468E-03, 4.73886084E-06,
+        ]),
+        edge=0.001,
+    ),
+}
+
+
+def _check_type(tc_type: str) -> str:
+    tc = tc_type.upper()
+    if tc not in TYPES:
+        raise ValueError(f"Unsupported thermocouple type {tc_type!r}; expected one of {TYPES}")
+    return tc
+
+
+def _range_index(v: float, ranges) -> int | None:
+    last = len(ranges) - 1
+    for i, (lo, hi, _) in enumerate(ranges):
+        if lo <= v < hi or (i == last and v == hi):
+            return i
+    return None
+
+
+def _horner(coeffs: np.ndarray, v: float) -> float:
+    acc = 0.0
+    for c in coeffs.tolist():
+        acc = acc * v + c
+    return acc
+
+
+def _piecewise(x, ranges) -> np.ndarray:
+    """Evaluate the range's polynomial at each x; NaN outside all ranges."""
+    x = np.asarray(x, dtype=np.float64)
+    if x.size <= _SMALL_BLOCK:  # a snapshot's worth: plain floats beat per-call NumPy overhead
+        out = []
+        for v in x.ravel().tolist():
+            i = _range_index(v, ranges)
+            out.append(math.nan if i is None else _horner(ranges[i][2], v))
+        return np.array(out).reshape(x.shape)
+    finite = x[np.isfinite(x)]
+    if finite.size == x.size:
+        i = _range_index(finite.min(), ranges)
+        if i is not None and i == _range_index(finite.max(), ranges):  # common case: one range for the whole block
+            return np.polyval(ranges[i][2], x)
+    out = np.full(x.shape, np.nan)
+    for i, (lo, hi, coeffs) in enumerate(ranges):
+        inside = (x >= lo) & (x <= hi) if i == len(ranges) - 1 else (x >= lo) & (x < hi)
+        if inside.any():
+            out[inside] = np.polyval(coeffs, x[inside])
+    return out
+
+
+def _like(x, result: np.ndarray):
+    """Float for scalar input, array otherwise."""
+    return float(result) if np.ndim(x) == 0 else result
+
+
+# --------------------------------------------------------------------------- #
+# Reference functions
+# --------------------------------------------------------------------------- #
+def emf_mv(temp_c, tc_type: str = "K"):
+    """NIST reference EMF (mV) of a junction at temp_c (°C), reference junction at 0 °C."""
+    tc = _check_type(tc_type)
+    t = np.asarray(temp_c, dtype=np.float64)
+    emf = _piecewise(t, _FORWARD[tc])
+    if tc == "K":
+        a0, a1, a2 = _K_EXP
+        if t.ndim == 0:
+            emf = emf + a0 * math.exp(a1 * (float(t) - a2) ** 2) if t >= 0.0 else emf
+        else:
+            emf = np.where(t >= 0.0, emf + a0 * np.exp(a1 * (t - a2) ** 2), emf)
+    return _like(temp_c, emf)
+
+
+def temperature_from_emf(emf, tc_type: str = "K", use_table: bool = False):
+    """Temperature (°C) for an EMF (mV) referenced to 0 °C, by the NIST inverse polynomials."""
+    tc = _check_type(tc_type)
+    if use_table:
+        return _like(emf, lookup_table(tc)(emf))
+    return _like(emf, _piecewise(emf, _INVERSE[tc]))
+
+
+def thermocouple_temperature_c(thermo_v, cj_temp_c, tc_type: str = "K", use_table: bool = False):
+    """Hot‑junction °C from the measured voltage (V) and the cold‑junction temperature (°C)."""
+    total_mv = np.asarray(thermo_v, dtype=np.float64) * 1000.0 + emf_mv(cj_temp_c, tc_type)
+    return temperature_from_emf(total_mv, tc_type, use_table)
+
+
+def thermocouple_voltage_to_temperature(thermo_v, cj_temp_c, tc_type: str = "K", use_table: bool = False):
+    """As thermocouple_temperature_c, in °F (what the GUIs and CSVs show)."""
+    tc_c = thermocouple_temperature_c(thermo_v, cj_temp_c, tc_type, use_table)
+    return tc_c * 9 / 5 + 32
+
+
+def type_j_temp_from_mv(voltage_mv):
+    """Type‑J temperature (°C) for an EMF in mV referenced to 0 °C (no cold‑junction term)."""
+    return temperature_from_emf(voltage_mv, "J")
+
+
+# --------------------------------------------------------------------------- #
+# Dense lookup table
+# --------------------------------------------------------------------------- #
+class InverseTable:
+    """Inverse function sampled on a uniform EMF grid; linear interpolation between samples."""
+
+    def __init__(self, tc_type: str, step_mv: float = 0.001) -> None:
+        ranges = _INVERSE[_check_type(tc_type)]
+        self.lo_mv, self.hi_mv = ranges[0][0], ranges[-1][1]
+        self.step_mv = step_mv
+        n = int(np.ceil((self.hi_mv - self.lo_mv) / step_mv)) + 1
+        grid = np.minimum(self.lo_mv + np.arange(n) * step_mv, self.hi_mv)
+        self.temps = _piecewise(grid, ranges)
+        self.slopes = np.r_[np.diff(self.temps), 0.0]  # per grid step
+        self._last = n - 1
+
+    def __call__(self, emf) -> np.ndarray:
+        emf = np.asarray(emf, dtype=np.float64)
+        pos = (emf - self.lo_mv) * (1.0 / self.step_mv)
+        outside = ~((emf >= self.lo_mv) & (emf <= self.hi_mv))  # also catches NaN
+        any_outside = outside.any()
+        if any_outside:
+            pos = np.where(outside, 0.0, pos)
+        idx = pos.astype(np.intp)
+        out = self.temps[idx] + (pos - idx) * self.slopes[idx]
+        if any_outside:
+            out[outside] = np.nan
+        return out
+
+
+@lru_cache(maxsize=None)
+def lookup_table(tc_type: str = "K") -> InverseTable:
+    """The (cached) 1 µV‑step inverse table for a thermocouple type."""
+    return InverseTable(tc_type)
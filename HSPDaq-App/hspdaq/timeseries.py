@@ -0,0 +1,142 @@
+"""
+Fixed‑capacity NumPy ring buffers for live time series.
+
+ChannelRing keeps the most recent `capacity` (timestamp, value) pairs for one
+channel. Every sample is written twice, at `i` and `i + capacity`, so the last
+n samples always sit in one contiguous slice: appends are O(1) and window()
+returns read‑only views instead of copies. TimeSeriesStore is a dict of
+ChannelRings fed from snapshot dicts.
+
+Only passive NumPy code here—no GUI or hardware imports.
+"""
+from __future__ import annotations
+
+from typing import Iterable, Mapping, Sequence
+
+import numpy as np
+
+
+class ChannelRing:
+    """Ring of the last `capacity` samples of one channel (timestamps in seconds)."""
+
+    def __init__(self, capacity: int) -> None:
+        if capacity <= 0:
+            raise ValueError(f"Ring capacity must be positive, got {capacity}")
+        self.capacity = capacity
+        self._t = np.full(2 * capacity, np.nan)
+        self._v = np.full(2 * capacity, np.nan)
+        self._pos = 0      # next write index in [0, capacity)
+        self._size = 0
+        self.total = 0     # samples ever appended
+
+    def __len__(self) -> int:
+        return self._size
+
+    # ------------------------------------------------------------------ #
+    # writing
+    # ------------------------------------------------------------------ #
+    def append(self, t: float, value: float) -> None:
+        pos = self._pos
+        self._t[pos] = self._t[pos + self.capacity] = t
+        self._v[pos] = self._v[pos + self.capacity] = value
+        self._pos = (pos + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+        self.total += 1
+
+    def extend(self, t: Sequence[float] | np.ndarray, values: Sequence[float] | np.ndarray) -> None:
+        """Append many samples with at most four slice copies per array."""
+        t = np.asarray(t, dtype=np.float64)
+        values = np.asarray(values, dtype=np.float64)
+        n = len(t)
+        if n != len(values):
+            raise ValueError(f"{n} timestamps but {len(values)} values")
+        self.total += n
+        if n > self.capacity:  # only the newest `capacity` samples can survive
+            t, values = t[-self.capacity:], values[-self.capacity:]
+            self._pos = (self._pos + n - self.capacity) % self.capacity
+            n = self.capacity
+        cap, pos = self.capacity, self._pos
+        first = min(n, cap - pos)       # up to the end of the lower copy
+        for buf, src in ((self._t, t), (self._v, values)):
+            buf[pos:pos + first] = src[:first]
+            buf[pos + cap:pos + cap + first] = src[:first]
+            buf[:n - first] = src[first:]
+            buf[cap:cap + n - first] = src[first:]
+        self._pos = (pos + n) % cap
+        self._size = min(self._size + n, cap)
+
+    def clear(self) -> None:
+        self._pos = self._size = 0
+
+    # ------------------------------------------------------------------ #
+    # reading (views, valid until the next append overwrites them)
+    # ------------------------------------------------------------------ #
+    def _span(self, n: int | None) -> slice:
+        n = self._size if n is None else max(0, min(n, self._size))
+        end = self._pos + self.capacity
+        return slice(end - n, end)
+
+    def window(self, n: int | None = None) -> tuple[np.ndarray, np.ndarray]:
+        """(timestamps, values) of the last n samples (all if None), oldest first, as read‑only views."""
+        span = self._span(n)
+        t, v = self._t[span], self._v[span]
+        t.flags.writeable = False
+        v.flags.writeable = False
+        return t, v
+
+    def since(self, t0: float) -> tuple[np.ndarray, np.ndarray]:
+        """Samples with timestamp >= t0 (timestamps must be appended in order)."""
+        t, v = self.window()
+        start = int(np.searchsorted(t, t0, side="left"))
+        return t[start:], v[start:]
+
+    def last(self) -> tuple[float, float]:
+        """Newest (timestamp, value); (nan, nan) when empty."""
+        if not self._size:
+            return np.nan, np.nan
+        i = self._pos + self.capacity - 1
+        return float(self._t[i]), float(self._v[i])
+
+    @property
+    def last_value(self) -> float:
+        return self.last()[1]
+
+    def min(self, n: int | None = None) -> float:
+        _, v = self.window(n)
+        return float(np.nanmin(v)) if len(v) else np.nan
+
+    def max(self, n: int | None = None) -> float:
+        _, v = self.window(n)
+        return float(np.nanmax(v)) if len(v) else np.nan
+
+    def mean(self, n: int | None = None) -> float:
+        _, v = self.window(n)
+        return float(np.nanmean(v)) if len(v) else np.nan
+
+
+class TimeSeriesStore:
+    """One ChannelRing per named channel, all with the same capacity."""
+
+    def __init__(self, channels: Iterable[str], capacity: int) -> None:
+        self.capacity = capacity
+        self.channels: dict[str, ChannelRing] = {name: ChannelRing(capacity) for name in channels}
+
+    def __getitem__(self, name: str) -> ChannelRing:
+        return self.channels[name]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.channels
+
+    def append(self, t: float, sample: Mapping[str, float]) -> None:
+        """One timestamp, one value per channel present in `sample`."""
+        for name, ring in self.channels.items():
+            if name in sample:
+                ring.append(t, sample[name])
+
+    def extend(self, t: Sequence[float], samples: Sequence[Mapping[str, float]]) -> None:
+        """Column‑wise append of many snapshots (every channel must be present in each)."""
+        if not samples:
+            return
+        t = np.asarray(t, dtype=np.float64)
+        for name, ring in self.channels.items():
+            ring.extend(t, np.fromiter((s[name] for s in samples), dtype=np.float64, count=len(samples)))
@@ -0,0 +1,479 @@
+# benchmarks.py
+"""
+Microbenchmarks for the control-panel hot paths. Run from this directory:
+
+    python benchmarks.py decode [--frames N]
+    python benchmarks.py router [--frames N] [--with-logging]
+    python benchmarks.py bulk [--frames N]
+    python benchmarks.py record [--samples N]
+    python benchmarks.py logging [--records N]
+    python benchmarks.py labjack [--scans N] [--scans-per-read N]
+    python benchmarks.py csv [--rows N] [--csv PATH] [--skip-python]
+
+Each benchmark prints the per-frame cost so changes can be compared on the
+laptop that actually runs the control panel.
+"""
+import argparse
+import logging
+import logging.handlers
+import os
+import struct
+import tempfile
+import threading
+import time
+
+import config
+import can_parser
+from logger_setup import app_logger, sensor_data_logger
+
+
+def _time_per_call(fn, items, repeat=5):
+    """Best-of-`repeat` wall time per item (in microseconds) for fn(item) over items."""
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for item in items:
+            fn(item)
+        best = min(best, time.perf_counter() - t0)
+    return best / len(items) * 1e6
+
+
+def _synthetic_can_ids(n_frames):
+    """Wire (32-bit, padded) CAN IDs cycling through every configured component, ~10% ACKs."""
+    base_ids = [item["can_id"] for item in config.ALL_COMPONENT_CONFIGS if "can_id" in item]
+    wire_ids = []
+    for i in range(n_frames):
+        base = base_ids[i % len(base_ids)]
+        if i % 10 == 0:
+            base |= config.CAN_ID_ACK_BIT_IN_29BIT_ID
+        wire_ids.append(base << 3)
+    return wire_ids
+
+
+# --------------------------------------------------------------------------- #
+# decode: CAN ID parsing + name lookups
+# --------------------------------------------------------------------------- #
+def _legacy_decode(can_id_32bit):
+    """The pre-table decode path: dict-building parse plus three linear name scans."""
+    parsed = can_parser.parse_can_id_struct(can_id_32bit)
+    sender_name = next((n.replace("SENDER_", "") for n, v in config.BOARD_CAN_ID_MAPPING.items()
+                        if v == parsed["sender_id"]), None)
+    if sender_name is None:
+        board_info = config.BOARD_INFO_LOOKUP_TABLE.get(parsed["sender_id"])
+        sender_name = board_info["name"] if board_info else f"Sender 0x{parsed['sender_id']:02X}"
+    board_info = config.BOARD_INFO_LOOKUP_TABLE.get(parsed["board_id"])
+    board_name = board_info["name"] if board_info else f"Board 0x{parsed['board_id']:02X}"
+    comp_name = next((n.replace("MSG_TYPE_", "") for n, v in config.MESSAGE_TYPE.items()
+                      if v == parsed["component_type_id"]), f"CompType 0x{parsed['component_type_id']:02X}")
+    return parsed, sender_name, board_name, comp_name
+
+
+def bench_decode(n_frames):
+    wire_ids = _synthetic_can_ids(n_frames)
+    for can_id in set(wire_ids): # Sanity check: both paths must agree before timing them
+        parsed, sender_name, board_name, comp_name = _legacy_decode(can_id)
+        fields = can_parser.decode_can_id(can_id)
+        assert fields[:7] == tuple(parsed.values()), hex(can_id)
+        assert (fields.sender_name, fields.board_name, fields.component_type_name) == (sender_name, board_name, comp_name)
+
+    legacy_us = _time_per_call(_legacy_decode, wire_ids)
+    table_us = _time_per_call(can_parser.decode_can_id, wire_ids)
+    print(f"decode ({n_frames} frames, {len(set(wire_ids))} distinct IDs)")
+    print(f"  legacy parse_can_id_struct + name scans: {legacy_us:7.3f} us/frame")
+    print(f"  decode_can_id (tables + memo):           {table_us:7.3f} us/frame")
+    print(f"  speedup: {legacy_us / table_us:.1f}x")
+
+
+# --------------------------------------------------------------------------- #
+# router: full DataProcessor.process_incoming_xbee_message throughput
+# --------------------------------------------------------------------------- #
+def _wire_frame(sender_id, board_id, component_type_id, instance_id, data):
+    base = ((sender_id << config.CAN_ID_SENDER_SHIFT) | (board_id << config.CAN_ID_BOARD_ID_SHIFT) |
+            (component_type_id << config.CAN_ID_COMPONENT_TYPE_SHIFT) | (instance_id << config.CAN_ID_INSTANCE_SHIFT))
+    return {'can_payload': (base << 3).to_bytes(4, 'big') + data, 'source_addr_64': "0013A200BENCH000"}
+
+
+def _synthetic_frame_mix(n_frames):
+    """~80% PT, 10% TC, 5% servo, 5% pad-controller status frames, using configured IDs."""
+    sender_ids = {name.replace("SENDER_", ""): id_val for name, id_val in config.BOARD_CAN_ID_MAPPING.items()}
+    pt_frames = [_wire_frame(sender_ids[pt["data_message_sender_name"]], pt["parent_board_id_hex"],
+                             config.MESSAGE_TYPE["MSG_TYPE_PRESSURE"], pt["data_message_instance_id"],
+                             struct.pack('>H', 3000 + i))
+                 for i, pt in enumerate(config.PT_LOOKUP_TABLE)]
+    tc_frames = [_wire_frame(tc["parent_board_id_hex"], tc["parent_board_id_hex"], config.MESSAGE_TYPE["MSG_TYPE_THERMOCOUPLE"],
+                             tc["can_id"] & config.CAN_ID_INSTANCE_MASK, struct.pack('>f', 21.5))
+                 for tc in config.THERMO_LOOKUP_TABLE]
+    servo_frames = [_wire_frame(sv["parent_board_id_hex"], sv["parent_board_id_hex"], config.MESSAGE_TYPE["MSG_TYPE_SERVO"],
+                                sv["can_id"] & config.CAN_ID_INSTANCE_MASK, bytes([2]))
+                    for sv in config.SERVO_LOOKUP_TABLE]
+    pad = config.BOARD_CAN_ID_MAPPING["SENDER_PAD_CONTROLLER"]
+    status_frames = [_wire_frame(pad, pad, config.MESSAGE_TYPE[t], 0, bytes([1]))
+                     for t in ("MSG_TYPE_IGNITER_STATUS", "MSG_TYPE_AUTO_MODE_STATUS", "MSG_TYPE_PC_STATE_STATUS")]
+
+    frames = []
+    for i in range(n_frames):
+        slot = i % 20
+        if slot < 16:
+            frames.append(pt_frames[i % len(pt_frames)])
+        elif slot < 18:
+            frames.append(tc_frames[i % len(tc_frames)])
+        elif slot == 18:
+            frames.append(servo_frames[i % len(servo_frames)])
+        else:
+            frames.append(status_frames[i % len(status_frames)])
+    return frames
+
+
+def bench_router(n_frames, with_logging=False):
+    from PySide6.QtCore import QCoreApplication
+    app = QCoreApplication.instance() or QCoreApplication([])
+    config.LABJACK_ENABLED = False # Benchmark the CAN path only; never touch hardware
+    tmp_dir = tempfile.TemporaryDirectory()
+    config.SENSOR_RECORDER_ENABLED = with_logging # Muted sensor_data_logger otherwise
+    config.SENSOR_RECORD_FILE_NAME = os.path.join(tmp_dir.name, "bench_sensor_data.bin")
+    from data_processor import DataProcessor
+    processor = DataProcessor()
+
+    frames = _synthetic_frame_mix(n_frames)
+    saved_levels = (app_logger.level, sensor_data_logger.level)
+    if not with_logging: # Measure decode/route/cache only, not console + CSV I/O
+        app_logger.setLevel(logging.ERROR)
+        sensor_data_logger.setLevel(logging.ERROR)
+    try:
+        full_us = _time_per_call(processor.process_incoming_xbee_message, frames, repeat=3)
+        route_frames = [can_parser.decode_can_id(int.from_bytes(f['can_payload'][:4], 'big')).component_type_id for f in frames]
+        lookup_us = _time_per_call(processor.message_router.handler_for, route_frames, repeat=3)
+    finally:
+        app_logger.setLevel(saved_levels[0])
+        sensor_data_logger.setLevel(saved_levels[1])
+    print(f"router ({n_frames} frames: 80% PT, 10% TC, 5% servo, 5% status; logging {'on' if with_logging else 'off'})")
+    print(f"  process_incoming_xbee_message: {full_us:7.3f} us/frame = {1e6 / full_us:,.0f} frames/s")
+    print(f"  handler lookup alone:          {lookup_us:7.3f} us/frame")
+    print(f"  registered types: {processor.message_router.registered_types()}")
+    processor.close_sensor_recorder()
+    tmp_dir.cleanup()
+    del app
+
+
+# --------------------------------------------------------------------------- #
+# bulk: per-frame PT decode vs bulk_decoder over one big batch
+# --------------------------------------------------------------------------- #
+def _per_frame_pt_decode(payloads):
+    """What DataProcessor does per PT frame, minus logging/caching: ID decode, struct.unpack, gain/offset."""
+    pressure_type = config.MESSAGE_TYPE["MSG_TYPE_PRESSURE"]
+    readings = []
+    for payload in payloads:
+        fields = can_parser.decode_can_id(int.from_bytes(payload[:4], 'big'))
+        if fields.component_type_id != pressure_type or len(payload) != 6:
+            continue
+        raw_adc_value = struct.unpack('>H', payload[4:])[0]
+        pt_conf = config.PT_CONFIG_BY_SENDER_INSTANCE.get((fields.sender_name, fields.instance_id))
+        readings.append((float(raw_adc_value) - pt_conf['offset']) / pt_conf['gain'] if pt_conf else float('nan'))
+    return readings
+
+
+def bench_bulk(n_frames):
+    import numpy as np
+    import bulk_decoder
+    payloads = [f['can_payload'] for f in _synthetic_frame_mix(n_frames)]
+
+    expected = np.array(_per_frame_pt_decode(payloads)) # Sanity check: both paths must agree before timing them
+    readings = bulk_decoder.decode_pt_frames(payloads)
+    assert np.allclose(readings.psi, expected, equal_nan=True), "bulk and per-frame PSI differ"
+
+    per_frame_us = _time_per_call(_per_frame_pt_decode, [payloads], repeat=3) / n_frames
+    bulk_us = _time_per_call(bulk_decoder.decode_pt_frames, [payloads], repeat=3) / n_frames
+    packed = bulk_decoder.pack_payloads(payloads)
+    ids_us = _time_per_call(bulk_decoder.decode_can_ids, [packed.can_id], repeat=3) / n_frames
+    print(f"bulk ({n_frames} frames, {len(readings.psi)} PT readings, {len(bulk_decoder.PT_CHANNEL_NAMES)} PT channels)")
+    print(f"  per-frame decode_can_id + struct.unpack + gain/offset: {per_frame_us:7.3f} us/frame")
+    print(f"  bulk_decoder.decode_pt_frames (pack + decode + PSI):    {bulk_us:7.3f} us/frame")
+    print(f"  bulk_decoder.decode_can_ids alone:                      {ids_us:7.3f} us/frame")
+    print(f"  speedup: {per_frame_us / bulk_us:.1f}x")
+
+
+# --------------------------------------------------------------------------- #
+# record: per-sample CSV logging vs the binary sensor recorder
+# --------------------------------------------------------------------------- #
+def bench_record(n_samples):
+    from sensor_recorder import SensorRecorder, export_csv
+    samples = [(time.time() + i * 1e-4, ("CH-01", "N-01", "E-01", "N-04")[i % 4], 100.0 + (i % 1000) * 0.25, 3000 + i % 1000)
+               for i in range(n_samples)]
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        # Same logger/format setup_data_logger uses, pointed at a scratch file.
+        csv_logger = logging.getLogger("BenchSensorData")
+        csv_logger.propagate = False
+        csv_logger.setLevel(logging.INFO)
+        handler = logging.FileHandler(os.path.join(tmp_dir, "legacy.csv"), mode="w")
+        handler.setFormatter(logging.Formatter('%(asctime)s,%(message)s'))
+        csv_logger.addHandler(handler)
+        t0 = time.perf_counter()
+        for _, name, value, _raw in samples:
+            csv_logger.info(f"{name},{value:.2f},PSI,SPLINTER,PressureTransducer,1")
+        csv_us = (time.perf_counter() - t0) / n_samples * 1e6
+        csv_logger.removeHandler(handler)
+        handler.close()
+
+        record_path = os.path.join(tmp_dir, "bench.bin")
+        recorder = SensorRecorder(record_path)
+        recorder.start()
+        t0 = time.perf_counter()
+        for ts, name, value, raw in samples:
+            recorder.log_sample(name, value, "PSI", "SPLINTER", "PressureTransducer", 1, ts, raw)
+        bin_us = (time.perf_counter() - t0) / n_samples * 1e6
+        recorder.close()
+
+        t0 = time.perf_counter()
+        n_rows = export_csv(record_path, os.path.join(tmp_dir, "exported.csv"))
+        export_s = time.perf_counter() - t0
+        legacy_bytes = os.path.getsize(os.path.join(tmp_dir, "legacy.csv"))
+        bin_bytes = os.path.getsize(record_path)
+    print(f"record ({n_samples} PT samples)")
+    print(f"  sensor_data_logger.info (Formatter + FileHandler): {csv_us:7.3f} us/sample, {legacy_bytes / n_samples:.1f} bytes/sample")
+    print(f"  SensorRecorder.log_sample (binary, bg writer):     {bin_us:7.3f} us/sample, {bin_bytes / n_samples:.1f} bytes/sample")
+    print(f"  speedup: {csv_us / bin_us:.1f}x; export_csv of {n_rows} rows took {export_s:.2f} s (offline)")
+
+
+# --------------------------------------------------------------------------- #
+# logging: raw-packet log cost in the XBee reader thread, sync vs queued handlers
+# --------------------------------------------------------------------------- #
+class _StallingStream:
+    """In-memory stream that sleeps stall_s on every stall_every-th write, like a busy disk."""
+
+    def __init__(self, stall_every, stall_s):
+        self.stall_every, self.stall_s, self.writes = stall_every, stall_s, 0
+
+    def write(self, text):
+        self.writes += 1
+        if self.writes % self.stall_every == 0:
+            time.sleep(self.stall_s)
+
+    def flush(self):
+        pass
+
+
+def _caller_latencies_us(logger, messages):
+    latencies = []
+    for msg in messages:
+        t0 = time.perf_counter()
+        logger.info(msg)
+        latencies.append((time.perf_counter() - t0) * 1e6)
+    latencies.sort()
+    return sum(latencies) / len(latencies), latencies[int(len(latencies) * 0.999)], latencies[-1]
+
+
+def bench_logging(n_records):
+    from digi.xbee.models.address import XBee64BitAddress, XBee16BitAddress
+    from digi.xbee.packets.common import ReceivePacket
+    from logger_setup import DroppingQueueHandler
+    packet = ReceivePacket(XBee64BitAddress.from_hex_string("0013A20041AE78C2"), XBee16BitAddress.from_hex_string("FFFE"),
+                           0, bytearray(b"\x18\x62\x20\x48\x0b\xb8"))
+    packet_hex = packet.output().hex()
+    full_us = _time_per_call(lambda p: f"Type=ReceivePacket, RawFrameData={packet_hex}, PacketDetails={str(p)}", [packet] * 2000)
+    hex_us = _time_per_call(lambda p: f"Type=ReceivePacket, RawFrameData={p.output().hex()}", [packet] * 2000)
+    print(f"logging ({n_records} records, writer stalls 2 ms every 500 writes)")
+    print(f"  build message, 'full' (str(packet)): {full_us:7.3f} us/packet")
+    print(f"  build message, 'hex':                {hex_us:7.3f} us/packet")
+
+    messages = [f"Type=ReceivePacket, RawFrameData={i:032x}" for i in range(n_records)]
+    formatter = logging.Formatter('%(asctime)s - %(message)s')
+    for mode in ("sync", "queued"):
+        logger = logging.getLogger(f"BenchRawPackets.{mode}")
+        logger.propagate = False
+        logger.setLevel(logging.INFO)
+        target = logging.StreamHandler(_StallingStream(500, 0.002))
+        target.setFormatter(formatter)
+        listener = None
+        if mode == "sync":
+            logger.addHandler(target)
+        else:
+            queue_handler = DroppingQueueHandler(config.LOG_QUEUE_CAPACITY, "bench")
+            listener = logging.handlers.QueueListener(queue_handler.queue, target)
+            listener.start()
+            logger.addHandler(queue_handler)
+        mean_us, p999_us, max_us = _caller_latencies_us(logger, messages)
+        if listener is not None:
+            listener.stop()
+        logger.handlers.clear()
+        dropped = f", {queue_handler.dropped_records} dropped" if listener is not None else ""
+        print(f"  {mode:6s} handler, caller latency: mean {mean_us:6.2f} us, p99.9 {p999_us:8.2f} us, max {max_us:8.2f} us{dropped}")
+
+
+# --------------------------------------------------------------------------- #
+# labjack: per-scan host cost, polling-style scaling/recording vs stream blocks
+# --------------------------------------------------------------------------- #
+def bench_labjack(n_scans, scans_per_read):
+    import numpy as np
+    from labjack_mock import MockLjm
+    from labjack_stream import LabJackStreamEngine, summed_load_lbs, LOADCELL_SUM_OFFSET_LBS
+    from sensor_recorder import SensorRecorder
+    channels = [pos_ch for pos_ch, _ in config.LABJACK_LOADCELL_DIFF_PAIRS]
+    mock = MockLjm(realtime=False)
+    handle = mock.openS()
+    n_blocks = max(1, n_scans // scans_per_read)
+    mock.eStreamStart(handle, scans_per_read, len(channels), mock.namesToAddresses(len(channels), channels)[0], 1000.0)
+    blocks = [np.asarray(mock.eStreamRead(handle)[0]).reshape(-1, len(channels)) for _ in range(n_blocks)]
+    mock.eStreamStop(handle)
+    n_scans = n_blocks * scans_per_read
+    scale = lambda v: (-(float(v) * 51412.0) + 2.0204) / 0.45359237 # DataProcessor._apply_differential_scaling_labjack
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        # Polling path: one Python scale/sum + log_sample per scan (ignores the eReadName round trips themselves).
+        recorder = SensorRecorder(os.path.join(tmp_dir, "poll.bin"))
+        recorder.start()
+        ts = time.time()
+        t0 = time.perf_counter()
+        for block in blocks:
+            for scan in block.tolist():
+                total = sum(scale(v) for v in scan) + LOADCELL_SUM_OFFSET_LBS
+                recorder.log_sample("LC-TOTAL-LJ", total, "lbs", "LabJackDAQ", "LoadCellSummed", 0, ts)
+        poll_us = (time.perf_counter() - t0) / n_scans * 1e6
+        recorder.close()
+
+        # Stream path: the DataProcessor block handler's work, one NumPy pass + log_block per block.
+        recorder = SensorRecorder(os.path.join(tmp_dir, "stream.bin"))
+        recorder.start()
+        timestamps = ts + np.arange(scans_per_read) / 1000.0
+        t0 = time.perf_counter()
+        for block in blocks:
+            recorder.log_block("LC-TOTAL-LJ", summed_load_lbs(block), "lbs", "LabJackDAQ", "LoadCellSummed", 0, timestamps)
+        block_us = (time.perf_counter() - t0) / n_scans * 1e6
+        recorder.close()
+
+        # Whole engine against the mock, unpaced: eStreamRead list -> arrays -> callback on the reader thread.
+        mock = MockLjm(realtime=False)
+        handle = mock.openS()
+        done = threading.Event()
+        seen = [0]
+        def on_block(block_ts, voltages):
+            seen[0] += len(block_ts)
+            if seen[0] >= n_scans:
+                done.set()
+        engine = LabJackStreamEngine(mock, handle, channels, 1000.0, scans_per_read, on_block)
+        t0 = time.perf_counter()
+        engine.start()
+        done.wait(60)
+        engine_s = time.perf_counter() - t0
+        engine.stop()
+    print(f"labjack ({n_scans} scans x {len(channels)} channels, {scans_per_read} scans per read)")
+    print(f"  per-scan scale + log_sample (polling path): {poll_us:7.3f} us/scan")
+    print(f"  per-block summed_load_lbs + log_block:      {block_us:7.3f} us/scan ({poll_us / block_us:.1f}x)")
+    print(f"  engine + mock ljm, unpaced:                 {seen[0] / engine_s:,.0f} scans/s sustained")
+
+
+# --------------------------------------------------------------------------- #
+# csv: sensor_plot.py window extraction, C-engine fast path vs all-Python path
+# --------------------------------------------------------------------------- #
+def _write_sensor_log(path, n_rows, rate_hz=5000, chunk_rows=1_000_000):
+    """sensor_data_log.csv-style file: PT/TC/LC rows at rate_hz aggregate, plus a servo text row every 1000."""
+    import numpy as np
+    import pandas as pd
+    names = np.array(["PT-ETH-01", "PT-NO-01", "TC-01", "LC-1", "LC-2"])
+    units = np.array(["PSI", "PSI", "F", "lbs", "lbs"])
+    start = pd.Timestamp("2025-05-18 12:00:00")
+    with open(path, "w", newline="") as out:
+        out.write("timestamp,timestamp_ms,name,value,unit,board,component_type,instance_id\n")
+        for first in range(0, n_rows, chunk_rows):
+            i = np.arange(first, min(first + chunk_rows, n_rows))
+            ms_total = i * 1000 // rate_hz
+            kind = i % len(names)
+            values = np.round(100.0 + 50.0 * np.sin(i / 5000.0), 2).astype(str).astype(object)
+            values[i % 1000 == 999] = '"OPEN"'
+            pd.DataFrame({
+                "timestamp": (start + pd.to_timedelta(ms_total // 1000, unit="s")).strftime("%Y-%m-%d %H:%M:%S"),
+                "timestamp_ms": ms_total % 1000,
+                "name": names[kind],
+                "value": values,
+                "unit": units[kind],
+                "board": "SPLINTER",
+                "component_type": "Sensor",
+                "instance_id": 1,
+            }).to_csv(out, header=False, index=False, quoting=3) # QUOTE_NONE; "OPEN" is pre-quoted
+    return start, start + pd.Timedelta(milliseconds=int((n_rows - 1) * 1000 // rate_hz))
+
+
+def bench_csv(n_rows, csv_path=None, skip_python=False):
+    import pandas as pd
+    import sensor_plot
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = csv_path or os.path.join(tmp_dir, "sensor_data_log.csv")
+        t0 = time.perf_counter()
+        first, last = _write_sensor_log(path, n_rows)
+        gen_s = time.perf_counter() - t0
+        # Middle half of the recording
+        span = last - first
+        start_ts = (first + span / 4).tz_localize("UTC")
+        end_ts = (first + 3 * span / 4).tz_localize("UTC")
+        print(f"csv ({n_rows:,} rows, {os.path.getsize(path) / 1e6:.0f} MB, generated in {gen_s:.1f} s; window = middle half)")
+        results = {}
+        for engine in ("fast",) if skip_python else ("fast", "python"):
+            t0 = time.perf_counter()
+            kept = sum(len(frame) for frame in sensor_plot.stream_window(sensor_plot.Path(path), start_ts, end_ts,
+                                                                          engine=engine, use_index=False))
+            elapsed = time.perf_counter() - t0
+            results[engine] = (elapsed, kept)
+            print(f"  stream_window engine={engine:6s}: {elapsed:7.2f} s ({n_rows / elapsed / 1e6:.2f} M rows/s, {kept:,} rows kept)")
+        if "python" in results:
+            (fast_s, fast_kept), (py_s, py_kept) = results["fast"], results["python"]
+            print(f"  speedup: {py_s / fast_s:.1f}x; same rows kept: {fast_kept == py_kept}")
+        t0 = time.perf_counter()
+        sensor_plot.collect_series(sensor_plot.Path(path), start_ts, end_ts, use_index=False)
+        print(f"  collect_series (fast, incl. per-tag aggregation): {time.perf_counter() - t0:.2f} s")
+
+        # A 5 s "ignition" window 10 s before the end of the log
+        win_end = last.tz_localize("UTC") - pd.Timedelta(seconds=10)
+        win_start = win_end - pd.Timedelta(seconds=5)
+        index_file = sensor_plot.index_path_for(sensor_plot.Path(path))
+        if index_file.exists():
+            index_file.unlink()
+        print("  5 s window near the end:")
+        for label, use_index in (("full scan", False), ("index build + seek", True), ("index seek", True)):
+            t0 = time.perf_counter()
+            kept = sum(len(frame) for frame in sensor_plot.stream_window(sensor_plot.Path(path), win_start, win_end,
+                                                                          use_index=use_index))
+            print(f"    {label:20s} {(time.perf_counter() - t0) * 1e3:9.1f} ms ({kept:,} rows)")
+        if csv_path:
+            index_file.unlink()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Control panel hot-path microbenchmarks.")
+    sub = parser.add_subparsers(dest="bench", required=True)
+    p_decode = sub.add_parser("decode", help="CAN ID decode + name lookup cost per frame")
+    p_decode.add_argument("--frames", type=int, default=100_000)
+    p_router = sub.add_parser("router", help="Frames/s through DataProcessor with a PT/TC/servo/status mix")
+    p_router.add_argument("--frames", type=int, default=50_000)
+    p_router.add_argument("--with-logging", action="store_true", help="Include app/sensor logger I/O in the timing")
+    p_bulk = sub.add_parser("bulk", help="Per-frame vs NumPy bulk decode of PT frames in one batch")
+    p_bulk.add_argument("--frames", type=int, default=100_000)
+    p_record = sub.add_parser("record", help="Per-sample CSV logging vs binary sensor recorder")
+    p_record.add_argument("--samples", type=int, default=200_000)
+    p_logging = sub.add_parser("logging", help="Raw packet logging cost: full vs hex, sync vs queued handler")
+    p_logging.add_argument("--records", type=int, default=50_000)
+    p_labjack = sub.add_parser("labjack", help="LabJack load cell cost per scan: polling path vs stream blocks")
+    p_labjack.add_argument("--scans", type=int, default=100_000)
+    p_labjack.add_argument("--scans-per-read", type=int, default=config.LABJACK_STREAM_SCANS_PER_READ)
+    p_csv = sub.add_parser("csv", help="sensor_plot window extraction from a generated log: fast vs Python CSV engine")
+    p_csv.add_argument("--rows", type=int, default=10_000_000)
+    p_csv.add_argument("--csv", help="Write the generated log here instead of a temp dir (kept afterwards)")
+    p_csv.add_argument("--skip-python", action="store_true", help="Only time the fast path")
+    args = parser.parse_args()
+
+    if args.bench == "decode":
+        bench_decode(args.frames)
+    elif args.bench == "router":
+        bench_router(args.frames, args.with_logging)
+    elif args.bench == "bulk":
+        bench_bulk(args.frames)
+    elif args.bench == "record":
+        bench_record(args.samples)
+    elif args.bench == "logging":
+        bench_logging(args.records)
+    elif args.bench == "labjack":
+        bench_labjack(args.scans, args.scans_per_read)
+    elif args.bench == "csv":
+        bench_csv(args.rows, args.csv, args.skip_python)
+
+
+if __name__ == "__main__":
+    main()
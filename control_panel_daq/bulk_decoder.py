@@ -0,0 +1,152 @@
+# bulk_decoder.py
+"""
+Vectorized decode of many raw XBee/CAN payloads at once.
+
+The per-frame path (DataProcessor -> can_parser.decode_can_id -> struct.unpack ->
+convert_pt_adc_to_psi) is right for live frames that each need a UI update and a log
+line. When a whole batch or a recorded log is decoded (DataProcessor's batch path
+uses decode_pt_frames for the PT frames of each XBee batch), the same work is done
+here with NumPy: the 4-byte big-endian IDs and the data bytes are packed into
+arrays, ID fields come out of one shift/mask per field, and PT ADC counts are converted
+to PSI with per-channel gain/offset arrays built from config.PT_LOOKUP_TABLE.
+"""
+from collections import namedtuple
+
+import numpy as np
+
+import config
+import can_parser
+
+CAN_ID_BYTES = 4
+MAX_CAN_DATA_BYTES = 8
+_ROW_BYTES = CAN_ID_BYTES + MAX_CAN_DATA_BYTES
+
+# Array counterpart of can_parser.CanIdFields (without the name columns; use
+# can_parser.SENDER_NAME_BY_ID etc. to label rows when needed).
+CanIdArrays = namedtuple("CanIdArrays", [
+    "is_ack",
+    "original_29bit_id_with_ack",
+    "base_29bit_id",
+    "sender_id",
+    "board_id",
+    "component_type_id",
+    "instance_id",
+])
+
+# payload_len is the full XBee payload length (ID + data); rows shorter than CAN_ID_BYTES
+# are invalid. data is zero-padded to MAX_CAN_DATA_BYTES, data_len says how much is real.
+PackedFrames = namedtuple("PackedFrames", ["can_id", "data", "data_len", "payload_len"])
+
+# One row per decoded PT reading. frame_index points back into the input batch so
+# callers can join readings with timestamps / source addresses they kept alongside.
+PtReadings = namedtuple("PtReadings", ["frame_index", "sender_id", "instance_id", "channel", "adc", "psi"])
+
+
+def pack_payloads(payloads):
+    """
+    Packs a sequence of raw XBee payloads (bytes/bytearray: 4-byte big-endian CAN ID + data)
+    into a PackedFrames of NumPy arrays. Data beyond MAX_CAN_DATA_BYTES is ignored.
+    """
+    n_frames = len(payloads)
+    payload_len = np.fromiter(map(len, payloads), dtype=np.int32, count=n_frames)
+    # One join + one gather instead of a per-row array assignment: each row reads
+    # _ROW_BYTES starting at its payload's offset, and bytes past the payload are zeroed.
+    flat = np.frombuffer(b"".join(payloads) + bytes(_ROW_BYTES), dtype=np.uint8)
+    starts = np.zeros(n_frames, dtype=np.int64)
+    np.cumsum(payload_len[:-1], out=starts[1:])
+    columns = np.arange(_ROW_BYTES)
+    raw = flat[starts[:, None] + columns]
+    raw[columns >= payload_len[:, None]] = 0
+    can_id = np.frombuffer(raw[:, :CAN_ID_BYTES].tobytes(), dtype=">u4").astype(np.uint32)
+    data = raw[:, CAN_ID_BYTES:]
+    data_len = np.clip(payload_len - CAN_ID_BYTES, -1, MAX_CAN_DATA_BYTES).astype(np.int8) # -1 = too short for an ID
+    return PackedFrames(can_id, data, data_len, payload_len)
+
+
+def decode_can_ids(can_ids_32bit):
+    """
+    Vectorized can_parser.parse_can_id_struct: takes an array of 32-bit wire CAN IDs
+    (3 padding bits at the bottom) and returns a CanIdArrays of per-field arrays.
+    """
+    can_ids = np.asarray(can_ids_32bit, dtype=np.uint32)
+    with_ack = can_ids >> np.uint32(3) # Shift off the padding bits
+    base = with_ack & np.uint32(~config.CAN_ID_ACK_BIT_IN_29BIT_ID & 0xFFFFFFFF)
+    return CanIdArrays(
+        (with_ack & np.uint32(config.CAN_ID_ACK_BIT_IN_29BIT_ID)) != 0,
+        with_ack,
+        base,
+        ((base & np.uint32(config.CAN_ID_SENDER_MASK)) >> np.uint32(config.CAN_ID_SENDER_SHIFT)).astype(np.uint8),
+        ((base & np.uint32(config.CAN_ID_BOARD_ID_MASK)) >> np.uint32(config.CAN_ID_BOARD_ID_SHIFT)).astype(np.uint8),
+        ((base & np.uint32(config.CAN_ID_COMPONENT_TYPE_MASK)) >> np.uint32(config.CAN_ID_COMPONENT_TYPE_SHIFT)).astype(np.uint8),
+        ((base & np.uint32(config.CAN_ID_INSTANCE_MASK)) >> np.uint32(config.CAN_ID_INSTANCE_SHIFT)).astype(np.uint8),
+    )
+
+
+# --- Per-channel PT calibration tables (built once at import) ---
+# Indexed [sender_id, instance_id], the same key DataProcessor uses (sender name from
+# can_parser.SENDER_NAME_BY_ID + instance). Unconfigured slots hold NaN gain/offset and
+# channel -1; a configured gain of 0 also yields NaN instead of raising like
+# convert_pt_adc_to_psi does, so one bad entry can't abort a whole batch.
+_SENDER_TABLE_SIZE = 0x100
+_INSTANCE_TABLE_SIZE = config.CAN_ID_INSTANCE_MASK + 1
+
+def _build_pt_tables():
+    gain = np.full((_SENDER_TABLE_SIZE, _INSTANCE_TABLE_SIZE), np.nan)
+    offset = np.full((_SENDER_TABLE_SIZE, _INSTANCE_TABLE_SIZE), np.nan)
+    channel = np.full((_SENDER_TABLE_SIZE, _INSTANCE_TABLE_SIZE), -1, dtype=np.int16)
+    names = []
+    units = []
+    channel_by_key = {}
+    for sender_id, sender_name in enumerate(can_parser.SENDER_NAME_BY_ID):
+        for instance_id in range(_INSTANCE_TABLE_SIZE):
+            pt_conf = config.PT_CONFIG_BY_SENDER_INSTANCE.get((sender_name, instance_id))
+            if pt_conf is None or "gain" not in pt_conf or "offset" not in pt_conf:
+                continue
+            key = (sender_name, instance_id)
+            if key not in channel_by_key:
+                channel_by_key[key] = len(names)
+                names.append(pt_conf.get("name", f"PT_{sender_name}_I{instance_id}"))
+                units.append(pt_conf.get("unit", "PSI"))
+            channel[sender_id, instance_id] = channel_by_key[key]
+            if pt_conf["gain"] != 0:
+                gain[sender_id, instance_id] = pt_conf["gain"]
+                offset[sender_id, instance_id] = pt_conf["offset"]
+    return gain, offset, channel, tuple(names), tuple(units)
+
+(PT_GAIN_BY_SENDER_INSTANCE, PT_OFFSET_BY_SENDER_INSTANCE, PT_CHANNEL_BY_SENDER_INSTANCE,
+ PT_CHANNEL_NAMES, PT_CHANNEL_UNITS) = _build_pt_tables()
+
+
+def pt_adc_counts(data):
+    """Big-endian uint16 ADC counts from the first two data bytes of each row of a PackedFrames.data array."""
+    return np.frombuffer(np.ascontiguousarray(data[:, :2]).tobytes(), dtype=">u2").astype(np.uint16)
+
+
+def convert_pt_adc_to_psi(sender_ids, instance_ids, adc_counts):
+    """Vectorized DataProcessor.convert_pt_adc_to_psi. Rows without a usable PT config come back NaN."""
+    gain = PT_GAIN_BY_SENDER_INSTANCE[sender_ids, instance_ids]
+    offset = PT_OFFSET_BY_SENDER_INSTANCE[sender_ids, instance_ids]
+    return (adc_counts.astype(np.float64) - offset) / gain
+
+
+def decode_pt_frames(payloads):
+    """
+    Decodes every pressure frame in a batch of raw payloads. Frames that aren't
+    MSG_TYPE_PRESSURE, or don't carry exactly 2 data bytes, are skipped (the
+    per-frame handler rejects those too).
+    """
+    packed = pack_payloads(payloads)
+    fields = decode_can_ids(packed.can_id)
+    is_pt = (fields.component_type_id == config.MESSAGE_TYPE["MSG_TYPE_PRESSURE"]) & (packed.data_len == 2)
+    frame_index = np.flatnonzero(is_pt)
+    sender_ids = fields.sender_id[frame_index]
+    instance_ids = fields.instance_id[frame_index]
+    adc = pt_adc_counts(packed.data[frame_index])
+    return PtReadings(
+        frame_index,
+        sender_ids,
+        instance_ids,
+        PT_CHANNEL_BY_SENDER_INSTANCE[sender_ids, instance_ids],
+        adc,
+        convert_pt_adc_to_psi(sender_ids, instance_ids, adc),
+    )
@@ -1,7 +1,25 @@
 # can_parser.py
+from collections import namedtuple
+
 import config
 from logger_setup import app_logger
 
+# Compact, immutable result of decoding a 32-bit wire CAN ID. The first seven fields
+# mirror the keys of the dict returned by parse_can_id_struct; the *_name fields are
+# resolved once from the reverse-index tables below, so consumers never re-scan config.
+CanIdFields = namedtuple("CanIdFields", [
+    "is_ack",
+    "original_29bit_id_with_ack",
+    "base_29bit_id",
+    "sender_id",
+    "board_id",
+    "component_type_id",
+    "instance_id",
+    "sender_name",
+    "board_name",
+    "component_type_name",
+])
+
 def parse_can_id_struct(can_id_int_32bit):
     """
     Parses a 32-bit integer representing the CAN ID.
@@ -60,32 +78,122 @@ def get_component_info_by_id_tuple(board_id, component_type_id, instance_id):
 #     app_logger.warning("Deprecated function get_component_info_by_can_id called.")
 #     return None # Or try to reconstruct the tuple key, but better to use the new function
 
+# --- Reverse-index tables (built once at import) ---
+# Every field is 8 bits wide, so each table is a flat 256-entry tuple indexed by ID.
+# Where BOARD_CAN_ID_MAPPING or MESSAGE_TYPE list the same ID twice, the first entry
+# wins, matching the original linear-scan behaviour.
+_ID_TABLE_SIZE = 0x100
+
+def _build_board_name_table():
+    names = [f"Board 0x{i:02X}" for i in range(_ID_TABLE_SIZE)]
+    for board_id, board_info in config.BOARD_INFO_LOOKUP_TABLE.items():
+        if 0 <= board_id < _ID_TABLE_SIZE:
+            names[board_id] = board_info["name"]
+    return tuple(names)
+
+def _build_sender_name_table():
+    names = [None] * _ID_TABLE_SIZE
+    for name, id_val in config.BOARD_CAN_ID_MAPPING.items():
+        if 0 <= id_val < _ID_TABLE_SIZE and names[id_val] is None:
+            names[id_val] = name.replace("SENDER_", "") # Make it cleaner, e.g., "PAD_CONTROLLER"
+    for i in range(_ID_TABLE_SIZE):
+        if names[i] is None:
+            # Fallback: Check if it's a known board ID (sometimes sender might be the board itself)
+            board_info = config.BOARD_INFO_LOOKUP_TABLE.get(i)
+            names[i] = board_info["name"] if board_info else f"Sender 0x{i:02X}"
+    return tuple(names)
+
+def _build_component_type_name_table():
+    names = [None] * _ID_TABLE_SIZE
+    for name, id_val in config.MESSAGE_TYPE.items():
+        if 0 <= id_val < _ID_TABLE_SIZE and names[id_val] is None:
+            names[id_val] = name.replace("MSG_TYPE_", "") # Cleaner name, e.g., "SERVO"
+    return tuple(n if n is not None else f"CompType 0x{i:02X}" for i, n in enumerate(names))
+
+BOARD_NAME_BY_ID = _build_board_name_table()
+SENDER_NAME_BY_ID = _build_sender_name_table()
+COMPONENT_TYPE_NAME_BY_ID = _build_component_type_name_table()
+
 def get_board_name(board_id_8bit):
     """
     Gets the human-readable board name from its 8-bit ID using BOARD_INFO_LOOKUP_TABLE.
     """
+    if 0 <= board_id_8bit < _ID_TABLE_SIZE:
+        return BOARD_NAME_BY_ID[board_id_8bit]
     board_info = config.BOARD_INFO_LOOKUP_TABLE.get(board_id_8bit)
     return board_info["name"] if board_info else f"Board 0x{board_id_8bit:02X}" # Return hex ID if unknown
 
 def get_sender_name(sender_id_8bit):
     """Gets sender name using BOARD_CAN_ID_MAPPING."""
-    for name, id_val in config.BOARD_CAN_ID_MAPPING.items():
-        if id_val == sender_id_8bit:
-            return name.replace("SENDER_", "") # Make it cleaner, e.g., "PAD_CONTROLLER"
-    # Fallback: Check if it's a known board ID (sometimes sender might be the board itself)
-    board_info = config.BOARD_INFO_LOOKUP_TABLE.get(sender_id_8bit)
-    if board_info:
-        return board_info["name"]
+    if 0 <= sender_id_8bit < _ID_TABLE_SIZE:
+        return SENDER_NAME_BY_ID[sender_id_8bit]
     return f"Sender 0x{sender_id_8bit:02X}"
 
 
 def get_component_type_name(component_type_id_8bit):
     """Gets component type name from MESSAGE_TYPE map."""
-    for name, id_val in config.MESSAGE_TYPE.items():
-        if id_val == component_type_id_8bit:
-            return name.replace("MSG_TYPE_", "") # Cleaner name, e.g., "SERVO"
+    if 0 <= component_type_id_8bit < _ID_TABLE_SIZE:
+        return COMPONENT_TYPE_NAME_BY_ID[component_type_id_8bit]
     return f"CompType 0x{component_type_id_8bit:02X}"
 
+# --- Fast-path decoder ---
+# Only a few dozen distinct CAN IDs ever appear on the bus, so decoded records are
+# memoised by their raw 32-bit value. The cache is capped so a noisy link spraying
+# garbage IDs cannot grow it without bound; past the cap IDs are decoded uncached.
+_DECODE_CACHE_MAX_ENTRIES = 4096
+_decode_cache = {}
+
+_ACK_BIT = config.CAN_ID_ACK_BIT_IN_29BIT_ID
+_SENDER_MASK, _SENDER_SHIFT = config.CAN_ID_SENDER_MASK, config.CAN_ID_SENDER_SHIFT
+_BOARD_MASK, _BOARD_SHIFT = config.CAN_ID_BOARD_ID_MASK, config.CAN_ID_BOARD_ID_SHIFT
+_COMP_MASK, _COMP_SHIFT = config.CAN_ID_COMPONENT_TYPE_MASK, config.CAN_ID_COMPONENT_TYPE_SHIFT
+_INST_MASK, _INST_SHIFT = config.CAN_ID_INSTANCE_MASK, config.CAN_ID_INSTANCE_SHIFT
+
+def _decode_uncached(can_id_int_32bit):
+    can_id_29bit_with_ack = can_id_int_32bit >> 3
+    base_29bit_id = can_id_29bit_with_ack & ~_ACK_BIT
+    sender = (base_29bit_id & _SENDER_MASK) >> _SENDER_SHIFT
+    board_id = (base_29bit_id & _BOARD_MASK) >> _BOARD_SHIFT
+    component_type = (base_29bit_id & _COMP_MASK) >> _COMP_SHIFT
+    instance = (base_29bit_id & _INST_MASK) >> _INST_SHIFT
+    return CanIdFields(
+        (can_id_29bit_with_ack & _ACK_BIT) != 0,
+        can_id_29bit_with_ack,
+        base_29bit_id,
+        sender,
+        board_id,
+        component_type,
+        instance,
+        get_sender_name(sender),
+        get_board_name(board_id),
+        get_component_type_name(component_type),
+    )
+
+def decode_can_id(can_id_int_32bit):
+    """
+    Decodes a 32-bit wire CAN ID into a CanIdFields record (same bit layout as
+    parse_can_id_struct) with sender/board/component-type names already resolved.
+    Records are shared and immutable; repeated IDs cost a single dict lookup.
+    """
+    if not isinstance(can_id_int_32bit, int):
+        raise ValueError("CAN ID must be an integer.")
+    fields = _decode_cache.get(can_id_int_32bit)
+    if fields is not None:
+        return fields
+    fields = _decode_uncached(can_id_int_32bit)
+    if len(_decode_cache) < _DECODE_CACHE_MAX_ENTRIES:
+        _decode_cache[can_id_int_32bit] = fields
+    return fields
+
+def _prime_decode_cache():
+    """Pre-populate the decode cache with the wire IDs of every configured CAN component."""
+    for item in config.ALL_COMPONENT_CONFIGS:
+        if "can_id" in item:
+            decode_can_id(item["can_id"] << 3)
+            decode_can_id((item["can_id"] | _ACK_BIT) << 3)
+
+_prime_decode_cache()
+
 if __name__ == '__main__':
     # Test parsing for a non-ACK ID (e.g., Servo status from Servo Board 2)
     # Sender=2, Board=1, Comp=1 (Servo), Inst=8 => 0x02010108 (base 29-bit ID)
@@ -10,6 +10,18 @@ DEFAULT_UI_UPDATE_HZ = 2
 XBEE_POST_CONFIG_DELAY_S = 1.5 # Relevant if AP mode setting was done by app (currently not)
 PERIODIC_BOARD_STATUS_INTERVAL_MS = 3000 # 3 seconds
 
+# Frame decode worker (keeps CAN parsing/logging/caching off the Qt GUI thread and the XBee reader thread)
+XBEE_DECODE_IN_WORKER_THREAD = True # False: decode in whatever thread Qt delivers message_received to (legacy)
+DECODE_QUEUE_CAPACITY = 16384 # Max frames buffered between the XBee reader thread and the decode worker (~3 s of 5 kHz PT data)
+DECODE_QUEUE_OVERFLOW_POLICY = "drop_oldest" # "drop_oldest": discard the stalest queued frame; "block": stall the XBee reader until space frees
+DECODE_QUEUE_BLOCK_TIMEOUT_S = 0.5 # "block" policy only: give up and drop the new frame after waiting this long
+
+# Batched frame delivery: XBeeManager coalesces received CAN payloads and emits them as one
+# frames_received(list) signal instead of one message_received(dict) per packet.
+XBEE_BATCH_DELIVERY_ENABLED = True
+XBEE_BATCH_WINDOW_MS = 20 # Flush a partial batch at least this often
+XBEE_BATCH_MAX_FRAMES = 256 # Flush as soon as this many frames are pending
+
 # Target XBee Radio Addresses for unicast commands via send_command_to_configured_targets
 XBEE_TARGET_RADIO_CONFIG = [
     # ("Coordinator", "0013A2004238A3E3"),
@@ -22,6 +34,34 @@ XBEE_TARGET_ADDRESSES_64BIT = [radio[1] for radio in XBEE_TARGET_RADIO_CONFIG]
 LOG_FILE_NAME = "control_panel_log.txt"
 DATA_LOG_FILE_NAME = "sensor_data_log.csv"
 XBEE_RAW_PACKET_LOG_FILE_NAME = "xbee_raw_packets.log"
+# What the XBee reader thread logs per received packet to XBEE_RAW_PACKET_LOG_FILE_NAME:
+#   "hex"  - packet type + raw frame hex (cheap), "full" - also str(packet) (slow, per-field decode), "off" - nothing
+# The packet archive below keeps the same frames compactly, so the text log is off by default.
+XBEE_RAW_PACKET_LOG_MODE = "off"
+
+# Raw XBee packet archive (packet_archive.py): every received API frame with its timestamp, in rotating
+# segments that are compressed once closed. index.json in the directory lists each segment's time span.
+XBEE_PACKET_ARCHIVE_ENABLED = True
+XBEE_PACKET_ARCHIVE_DIR = "xbee_packet_archive"
+XBEE_PACKET_ARCHIVE_SEGMENT_MAX_BYTES = 64 * 1024 * 1024 # Close a segment at this size...
+XBEE_PACKET_ARCHIVE_SEGMENT_MAX_S = 600 # ...or after this long, whichever comes first
+XBEE_PACKET_ARCHIVE_COMPRESSION = "gzip" # "gzip", "zstd" (needs the zstandard package; falls back to gzip) or "none"
+XBEE_PACKET_ARCHIVE_MAX_TOTAL_BYTES = 4 * 1024 * 1024 * 1024 # Oldest segments are deleted beyond this (0 = no cap)
+
+# Asynchronous logging: each log file (and the console) gets a bounded queue and its own writer
+# thread, so formatting and disk I/O never run in the XBee reader / decode threads.
+ASYNC_LOGGING_ENABLED = True
+LOG_QUEUE_CAPACITY = 50000 # Records per output; when full, new records are dropped and counted (sensor data CSV: the caller waits)
+
+# Binary sensor recorder (sensor_recorder.py). When enabled, decoded samples are written as fixed-width
+# binary records instead of text lines in DATA_LOG_FILE_NAME; export with "python sensor_recorder.py export".
+SENSOR_RECORDER_ENABLED = True
+SENSOR_RECORD_FILE_NAME = "sensor_data.bin" # Channel metadata goes to "<this>.channels.json"
+SENSOR_RECORDER_BUFFER_RECORDS = 65536 # Records per in-memory block (16 bytes each, ~1 MB)
+SENSOR_RECORDER_FLUSH_INTERVAL_S = 1.0 # Write a partly filled block at least this often
+# Also write numeric samples to a channel-partitioned Parquet dataset in this directory (None = off).
+# Needs pyarrow; sensor_plot.py reads the directory directly. Existing recordings: "sensor_recorder.py export --format parquet".
+SENSOR_RECORDER_PARQUET_DIR = None # e.g. "sensor_data.parquet"
 
 # CAN ID Structure
 CAN_ID_ACK_BIT_IN_29BIT_ID = (1 << 28)
@@ -139,6 +179,15 @@ LABJACK_ENABLED = True  # Set to True to enable LabJack, False to disable
 LABJACK_CONNECTION_TYPE = "ANY"  # e.g., "ANY", "USB", "TCP" (for network devices)
 LABJACK_IDENTIFIER = "ANY"      # e.g., "ANY", specific serial number, or IP address
 LABJACK_SAMPLING_INTERVAL_MS = 10  # Read LabJack data every 100ms (10 Hz)
+# "stream": the device clocks scans of all load cell channels (eStreamStart) and a background
+#           thread (labjack_stream.py) records every scan; the UI shows the latest one.
+# "poll":   one eReadName per channel every LABJACK_SAMPLING_INTERVAL_MS from a QTimer on the GUI thread.
+LABJACK_ACQUISITION_MODE = "stream"
+LABJACK_STREAM_SCAN_RATE_HZ = 200  # Scans/s (each scan reads every diff pair). Check the T7's stream limits for the ±0.01V range before raising
+LABJACK_STREAM_SCANS_PER_READ = 20  # Scans returned per eStreamRead; rate / this = blocks per second (10 here)
+LABJACK_STREAM_SETTLING_US = 0  # 0 = device default (auto)
+LABJACK_STREAM_RESOLUTION_INDEX = 0  # 0 = device default
+LABJACK_USE_MOCK_LJM = False  # True: use labjack_mock.MockLjm (synthetic load cell data, no device needed)
 
 # Define the analog input pairs for your load cells on the LabJack.
 # Format: (Positive Channel Name, Negative Channel Name Part for eWriteName)
@@ -219,6 +268,19 @@ if LABJACK_ENABLED and 'lj_lc_config_item' in locals():
     if lj_lc_config_item['name'] not in COMPONENT_CONFIG_BY_NAME:
         COMPONENT_CONFIG_BY_NAME[lj_lc_config_item['name']] = lj_lc_config_item
 
+# Routing indexes used by data_processor's message router (built once, O(1) per frame)
+# PT data messages are matched on (sender name, message instance), not on the PT's own can_id.
+PT_CONFIG_BY_SENDER_INSTANCE = {} # Key: (data_message_sender_name, data_message_instance_id)
+for _pt_conf in PT_LOOKUP_TABLE:
+    PT_CONFIG_BY_SENDER_INSTANCE.setdefault(
+        (_pt_conf.get("data_message_sender_name"), _pt_conf.get("data_message_instance_id")), _pt_conf)
+
+# Servo fallback: servos hosted on each board, in ALL_COMPONENTS_LOOKUP order.
+SERVO_CONFIGS_BY_BOARD = {} # Key: board_id
+for (_board_id, _, _), _comp_conf in ALL_COMPONENTS_LOOKUP.items():
+    if _comp_conf.get("type") == "Servo":
+        SERVO_CONFIGS_BY_BOARD.setdefault(_board_id, []).append(_comp_conf)
+
 
 # Named Commands (for UI buttons etc.)
 NAMED_COMMANDS = {
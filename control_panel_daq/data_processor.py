@@ -3,13 +3,23 @@ from PySide6.QtCore import QObject, Signal, QTimer, Slot
 import time
 import struct
 
+import numpy as np
+
 import config # Imports the updated config.py
+import bulk_decoder
 import can_parser
+from message_router import MessageRouter, RoutedFrame
 from logger_setup import app_logger, sensor_data_logger
+from sensor_recorder import SensorRecorder
+from labjack_stream import LabJackStreamEngine, summed_load_lbs
 
 # Attempt to import LabJack library
 
-from labjack import ljm
+if config.LABJACK_USE_MOCK_LJM:
+    from labjack_mock import MockLjm
+    ljm = MockLjm() # Synthetic load cell data, no device needed
+else:
+    from labjack import ljm
 LJM_AVAILABLE = True
 
 class DataProcessor(QObject):
@@ -25,10 +35,26 @@ class DataProcessor(QObject):
     ui_update_servos_power_status = Signal(str, bool, str, str)
     ui_update_breakwire_status = Signal(str, int, str, str)
 
+    BULK_PT_MIN_FRAMES = 32 # Batches this large decode their PT frames in bulk; below it NumPy setup costs more than it saves
+
 
     def __init__(self, parent=None):
         super().__init__(parent)
         self._data_cache = {}
+        self._component_handlers = {
+            "Servo": self._handle_servo_component,
+            "Thermocouple": self._handle_thermocouple_component,
+            "LoadCell": self._handle_loadcell_component,
+            "Heater": self._handle_heater_component,
+        }
+        self.message_router = self._build_message_router()
+
+        # Decoded samples go to the binary recorder when enabled, otherwise to the CSV sensor_data_logger
+        self.sensor_recorder = None
+        if config.SENSOR_RECORDER_ENABLED:
+            self.sensor_recorder = SensorRecorder()
+            self.sensor_recorder.start()
+
         self._ui_update_timer = QTimer(self)
         self._ui_update_timer.timeout.connect(self._on_ui_update_timer_timeout)
         self.set_ui_update_frequency(config.DEFAULT_UI_UPDATE_HZ)
@@ -36,10 +62,15 @@ class DataProcessor(QObject):
         # LabJack Integration
         self.labjack_handle = None
         self._labjack_timer = None
+        self._labjack_stream = None
+        self._labjack_stream_mode = config.LABJACK_ACQUISITION_MODE == "stream"
+        if config.LABJACK_ACQUISITION_MODE not in ("stream", "poll"):
+            app_logger.warning(f"Unknown LABJACK_ACQUISITION_MODE '{config.LABJACK_ACQUISITION_MODE}'. Using 'poll'.")
         if config.LABJACK_ENABLED:
             if LJM_AVAILABLE and ljm:
-                self._labjack_timer = QTimer(self)
-                self._labjack_timer.timeout.connect(self._read_labjack_data_slot)
+                if not self._labjack_stream_mode:
+                    self._labjack_timer = QTimer(self)
+                    self._labjack_timer.timeout.connect(self._read_labjack_data_slot)
                 self._initialize_labjack()
             else:
                 log_msg = "LabJack LJM library not found, but LabJack integration is enabled in config. LabJack will be disabled."
@@ -66,7 +97,7 @@ class DataProcessor(QObject):
 
 
     def _initialize_labjack(self):
-        if not (LJM_AVAILABLE and config.LABJACK_ENABLED and ljm and self._labjack_timer):
+        if not (LJM_AVAILABLE and config.LABJACK_ENABLED and ljm and (self._labjack_timer or self._labjack_stream_mode)):
             app_logger.info("Skipping LabJack initialization (not enabled, LJM not available, or timer not created).")
             return
         try:
@@ -85,11 +116,14 @@ class DataProcessor(QObject):
             self.log_message.emit(log_msg)
 
             self._configure_labjack_channels()
-            self._labjack_timer.start(config.LABJACK_SAMPLING_INTERVAL_MS)
-            self.log_message.emit(f"LabJack configured and polling started at {config.LABJACK_SAMPLING_INTERVAL_MS}ms interval.")
+            if self._labjack_stream_mode:
+                self._start_labjack_stream()
+            else:
+                self._labjack_timer.start(config.LABJACK_SAMPLING_INTERVAL_MS)
+                self.log_message.emit(f"LabJack configured and polling started at {config.LABJACK_SAMPLING_INTERVAL_MS}ms interval.")
 
         except ljm.LJMError as e:
-            self.labjack_handle = None
+            self._release_labjack_handle()
             err_msg = f"Failed to open or configure LabJack: {e} (Code: {e.errorCode})"
             app_logger.error(err_msg)
             self.log_message.emit(f"Error: LabJack connection failed: {str(e)}")
@@ -97,7 +131,7 @@ class DataProcessor(QObject):
             if self._labjack_timer and self._labjack_timer.isActive():
                 self._labjack_timer.stop()
         except Exception as e:
-            self.labjack_handle = None
+            self._release_labjack_handle()
             err_msg = f"An unexpected error occurred during LabJack initialization: {e}"
             app_logger.error(err_msg)
             self.log_message.emit(f"Error: Unexpected LabJack initialization error: {str(e)}")
@@ -105,6 +139,13 @@ class DataProcessor(QObject):
             if self._labjack_timer and self._labjack_timer.isActive():
                 self._labjack_timer.stop()
 
+    def _release_labjack_handle(self):
+        """Closes a handle left open by a failed initialization (e.g. the device refused the stream)."""
+        if self.labjack_handle is not None:
+            try: ljm.close(self.labjack_handle)
+            except Exception as close_exc: app_logger.error(f"Error closing LabJack handle after failed initialization: {close_exc}")
+        self.labjack_handle = None
+
     def _configure_labjack_channels(self):
         if not self.labjack_handle or not ljm:
             app_logger.warning("Cannot configure LabJack channels, no handle or LJM library.")
@@ -181,7 +222,7 @@ class DataProcessor(QObject):
                 # app_logger.debug(f"LabJack Read: Voltages={diff_voltages}, ScaledIndividual={scaled_diffs}, TotalSummedWeight={total_scaled_weight:.2f} {config.LABJACK_LOADCELL_UNIT}")
                 
                 lc_log_name = config.LABJACK_SUMMED_LC_NAME
-                sensor_data_logger.info(f"{lc_log_name},{total_scaled_weight:.2f},{config.LABJACK_LOADCELL_UNIT},LabJackDAQ,LoadCellSummed,0") # Instance 0 for summed
+                self._log_sensor_sample(timestamp, lc_log_name, total_scaled_weight, config.LABJACK_LOADCELL_UNIT, "LabJackDAQ", "LoadCellSummed", 0) # Instance 0 for summed
 
                 # Update cache for UI, using the configured name and type "LoadCell"
                 # The UI configuration will determine how it's displayed based on its entry in ALL_COMPONENT_CONFIGS
@@ -227,10 +268,70 @@ class DataProcessor(QObject):
             if self._labjack_timer and self._labjack_timer.isActive(): self._labjack_timer.stop() # Stop timer on general error too
 
 
+    # ------------------------------------------------------------------ #
+    # LabJack stream mode
+    # ------------------------------------------------------------------ #
+    def _start_labjack_stream(self):
+        """Starts eStreamStart acquisition of the diff pairs. LJMError propagates to _initialize_labjack."""
+        if not getattr(config, 'LABJACK_LOADCELL_DIFF_PAIRS', None):
+            app_logger.warning("LabJack stream mode selected but no LABJACK_LOADCELL_DIFF_PAIRS configured. Not streaming.")
+            return
+        # Resolved once here; the polling path looks these up on every read.
+        lj_lc_conf = next((c for c in config.ALL_COMPONENT_CONFIGS
+                           if c.get("name") == config.LABJACK_SUMMED_LC_NAME and c.get("source_type") == "LabJack"), None) or {}
+        self._labjack_ui_unit = lj_lc_conf.get("unit", config.LABJACK_LOADCELL_UNIT)
+        self._labjack_ui_board_name = lj_lc_conf.get("parent_board_name", "LabJack DAQ")
+
+        self._labjack_stream = LabJackStreamEngine(
+            ljm, self.labjack_handle,
+            [pos_ch for pos_ch, _ in config.LABJACK_LOADCELL_DIFF_PAIRS],
+            config.LABJACK_STREAM_SCAN_RATE_HZ, config.LABJACK_STREAM_SCANS_PER_READ,
+            on_block=self._on_labjack_stream_block, on_error=self._on_labjack_stream_error,
+            settling_us=config.LABJACK_STREAM_SETTLING_US, resolution_index=config.LABJACK_STREAM_RESOLUTION_INDEX)
+        self._labjack_stream.start()
+        self.log_message.emit(f"LabJack configured and streaming at {self._labjack_stream.scan_rate_hz:g} scans/s "
+                              f"({config.LABJACK_STREAM_SCANS_PER_READ} scans per read).")
+
+    def _on_labjack_stream_block(self, timestamps, voltages):
+        """Runs on the stream thread: every scan goes to the recorder, the latest one to the UI cache."""
+        totals = summed_load_lbs(voltages)
+        lc_name = config.LABJACK_SUMMED_LC_NAME
+        recorder = self.sensor_recorder # Local copy: close_sensor_recorder may run on another thread at shutdown
+        if recorder is not None:
+            recorder.log_block(lc_name, totals, config.LABJACK_LOADCELL_UNIT, "LabJackDAQ", "LoadCellSummed", 0, timestamps)
+        else:
+            for timestamp, total in zip(timestamps.tolist(), totals.tolist()):
+                self._log_sensor_sample(timestamp, lc_name, total, config.LABJACK_LOADCELL_UNIT, "LabJackDAQ", "LoadCellSummed", 0)
+
+        finite = np.flatnonzero(np.isfinite(totals))
+        if not len(finite):
+            return # Whole block lost to a stream gap; keep showing the last good value
+        latest = finite[-1]
+        self._data_cache[f"{lc_name}_LoadCell"] = {
+            "name": lc_name,
+            "value_str": f"{totals[latest]:.1f}",
+            "unit": self._labjack_ui_unit,
+            "board": self._labjack_ui_board_name,
+            "type": "LoadCell",
+            "ts": float(timestamps[latest])
+        }
+
+    def _on_labjack_stream_error(self, error):
+        """Runs on the stream thread after a connection-lost error; the engine has already stopped reading."""
+        app_logger.warning(f"LabJack connection issue (Code: {error.errorCode}). Stream stopped; closing handle.")
+        if self.labjack_handle:
+            try: ljm.close(self.labjack_handle)
+            except Exception as close_exc: app_logger.error(f"Error closing already troubled LabJack handle: {close_exc}")
+            self.labjack_handle = None
+        self.log_message.emit(f"Error: LabJack connection lost (Code: {error.errorCode}). Please check device.")
+
     def close_labjack(self):
         if hasattr(self, '_labjack_timer') and self._labjack_timer and self._labjack_timer.isActive():
             self._labjack_timer.stop()
             app_logger.info("LabJack timer stopped.")
+        if self._labjack_stream is not None:
+            self._labjack_stream.stop() # Reader thread and device stream, before the handle goes away
+            self._labjack_stream = None
         if self.labjack_handle and ljm:
             try:
                 app_logger.info("Closing LabJack connection handle.")
@@ -278,297 +379,395 @@ class DataProcessor(QObject):
         # app_logger.debug(f"ADC_to_PSI: ADC={raw_adc_value}, m(gain)={m_coefficient}, b(offset)={b_coefficient} -> PSI={pressure_psi:.2f} for {pt_config.get('name', 'Unknown PT')}")
         return pressure_psi
 
-    @Slot(dict)
+    # ------------------------------------------------------------------ #
+    # Incoming CAN message routing
+    # ------------------------------------------------------------------ #
+    def _build_message_router(self):
+        """Registers a handler per CAN message type. Unhandled frames fall back to the component lookup."""
+        router = MessageRouter(fallback=self._handle_component_message)
+        router.register(config.MESSAGE_TYPE["MSG_TYPE_BOARD_STATUS_RESPONSE"], self._handle_board_status_response)
+        router.register(config.MESSAGE_TYPE["MSG_TYPE_ACK_GENERIC"], self._handle_generic_ack)
+        router.register(config.MESSAGE_TYPE["MSG_TYPE_IGNITER_STATUS"], self._handle_igniter_status)
+        router.register(config.MESSAGE_TYPE["MSG_TYPE_AUTO_MODE_STATUS"], self._handle_auto_mode_status)
+        router.register(config.MESSAGE_TYPE["MSG_TYPE_SERVOS_POWER_STATUS"], self._handle_servos_power_status)
+        router.register(config.MESSAGE_TYPE["MSG_TYPE_BREAKWIRE_STATUS"], self._handle_breakwire_status)
+        router.register(config.MESSAGE_TYPE["MSG_TYPE_PC_STATE_STATUS"], self._handle_pc_state_status)
+        router.register(config.MESSAGE_TYPE["MSG_TYPE_PRESSURE"], self._handle_pressure)
+        return router
+
     @Slot(dict)
     def process_incoming_xbee_message(self, message_info):
-        timestamp = time.time()
-        can_payload_bytes = message_info['can_payload']
-        source_xbee_addr = message_info['source_addr_64']
+        # 'timestamp' is the receive time set by XBeeManager; frames without one are stamped now.
+        timestamp = message_info.get('timestamp')
+        frame = self._decode_frame(time.time() if timestamp is None else timestamp,
+                                   message_info['can_payload'], message_info['source_addr_64'])
+        if frame is None:
+            return
+        self.board_connectivity_update.emit(frame.can_id.sender_id, frame.can_id.sender_name, frame.timestamp)
+        if not self.message_router.dispatch(frame):
+            self._log_unhandled_message(frame)
 
+    @Slot(list)
+    def process_incoming_xbee_batch(self, frames):
+        """
+        Processes a batch from XBeeManager.frames_received: (timestamp, can_payload, source_addr_64) tuples.
+        Frames are routed in arrival order; board connectivity is emitted once per sender per batch
+        (with that sender's latest timestamp) rather than once per frame. In batches of at least
+        BULK_PT_MIN_FRAMES, configured PT frames are decoded together first (_handle_pt_frames_bulk).
+        """
+        last_seen_by_sender = {}
+        bulk_handled = self._handle_pt_frames_bulk(frames, last_seen_by_sender) if len(frames) >= self.BULK_PT_MIN_FRAMES else ()
+        dispatch = self.message_router.dispatch
+        for i, (timestamp, can_payload_bytes, source_xbee_addr) in enumerate(frames):
+            if i in bulk_handled:
+                continue
+            frame = self._decode_frame(timestamp, can_payload_bytes, source_xbee_addr)
+            if frame is None:
+                continue
+            seen = last_seen_by_sender.get(frame.can_id.sender_id)
+            if seen is None or timestamp >= seen[1]:
+                last_seen_by_sender[frame.can_id.sender_id] = (frame.can_id.sender_name, timestamp)
+            if not dispatch(frame):
+                self._log_unhandled_message(frame)
+        for sender_id, (sender_name, timestamp) in last_seen_by_sender.items():
+            self.board_connectivity_update.emit(sender_id, sender_name, timestamp)
+
+    def _handle_pt_frames_bulk(self, frames, last_seen_by_sender):
+        """
+        Decodes the PT frames of a batch with bulk_decoder.decode_pt_frames (one NumPy pass instead
+        of struct.unpack + convert_pt_adc_to_psi per frame), caches each sensor's latest value and
+        logs every reading, as _handle_pressure would. Returns the set of frame indexes handled;
+        unconfigured PTs and bad calibrations are left to the router, which logs why. These rows
+        are logged before the batch's other frames, so within one batch (<= XBEE_BATCH_MAX_FRAMES
+        frames, ~XBEE_BATCH_WINDOW_MS) the log is not strictly in time order; sensor_plot's time
+        index does not need it to be.
+        """
+        readings = bulk_decoder.decode_pt_frames([payload for _, payload, _ in frames])
+        ok = (readings.channel >= 0) & np.isfinite(readings.psi)
+        if not ok.any():
+            return ()
+        frame_index = readings.frame_index[ok]
+        timestamps = np.array([frames[i][0] for i in frame_index.tolist()], dtype=np.float64)
+        channels, sender_ids, instance_ids = readings.channel[ok], readings.sender_id[ok], readings.instance_id[ok]
+        adc, psi = readings.adc[ok], readings.psi[ok]
+        order = np.argsort(channels, kind="stable") # Arrival order within each sensor
+        starts = np.flatnonzero(np.r_[True, channels[order][1:] != channels[order][:-1]])
+        recorder = self.sensor_recorder
+        for start, end in zip(starts.tolist(), np.r_[starts[1:], len(order)].tolist()):
+            rows = order[start:end]
+            last = int(rows[-1])
+            name = bulk_decoder.PT_CHANNEL_NAMES[channels[last]]
+            unit = bulk_decoder.PT_CHANNEL_UNITS[channels[last]]
+            sender_name = can_parser.SENDER_NAME_BY_ID[sender_ids[last]]
+            instance_id = int(instance_ids[last])
+            self._data_cache[f"{name}_PressureTransducer"] = {
+                "name": name, "value_str": f"{psi[last]:.2f}", "unit": unit,
+                "board": sender_name, "type": "PressureTransducer", "ts": float(timestamps[last])
+            }
+            if recorder is not None:
+                recorder.log_block(name, psi[rows], unit, sender_name, "PressureTransducer", instance_id, timestamps[rows], adc[rows])
+            else:
+                for ts, value, raw in zip(timestamps[rows].tolist(), psi[rows].tolist(), adc[rows].tolist()):
+                    self._log_sensor_sample(ts, name, value, unit, sender_name, "PressureTransducer", instance_id, raw=raw)
+            latest_ts = float(timestamps[rows].max())
+            seen = last_seen_by_sender.get(int(sender_ids[last]))
+            if seen is None or latest_ts >= seen[1]:
+                last_seen_by_sender[int(sender_ids[last])] = (sender_name, latest_ts)
+        return set(frame_index.tolist())
+
+    def _decode_frame(self, timestamp, can_payload_bytes, source_xbee_addr):
+        """Splits an XBee payload into CAN ID + data and returns a RoutedFrame, or None if it can't be parsed."""
         if len(can_payload_bytes) < 4: # Minimum for a CAN ID
             app_logger.warning(f"Received XBee payload from {source_xbee_addr} too short for CAN ID: {can_payload_bytes.hex()}")
-            return
+            return None
 
         can_id_32bit_int = int.from_bytes(can_payload_bytes[:4], 'big')
-        can_data_bytes = can_payload_bytes[4:]
 
         try:
-            parsed_id_fields = can_parser.parse_can_id_struct(can_id_32bit_int)
+            parsed_id_fields = can_parser.decode_can_id(can_id_32bit_int)
         except ValueError as e:
             app_logger.error(f"Error parsing CAN ID 0x{can_id_32bit_int:08X} from XBee {source_xbee_addr}: {e}")
-            return
+            return None
+
+        return RoutedFrame(parsed_id_fields, can_payload_bytes[4:], source_xbee_addr, timestamp)
+
+    # --- System status messages (reported by the sender, e.g. the pad controller) ---
+    def _handle_board_status_response(self, frame):
+        reporting_board_id = frame.can_id.board_id
+        reporting_board_name = frame.can_id.board_name
+        self.board_connectivity_update.emit(reporting_board_id, reporting_board_name, frame.timestamp)
+        status_data_dict = { "raw_payload_hex": frame.data.hex() }
+        log_msg = (f"BOARD_STATUS_RESPONSE from Board ID 0x{reporting_board_id:02X} ({reporting_board_name}) "
+                   f"(via XBee {frame.source_addr}): {status_data_dict}")
+        app_logger.info(log_msg); self.log_message.emit(log_msg)
+        self.ui_update_board_detailed_status.emit(reporting_board_id, reporting_board_name, frame.source_addr, status_data_dict)
+        return True
+
+    def _handle_generic_ack(self, frame):
+        can_id, can_data_bytes = frame.can_id, frame.data
+        log_msg = (f"GENERIC_ACK received. CAN_ID Board field (ACK sender): {can_id.board_name} (0x{can_id.board_id:02X}). "
+                   f"CAN_ID Original Sender/Context field: {can_id.sender_name} (0x{can_id.sender_id:02X}). "
+                   f"Payload: {can_data_bytes.hex() if can_data_bytes else 'None'}")
+        app_logger.info(log_msg)
+        self.log_message.emit(log_msg)
+        return not can_data_bytes # Handled if it's a simple ACK with no data; otherwise try the component lookup
+
+    def _handle_igniter_status(self, frame):
+        reporter = frame.can_id.sender_name
+        if len(frame.data) < 1:
+            app_logger.warning(f"Igniter Status data too short from {reporter}: {frame.data.hex()}")
+            return False
+        state_val = frame.data[0]; state_str = config.IGNITER_STATES.get(state_val, f"Unknown ({state_val})"); is_active = (state_val == 2) # 2 is 'Activated'
+        self.ui_update_igniter_status.emit("Igniter", is_active, state_str, reporter)
+        app_logger.info(f"IGNITER_STATUS from {reporter}: {state_str}")
+        return True
+
+    def _handle_auto_mode_status(self, frame):
+        reporter = frame.can_id.sender_name
+        if len(frame.data) < 1:
+            app_logger.warning(f"Auto Mode Status data too short from {reporter}: {frame.data.hex()}")
+            return False
+        state_val = frame.data[0]; state_str = config.ON_OFF_STATES.get(state_val, f"Unknown ({state_val})"); is_on = (state_val == 1)
+        self.ui_update_auto_mode_status.emit("AutoMode", is_on, state_str, reporter)
+        app_logger.info(f"AUTO_MODE_STATUS from {reporter}: {state_str}")
+        return True
+
+    def _handle_servos_power_status(self, frame):
+        reporter = frame.can_id.sender_name
+        if len(frame.data) < 1:
+            app_logger.warning(f"Servos Power Status data too short from {reporter}: {frame.data.hex()}")
+            return False
+        state_val = frame.data[0]; state_str = config.ON_OFF_STATES.get(state_val, f"Unknown ({state_val})"); is_on = (state_val == 1)
+        self.ui_update_servos_power_status.emit("ServosPower", is_on, state_str, reporter)
+        app_logger.info(f"SERVOS_POWER_STATUS from {reporter}: {state_str}")
+        return True
+
+    def _handle_breakwire_status(self, frame):
+        reporter = frame.can_id.sender_name
+        if len(frame.data) < 1:
+            app_logger.warning(f"Breakwire Status data too short from {reporter}: {frame.data.hex()}")
+            return False
+        state_val = frame.data[0]; state_str = config.BREAKWIRE_STATES.get(state_val, f"Unknown ({state_val})")
+        self.ui_update_breakwire_status.emit("Breakwire", state_val, state_str, reporter)
+        app_logger.info(f"BREAKWIRE_STATUS from {reporter}: {state_str} (Raw: {state_val})")
+        return True
+
+    def _handle_pc_state_status(self, frame):
+        reporter = frame.can_id.sender_name
+        if len(frame.data) < 1:
+            app_logger.warning(f"PC State Status data too short from {reporter}: {frame.data.hex()}")
+            return False
+        state_val = frame.data[0]; state_str = config.PC_STATES.get(state_val, f"Unknown ({state_val})")
+        self.ui_update_pc_state_status.emit("PCState", state_val, state_str, reporter)
+        app_logger.info(f"PC_STATE_STATUS from {reporter}: {state_str} ({state_val})")
+        return True
+
+    # --- Sensor data messages ---
+    def _handle_pressure(self, frame):
+        sender_name, instance_id, can_data_bytes = frame.can_id.sender_name, frame.can_id.instance_id, frame.data
+        if len(can_data_bytes) != 2:
+            app_logger.warning(f"PT message from {sender_name} (Inst {instance_id}) incorrect data len. Expected 2, got {len(can_data_bytes)}. Data: {can_data_bytes.hex()}")
+            return False
+        try:
+            raw_adc_value = struct.unpack('>H', can_data_bytes)[0]
+            value_str, unit = "N/A", "PSI"
+            pressure_psi = float('nan')
 
-        is_ack = parsed_id_fields["is_ack"] # Added from first script's context, useful for generic ACK logging
-        sender_id_from_can = parsed_id_fields["sender_id"]
-        sender_name = can_parser.get_sender_name(sender_id_from_can)
-        board_id_in_can_field = parsed_id_fields["board_id"]
-        board_name_in_can_field = can_parser.get_board_name(board_id_in_can_field)
-        component_type_numeric = parsed_id_fields["component_type_id"]
-        instance_id = parsed_id_fields["instance_id"]
-        component_type_name_from_parser = can_parser.get_component_type_name(component_type_numeric)
-        
-        board_context_for_component_id = sender_id_from_can
-        board_context_for_component_name = sender_name
-        
-        self.board_connectivity_update.emit(sender_id_from_can, sender_name, timestamp)
-        msg_handled = False
-        reporting_entity_name_for_system_status = sender_name
-
-        # --- Specific CAN Message Type Handling (from second script) ---
-        if component_type_numeric == config.MESSAGE_TYPE["MSG_TYPE_BOARD_STATUS_RESPONSE"]:
-            reporting_board_id = board_id_in_can_field
-            reporting_board_name = can_parser.get_board_name(reporting_board_id) # Ensure name is fetched correctly
-            self.board_connectivity_update.emit(reporting_board_id, reporting_board_name, timestamp)
-            status_data_dict = { "raw_payload_hex": can_data_bytes.hex() }
-            log_msg = (f"BOARD_STATUS_RESPONSE from Board ID 0x{reporting_board_id:02X} ({reporting_board_name}) "
-                       f"(via XBee {source_xbee_addr}): {status_data_dict}")
-            app_logger.info(log_msg); self.log_message.emit(log_msg)
-            self.ui_update_board_detailed_status.emit(reporting_board_id, reporting_board_name, source_xbee_addr, status_data_dict)
-            msg_handled = True
-        elif component_type_numeric == config.MESSAGE_TYPE["MSG_TYPE_ACK_GENERIC"]: # Added from first script for explicit handling
-            acked_by_board_id = board_id_in_can_field
-            acked_by_board_name = board_name_in_can_field
-            log_msg = (f"GENERIC_ACK received. CAN_ID Board field (ACK sender): {acked_by_board_name} (0x{acked_by_board_id:02X}). "
-                       f"CAN_ID Original Sender/Context field: {board_context_for_component_name} (0x{board_context_for_component_id:02X}). "
-                       f"Payload: {can_data_bytes.hex() if can_data_bytes else 'None'}")
-            app_logger.info(log_msg)
-            self.log_message.emit(log_msg)
-            if not can_data_bytes: msg_handled = True # Mark as handled if it's a simple ACK with no data
-        elif component_type_numeric == config.MESSAGE_TYPE["MSG_TYPE_IGNITER_STATUS"]:
-            if len(can_data_bytes) >= 1:
-                state_val = can_data_bytes[0]; state_str = config.IGNITER_STATES.get(state_val, f"Unknown ({state_val})"); is_active = (state_val == 2) # 2 is 'Activated'
-                self.ui_update_igniter_status.emit("Igniter", is_active, state_str, reporting_entity_name_for_system_status)
-                app_logger.info(f"IGNITER_STATUS from {reporting_entity_name_for_system_status}: {state_str}"); msg_handled = True
-            else: app_logger.warning(f"Igniter Status data too short from {reporting_entity_name_for_system_status}: {can_data_bytes.hex()}")
-        elif component_type_numeric == config.MESSAGE_TYPE["MSG_TYPE_AUTO_MODE_STATUS"]:
-            if len(can_data_bytes) >= 1:
-                state_val = can_data_bytes[0]; state_str = config.ON_OFF_STATES.get(state_val, f"Unknown ({state_val})"); is_on = (state_val == 1)
-                self.ui_update_auto_mode_status.emit("AutoMode", is_on, state_str, reporting_entity_name_for_system_status)
-                app_logger.info(f"AUTO_MODE_STATUS from {reporting_entity_name_for_system_status}: {state_str}"); msg_handled = True
-            else: app_logger.warning(f"Auto Mode Status data too short from {reporting_entity_name_for_system_status}: {can_data_bytes.hex()}") # Added detail
-        elif component_type_numeric == config.MESSAGE_TYPE["MSG_TYPE_SERVOS_POWER_STATUS"]:
-            if len(can_data_bytes) >= 1:
-                state_val = can_data_bytes[0]; state_str = config.ON_OFF_STATES.get(state_val, f"Unknown ({state_val})"); is_on = (state_val == 1)
-                self.ui_update_servos_power_status.emit("ServosPower", is_on, state_str, reporting_entity_name_for_system_status)
-                app_logger.info(f"SERVOS_POWER_STATUS from {reporting_entity_name_for_system_status}: {state_str}"); msg_handled = True
-            else: app_logger.warning(f"Servos Power Status data too short from {reporting_entity_name_for_system_status}: {can_data_bytes.hex()}") # Added detail
-        elif component_type_numeric == config.MESSAGE_TYPE["MSG_TYPE_BREAKWIRE_STATUS"]:
-            if len(can_data_bytes) >= 1:
-                state_val = can_data_bytes[0]; state_str = config.BREAKWIRE_STATES.get(state_val, f"Unknown ({state_val})")
-                self.ui_update_breakwire_status.emit("Breakwire", state_val, state_str, reporting_entity_name_for_system_status)
-                app_logger.info(f"BREAKWIRE_STATUS from {reporting_entity_name_for_system_status}: {state_str} (Raw: {state_val})"); msg_handled = True # Added detail
-            else: app_logger.warning(f"Breakwire Status data too short from {reporting_entity_name_for_system_status}: {can_data_bytes.hex()}") # Added detail
-        elif component_type_numeric == config.MESSAGE_TYPE["MSG_TYPE_PC_STATE_STATUS"]:
-            if len(can_data_bytes) >= 1:
-                state_val = can_data_bytes[0]; state_str = config.PC_STATES.get(state_val, f"Unknown ({state_val})")
-                self.ui_update_pc_state_status.emit("PCState", state_val, state_str, reporting_entity_name_for_system_status)
-                app_logger.info(f"PC_STATE_STATUS from {reporting_entity_name_for_system_status}: {state_str} ({state_val})"); msg_handled = True # Added detail
-            else: app_logger.warning(f"PC State Status data too short from {reporting_entity_name_for_system_status}: {can_data_bytes.hex()}") # Added detail
-        elif component_type_numeric == config.MESSAGE_TYPE["MSG_TYPE_PRESSURE"]:
-            # Using the more detailed PT handling from the second script
-            if len(can_data_bytes) == 2:
+            found_pt_config = config.PT_CONFIG_BY_SENDER_INSTANCE.get((sender_name, instance_id))
+
+            actual_sensor_name_for_ui = f"PT_{sender_name}_I{instance_id}"
+            if found_pt_config:
+                actual_sensor_name_for_ui = found_pt_config.get("name", actual_sensor_name_for_ui)
+                unit = found_pt_config.get("unit", "PSI")
                 try:
-                    raw_adc_value = struct.unpack('>H', can_data_bytes)[0]
-                    value_str, unit = "N/A", "PSI"
-                    pressure_psi = float('nan')
-
-                    found_pt_config = next((pt_conf for pt_conf in config.PT_LOOKUP_TABLE
-                                            if pt_conf.get("data_message_sender_name") == board_context_for_component_name and
-                                               pt_conf.get("data_message_instance_id") == instance_id), None)
-                    
-                    actual_sensor_name_for_ui = f"PT_{board_context_for_component_name}_I{instance_id}"
-                    if found_pt_config:
-                        actual_sensor_name_for_ui = found_pt_config.get("name", actual_sensor_name_for_ui)
-                        unit = found_pt_config.get("unit", "PSI")
-                        try:
-                            pressure_psi = self.convert_pt_adc_to_psi(raw_adc_value, found_pt_config)
-                            value_str = f"{pressure_psi:.2f}"
-                        except ValueError as e:
-                            app_logger.error(f"Error converting ADC for {actual_sensor_name_for_ui}: {e}")
-                            value_str = "Conv. Error"
-                    else:
-                        app_logger.warning(f"PT msg from {board_context_for_component_name} (Inst {instance_id}) - no specific PT config found. Raw ADC: {raw_adc_value}")
-                        value_str = f"Raw: {raw_adc_value}"
-
-                    cache_key = f"{actual_sensor_name_for_ui}_PressureTransducer"
-                    self._data_cache[cache_key] = {
-                        "name": actual_sensor_name_for_ui, "value_str": value_str, "unit": unit,
-                        "board": board_context_for_component_name, "type": "PressureTransducer", "ts": timestamp
-                    }
-                    log_psi_val_str = f"{pressure_psi:.2f}" if not (isinstance(pressure_psi, float) and pressure_psi != pressure_psi) else "NaN"
-                    sensor_data_logger.info(f"{actual_sensor_name_for_ui},{log_psi_val_str},{unit},{board_context_for_component_name},PressureTransducer,{instance_id}")
-                    # app_logger.info(f"Processed {component_type_name_from_parser} from {board_context_for_component_name} "
-                    #                  f"(Message Inst: {instance_id}) -> {actual_sensor_name_for_ui}: "
-                    #                  f"{value_str} {unit} (Raw ADC: {raw_adc_value}, Bytes: {can_data_bytes.hex()})") # More detailed log like script 1
-                    msg_handled = True
-                except struct.error as e:
-                    app_logger.error(f"Error unpacking PT ADC value for {board_context_for_component_name} (Inst {instance_id}): {e}. Data: {can_data_bytes.hex()}")
-                except Exception as e:
-                    app_logger.error(f"General error processing PT message for {board_context_for_component_name} (Inst {instance_id}): {e}. Data: {can_data_bytes.hex()}")
+                    pressure_psi = self.convert_pt_adc_to_psi(raw_adc_value, found_pt_config)
+                    value_str = f"{pressure_psi:.2f}"
+                except ValueError as e:
+                    app_logger.error(f"Error converting ADC for {actual_sensor_name_for_ui}: {e}")
+                    value_str = "Conv. Error"
             else:
-                app_logger.warning(f"PT message from {board_context_for_component_name} (Inst {instance_id}) incorrect data len. Expected 2, got {len(can_data_bytes)}. Data: {can_data_bytes.hex()}")
-
-
-        # Fallback to Generic Component Handling for CAN messages
-        if not msg_handled:
-            # Use the more robust tuple-based lookup for component config (from second script)
-            # Renamed from component_config (script 1) to component_config_can (script 2)
-            component_config_can = can_parser.get_component_info_by_id_tuple(
-                board_context_for_component_id, component_type_numeric, instance_id
-            )
-
-            # ***** REINSTATED SERVO FALLBACK LOGIC (adapted from first script) *****
-            if component_config_can is None and component_type_numeric == config.MESSAGE_TYPE["MSG_TYPE_SERVO"]:
-                app_logger.debug(f"Servo message for Board {board_context_for_component_name} ({board_context_for_component_id}), Inst {instance_id} "
-                                 f"has no exact config match by (Board, Type, Message_Instance). Trying fallback lookup by BoardID only.")
-                found_servo_configs = []
-                # Ensure config.ALL_COMPONENTS_LOOKUP is available and has the expected structure
-                if hasattr(config, 'ALL_COMPONENTS_LOOKUP'):
-                    for key_tuple, config_item_val in config.ALL_COMPONENTS_LOOKUP.items():
-                        # Assuming key_tuple is (board_id, component_type_id_from_config, instance_id_from_config_can_id)
-                        # And config_item_val contains "type": "Servo" and "can_id" for the component
-                        lookup_board_id, _, _ = key_tuple # We only need board_id for this initial filter
-                        if lookup_board_id == board_context_for_component_id and config_item_val.get("type") == "Servo":
-                            found_servo_configs.append(config_item_val)
-                else:
-                    app_logger.warning("config.ALL_COMPONENTS_LOOKUP not found. Cannot perform servo fallback.")
-
-
-                if len(found_servo_configs) == 1:
-                    component_config_can = found_servo_configs[0] # Assign to component_config_can
-                    original_instance_id_in_config = (component_config_can["can_id"] & config.CAN_ID_INSTANCE_MASK) >> config.CAN_ID_INSTANCE_SHIFT
-                    app_logger.info(f"Fallback successful: Mapping Servo message (Board {board_context_for_component_name}, Message Inst {instance_id}) "
-                                    f"to configured Servo '{component_config_can['name']}' (Config Inst {original_instance_id_in_config}).")
-                elif len(found_servo_configs) > 1:
-                    strict_match_found = False
-                    for cfg in found_servo_configs:
-                        cfg_inst_id = (cfg["can_id"] & config.CAN_ID_INSTANCE_MASK) >> config.CAN_ID_INSTANCE_SHIFT
-                        if cfg_inst_id == instance_id: # Compare message instance with config instance
-                            component_config_can = cfg # Assign to component_config_can
-                            strict_match_found = True
-                            app_logger.info(f"Fallback successful (multiple servos, matched instance): Mapping Servo message (Board {board_context_for_component_name}, Message Inst {instance_id}) "
-                                            f"to configured Servo '{component_config_can['name']}' (Config Inst {cfg_inst_id}).")
-                            break
-                    if not strict_match_found:
-                        app_logger.warning(f"Servo message fallback: Found {len(found_servo_configs)} servos for Board {board_context_for_component_name}. "
-                                           f"Message Inst {instance_id} did not uniquely match a configured servo instance. Cannot map.")
-                elif not found_servo_configs: # Check if list is empty (no servos found on that board)
-                    app_logger.warning(f"Servo message fallback failed: No servos configured for Board {board_context_for_component_name} ({board_context_for_component_id}).")
-            # ***** END OF REINSTATED SERVO FALLBACK LOGIC *****
-
-            if component_config_can:
-                comp_name = component_config_can["name"]
-                comp_type_name_from_config = component_config_can["type"]
-                
-                value_str, unit = "N/A", ""
-                processed_value_for_log = None
-                
-                # Determine cache key. For servos, use instance from config CAN ID as per script 1.
-                # For other types, script 2 used a simpler key or message instance.
-                # Let's make it consistent for servos first.
-                cache_key_instance_part = ""
-                if "can_id" in component_config_can and comp_type_name_from_config == "Servo": # As per script 1 for servos
-                    config_inst_id_from_can = (component_config_can["can_id"] & config.CAN_ID_INSTANCE_MASK) >> config.CAN_ID_INSTANCE_SHIFT
-                    cache_key = f"{comp_name}_{comp_type_name_from_config}_{config_inst_id_from_can}"
-                else: # Defaulting to script 2's simpler key for non-servos or if can_id missing
-                    cache_key = f"{comp_name}_{comp_type_name_from_config}"
-                    # Or if instance_id from message is preferred for UI distinction for other types:
-                    # cache_key = f"{comp_name}_{comp_type_name_from_config}_{instance_id}"
-
-
-                if comp_type_name_from_config == "Servo":
-                    if len(can_data_bytes) >= 1:
-                        state_val = can_data_bytes[0]
-                        value_str = config.SERVO_STATES.get(state_val, f"Raw State: {state_val}")
-                        processed_value_for_log = value_str
-                        self.ui_update_servo.emit(comp_name, value_str, board_context_for_component_name, comp_type_name_from_config)
-                        # UNCOMMENTED AND ADJUSTED CACHING for servo as in script 1
-                        self._data_cache[cache_key] = {"name": comp_name, "value_str": value_str, "board": board_context_for_component_name, "type": comp_type_name_from_config, "ts": timestamp}
-                        msg_handled = True
-                    else: app_logger.warning(f"Servo {comp_name} (CAN) data too short: {can_data_bytes.hex()}")
-
-                elif comp_type_name_from_config == "Thermocouple":
-                    unit = component_config_can.get('unit', "°C")
-                    if len(can_data_bytes) >= 4:
-                        try:
-                            temperature = struct.unpack('>f', can_data_bytes[:4])[0]
-                            value_str = f"{temperature:.2f}"
-                            processed_value_for_log = temperature
-                            self._data_cache[cache_key] = {"name": comp_name, "value_str": value_str, "unit": unit, "board": board_context_for_component_name, "type": comp_type_name_from_config, "ts": timestamp}
-                            msg_handled = True
-                        except struct.error: app_logger.warning(f"TC {comp_name} (CAN) data invalid format for float: {can_data_bytes[:4].hex()}")
-                    else: app_logger.warning(f"TC {comp_name} (CAN) data too short for float: {can_data_bytes.hex()}")
-                
-                elif comp_type_name_from_config == "LoadCell":
-                    if config.LABJACK_ENABLED and hasattr(config, 'LABJACK_SUMMED_LC_NAME') and comp_name == config.LABJACK_SUMMED_LC_NAME:
-                        app_logger.info(f"Ignoring CAN message for LoadCell '{comp_name}' as it is configured to be sourced from LabJack.")
-                        # msg_handled remains False
-                    else:
-                        unit = component_config_can.get('unit', "lbf")
-                        if len(can_data_bytes) >= 4:
-                             try:
-                                 load_value = struct.unpack('>f', can_data_bytes[:4])[0]
-                                 value_str = f"{load_value:.1f}"
-                                 processed_value_for_log = load_value
-                                 self._data_cache[cache_key] = {"name": comp_name, "value_str": value_str, "unit": unit, "board": board_context_for_component_name, "type": comp_type_name_from_config, "ts": timestamp}
-                                 msg_handled = True
-                             except struct.error: app_logger.warning(f"LC {comp_name} (CAN) data invalid struct for float: {can_data_bytes.hex()}")
-                        else: app_logger.warning(f"LC {comp_name} (CAN) data too short for float: {can_data_bytes.hex()}")
-
-                elif comp_type_name_from_config == "Heater": # Logic from second script, looks reasonable
-                    unit = "Status"
-                    status_byte, current_temp_str, temp_val_for_log_combined = None, "", None # Use a new var for logging combined state
-                    if len(can_data_bytes) >= 1:
-                        status_byte = can_data_bytes[0]
-                        status_str = "ON" if status_byte == 1 else "OFF"
-                        value_str = f"State: {status_str}"
-                        temp_val_for_log_combined = status_str # Log the state string initially
-
-                        if len(can_data_bytes) >= 3:
-                            try:
-                                raw_temp = struct.unpack('>h', can_data_bytes[1:3])[0]
-                                temp_scale_factor = component_config_can.get("temp_scale_factor", 10.0)
-                                current_temp = float(raw_temp) / temp_scale_factor
-                                current_temp_str = f", Temp: {current_temp:.1f}°C"
-                                value_str += current_temp_str
-                                temp_val_for_log_combined += f", Temp: {current_temp:.1f}" # Append temp to logged string
-                            except struct.error: app_logger.warning(f"Heater {comp_name} (CAN) temp data invalid format: {can_data_bytes[1:3].hex()}")
-                        
-                        # processed_value_for_log should be set to the value we want to log for sensor_data_logger
-                        # Script 1 used value_str for processed_value_for_log for heaters after forming it.
-                        # Script 2 used processed_value_for_log for individual numeric values.
-                        # For Heater, the combined string 'value_str' is what's cached and displayed. Let's log that.
-                        processed_value_for_log = value_str
-
-                        self._data_cache[cache_key] = {"name": comp_name, "value_str": value_str, "unit": unit, "board": board_context_for_component_name, "type": comp_type_name_from_config, "ts": timestamp}
-                        msg_handled = True
-                    else: app_logger.warning(f"Heater {comp_name} (CAN) data too short: {can_data_bytes.hex()}")
-
-                if msg_handled and processed_value_for_log is not None:
-                    log_val_str = f'"{processed_value_for_log}"' if isinstance(processed_value_for_log, str) else f"{processed_value_for_log:.2f}" if isinstance(processed_value_for_log, float) else str(processed_value_for_log)
-                    # Use instance_id from the message for logging consistency, as per second script's sensor_data_logger format
-                    sensor_data_logger.info(f"{comp_name},{log_val_str},{unit},{board_context_for_component_name},{comp_type_name_from_config},{instance_id}")
-                    app_logger.debug(f"Processed CAN Component: {comp_name} ({comp_type_name_from_config} on {board_context_for_component_name}, Msg Inst {instance_id}, CfgInst for key {config_inst_id_from_can if comp_type_name_from_config == 'Servo' and 'can_id' in component_config_can else 'N/A'}) -> {value_str} {unit}.")
-
-            # If still not handled, log as unhandled (adapted from script 1's more detailed unhandled log)
-            # The condition from script 2 `not (component_type_numeric == config.MESSAGE_TYPE["MSG_TYPE_ACK_GENERIC"] and (not can_data_bytes or parsed_id_fields["is_ack"]))`
-            # has been effectively handled by the explicit MSG_TYPE_ACK_GENERIC block earlier.
-            # So if msg_handled is still false here, it's genuinely unhandled by component logic.
-            if not msg_handled:
-                state_info = "" # From script 1
-                if component_type_numeric == config.MESSAGE_TYPE["MSG_TYPE_SERVO"] and can_data_bytes:
-                    state_val = can_data_bytes[0]; state_str = config.SERVO_STATES.get(state_val, f"Raw State {state_val}"); state_info = f" State: {state_str}"
-                
-                # Avoid double logging for simple ACKs if they were handled by MSG_TYPE_ACK_GENERIC block.
-                # The 'is_ack' flag from parsed_id_fields can also be used.
-                # A generic ACK without data would have can_data_bytes as empty.
-                is_simple_ack = component_type_numeric == config.MESSAGE_TYPE["MSG_TYPE_ACK_GENERIC"] and not can_data_bytes
-
-                if not is_simple_ack: # Only log if not a simple ACK that was already logged
-                    app_logger.warning(f"No component config or specific handler for Msg Type {component_type_numeric} ('{component_type_name_from_parser}') "
-                                       f"from Original Sender/Context: {board_context_for_component_name} (0x{board_context_for_component_id:02X}), "
-                                       f"Board Field in CAN ID: {board_name_in_can_field} (0x{board_id_in_can_field:02X}), Message Inst {instance_id}. "
-                                       f"XBee Src: {source_xbee_addr}. Data: {can_data_bytes.hex()}.{state_info}")
+                app_logger.warning(f"PT msg from {sender_name} (Inst {instance_id}) - no specific PT config found. Raw ADC: {raw_adc_value}")
+                value_str = f"Raw: {raw_adc_value}"
+
+            cache_key = f"{actual_sensor_name_for_ui}_PressureTransducer"
+            self._data_cache[cache_key] = {
+                "name": actual_sensor_name_for_ui, "value_str": value_str, "unit": unit,
+                "board": sender_name, "type": "PressureTransducer", "ts": frame.timestamp
+            }
+            self._log_sensor_sample(frame.timestamp, actual_sensor_name_for_ui, pressure_psi, unit, sender_name, "PressureTransducer", instance_id, raw=raw_adc_value)
+            return True
+        except struct.error as e:
+            app_logger.error(f"Error unpacking PT ADC value for {sender_name} (Inst {instance_id}): {e}. Data: {can_data_bytes.hex()}")
+        except Exception as e:
+            app_logger.error(f"General error processing PT message for {sender_name} (Inst {instance_id}): {e}. Data: {can_data_bytes.hex()}")
+        return False
+
+    # --- Fallback: generic configured-component handling ---
+    def _find_servo_config_by_board(self, board_id, board_name, instance_id):
+        """
+        Servo messages whose (Board, Type, Message_Instance) has no exact config match are mapped
+        via the servos hosted on the sender's board (config.SERVO_CONFIGS_BY_BOARD).
+        """
+        app_logger.debug(f"Servo message for Board {board_name} ({board_id}), Inst {instance_id} "
+                         f"has no exact config match by (Board, Type, Message_Instance). Trying fallback lookup by BoardID only.")
+        found_servo_configs = config.SERVO_CONFIGS_BY_BOARD.get(board_id, [])
+
+        if len(found_servo_configs) == 1:
+            servo_config = found_servo_configs[0]
+            original_instance_id_in_config = (servo_config["can_id"] & config.CAN_ID_INSTANCE_MASK) >> config.CAN_ID_INSTANCE_SHIFT
+            app_logger.info(f"Fallback successful: Mapping Servo message (Board {board_name}, Message Inst {instance_id}) "
+                            f"to configured Servo '{servo_config['name']}' (Config Inst {original_instance_id_in_config}).")
+            return servo_config
+        if len(found_servo_configs) > 1:
+            for cfg in found_servo_configs:
+                cfg_inst_id = (cfg["can_id"] & config.CAN_ID_INSTANCE_MASK) >> config.CAN_ID_INSTANCE_SHIFT
+                if cfg_inst_id == instance_id: # Compare message instance with config instance
+                    app_logger.info(f"Fallback successful (multiple servos, matched instance): Mapping Servo message (Board {board_name}, Message Inst {instance_id}) "
+                                    f"to configured Servo '{cfg['name']}' (Config Inst {cfg_inst_id}).")
+                    return cfg
+            app_logger.warning(f"Servo message fallback: Found {len(found_servo_configs)} servos for Board {board_name}. "
+                               f"Message Inst {instance_id} did not uniquely match a configured servo instance. Cannot map.")
+            return None
+        app_logger.warning(f"Servo message fallback failed: No servos configured for Board {board_name} ({board_id}).")
+        return None
+
+    def _handle_component_message(self, frame):
+        can_id = frame.can_id
+        board_id, board_name, instance_id = can_id.sender_id, can_id.sender_name, can_id.instance_id
+        component_config_can = can_parser.get_component_info_by_id_tuple(board_id, can_id.component_type_id, instance_id)
+        if component_config_can is None and can_id.component_type_id == config.MESSAGE_TYPE["MSG_TYPE_SERVO"]:
+            component_config_can = self._find_servo_config_by_board(board_id, board_name, instance_id)
+        if not component_config_can:
+            return False
+
+        comp_name = component_config_can["name"]
+        comp_type_name_from_config = component_config_can["type"]
+        handler = self._component_handlers.get(comp_type_name_from_config)
+        if handler is None:
+            return False
+
+        # For servos, the cache key carries the instance from the config CAN ID; other types use name + type.
+        config_inst_id_from_can = None
+        if "can_id" in component_config_can and comp_type_name_from_config == "Servo":
+            config_inst_id_from_can = (component_config_can["can_id"] & config.CAN_ID_INSTANCE_MASK) >> config.CAN_ID_INSTANCE_SHIFT
+            cache_key = f"{comp_name}_{comp_type_name_from_config}_{config_inst_id_from_can}"
+        else:
+            cache_key = f"{comp_name}_{comp_type_name_from_config}"
+
+        result = handler(frame, component_config_can, cache_key)
+        if result is None:
+            return False
+        value_str, unit, processed_value_for_log = result
+        if processed_value_for_log is not None:
+            # Use instance_id from the message for logging consistency with the sensor_data_logger format
+            self._log_sensor_sample(frame.timestamp, comp_name, processed_value_for_log, unit, board_name, comp_type_name_from_config, instance_id)
+            app_logger.debug(f"Processed CAN Component: {comp_name} ({comp_type_name_from_config} on {board_name}, Msg Inst {instance_id}, CfgInst for key {config_inst_id_from_can if config_inst_id_from_can is not None else 'N/A'}) -> {value_str} {unit}.")
+        return True
+
+    # Component handlers take (frame, component_config, cache_key) and return
+    # (value_str, unit, processed_value_for_log) when handled, or None.
+    def _handle_servo_component(self, frame, component_config_can, cache_key):
+        comp_name, board_name = component_config_can["name"], frame.can_id.sender_name
+        if len(frame.data) < 1:
+            app_logger.warning(f"Servo {comp_name} (CAN) data too short: {frame.data.hex()}")
+            return None
+        state_val = frame.data[0]
+        value_str = config.SERVO_STATES.get(state_val, f"Raw State: {state_val}")
+        self.ui_update_servo.emit(comp_name, value_str, board_name, "Servo")
+        self._data_cache[cache_key] = {"name": comp_name, "value_str": value_str, "board": board_name, "type": "Servo", "ts": frame.timestamp}
+        # Known states are logged as their (enumerated) text; anything else as the numeric state code.
+        return value_str, "", value_str if state_val in config.SERVO_STATES else float(state_val)
+
+    def _handle_thermocouple_component(self, frame, component_config_can, cache_key):
+        comp_name, board_name, can_data_bytes = component_config_can["name"], frame.can_id.sender_name, frame.data
+        unit = component_config_can.get('unit', "°C")
+        if len(can_data_bytes) < 4:
+            app_logger.warning(f"TC {comp_name} (CAN) data too short for float: {can_data_bytes.hex()}")
+            return None
+        try:
+            temperature = struct.unpack('>f', can_data_bytes[:4])[0]
+        except struct.error:
+            app_logger.warning(f"TC {comp_name} (CAN) data invalid format for float: {can_data_bytes[:4].hex()}")
+            return None
+        value_str = f"{temperature:.2f}"
+        self._data_cache[cache_key] = {"name": comp_name, "value_str": value_str, "unit": unit, "board": board_name, "type": "Thermocouple", "ts": frame.timestamp}
+        return value_str, unit, temperature
+
+    def _handle_loadcell_component(self, frame, component_config_can, cache_key):
+        comp_name, board_name, can_data_bytes = component_config_can["name"], frame.can_id.sender_name, frame.data
+        if config.LABJACK_ENABLED and hasattr(config, 'LABJACK_SUMMED_LC_NAME') and comp_name == config.LABJACK_SUMMED_LC_NAME:
+            app_logger.info(f"Ignoring CAN message for LoadCell '{comp_name}' as it is configured to be sourced from LabJack.")
+            return None
+        unit = component_config_can.get('unit', "lbf")
+        if len(can_data_bytes) < 4:
+            app_logger.warning(f"LC {comp_name} (CAN) data too short for float: {can_data_bytes.hex()}")
+            return None
+        try:
+            load_value = struct.unpack('>f', can_data_bytes[:4])[0]
+        except struct.error:
+            app_logger.warning(f"LC {comp_name} (CAN) data invalid struct for float: {can_data_bytes.hex()}")
+            return None
+        value_str = f"{load_value:.1f}"
+        self._data_cache[cache_key] = {"name": comp_name, "value_str": value_str, "unit": unit, "board": board_name, "type": "LoadCell", "ts": frame.timestamp}
+        return value_str, unit, load_value
+
+    def _handle_heater_component(self, frame, component_config_can, cache_key):
+        comp_name, board_name, can_data_bytes = component_config_can["name"], frame.can_id.sender_name, frame.data
+        unit = "Status"
+        if len(can_data_bytes) < 1:
+            app_logger.warning(f"Heater {comp_name} (CAN) data too short: {can_data_bytes.hex()}")
+            return None
+        is_on = can_data_bytes[0] == 1
+        value_str = f"State: {'ON' if is_on else 'OFF'}"
+        instance_id = frame.can_id.instance_id
+        # Logged as two numeric channels, "<name>_State" (0/1) and "<name>_Temp" (°C), so each
+        # temperature step doesn't become a new text channel and the values stay plottable.
+        self._log_sensor_sample(frame.timestamp, f"{comp_name}_State", 1.0 if is_on else 0.0, "", board_name, "Heater", instance_id)
+        if len(can_data_bytes) >= 3:
+            try:
+                raw_temp = struct.unpack('>h', can_data_bytes[1:3])[0]
+                temp_scale_factor = component_config_can.get("temp_scale_factor", 10.0)
+                current_temp = float(raw_temp) / temp_scale_factor
+                value_str += f", Temp: {current_temp:.1f}°C"
+                self._log_sensor_sample(frame.timestamp, f"{comp_name}_Temp", current_temp, "°C", board_name, "Heater", instance_id)
+            except struct.error: app_logger.warning(f"Heater {comp_name} (CAN) temp data invalid format: {can_data_bytes[1:3].hex()}")
+        # The combined state/temperature string is what's cached and displayed for heaters.
+        self._data_cache[cache_key] = {"name": comp_name, "value_str": value_str, "unit": unit, "board": board_name, "type": "Heater", "ts": frame.timestamp}
+        return value_str, unit, None # Already logged above
+
+    def _log_sensor_sample(self, timestamp, name, value, unit, board, component_type, instance_id, raw=0):
+        """Records one decoded sample: binary recorder if enabled, else a line in the sensor data CSV."""
+        recorder = self.sensor_recorder # Local copy: close_sensor_recorder may run on another thread at shutdown
+        if recorder is not None:
+            recorder.log_sample(name, value, unit, board, component_type, instance_id, timestamp, raw)
+            return
+        if isinstance(value, str):
+            log_val_str = f'"{value}"'
+        elif isinstance(value, float):
+            log_val_str = "NaN" if value != value else f"{value:.2f}"
+        else:
+            log_val_str = str(value)
+        sensor_data_logger.info(f"{name},{log_val_str},{unit},{board},{component_type},{instance_id}",
+                                extra={"sample_ts": timestamp}) # asctime = when the sample was taken
+
+    def close_sensor_recorder(self):
+        if self.sensor_recorder is not None:
+            self.sensor_recorder.close()
+            self.sensor_recorder = None
+
+    def _log_unhandled_message(self, frame):
+        can_id, can_data_bytes = frame.can_id, frame.data
+        state_info = ""
+        if can_id.component_type_id == config.MESSAGE_TYPE["MSG_TYPE_SERVO"] and can_data_bytes:
+            state_val = can_data_bytes[0]; state_str = config.SERVO_STATES.get(state_val, f"Raw State {state_val}"); state_info = f" State: {state_str}"
+
+        # Simple ACKs (no data) were already logged by _handle_generic_ack.
+        is_simple_ack = can_id.component_type_id == config.MESSAGE_TYPE["MSG_TYPE_ACK_GENERIC"] and not can_data_bytes
+        if not is_simple_ack:
+            app_logger.warning(f"No component config or specific handler for Msg Type {can_id.component_type_id} ('{can_id.component_type_name}') "
+                               f"from Original Sender/Context: {can_id.sender_name} (0x{can_id.sender_id:02X}), "
+                               f"Board Field in CAN ID: {can_id.board_name} (0x{can_id.board_id:02X}), Message Inst {can_id.instance_id}. "
+                               f"XBee Src: {frame.source_addr}. Data: {can_data_bytes.hex()}.{state_info}")
 
     def _on_ui_update_timer_timeout(self):
         """Called periodically. Emits signals for UI updates based on cached data (CAN & LabJack)."""
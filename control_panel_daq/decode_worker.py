@@ -0,0 +1,199 @@
+# decode_worker.py
+import threading
+import time
+from collections import deque
+
+import config
+from logger_setup import app_logger
+
+OVERFLOW_DROP_OLDEST = "drop_oldest"
+OVERFLOW_BLOCK = "block"
+OVERFLOW_POLICIES = (OVERFLOW_DROP_OLDEST, OVERFLOW_BLOCK)
+
+class DecodeWorker:
+    """
+    Runs a frame-processing callable (normally DataProcessor.process_incoming_xbee_message)
+    on a dedicated thread, fed by a bounded FIFO.
+
+    submit() is called from the XBee library's reader thread and only enqueues, so parsing,
+    logging and caching never run on the Qt GUI thread or stall radio receive. When the queue
+    is full the overflow policy decides what gives:
+      - "drop_oldest": the stalest queued frame is discarded (the reader never waits).
+      - "block": the reader waits up to block_timeout_s for space, then drops the new frame.
+        submit_many() applies block_timeout_s once to the whole batch, not per frame.
+    Counters (queue depth, high-water mark, dropped/processed frames) are exposed via stats().
+
+    If process_batch_fn is given (e.g. DataProcessor.process_incoming_xbee_batch), each drained
+    run of frames is handed over in a single call instead of one process_fn call per frame.
+    """
+
+    DRAIN_BATCH_SIZE = 256 # Frames taken per lock acquisition by the worker
+    DROP_WARNING_INTERVAL_S = 5.0 # Rate limit for the "frames dropped" warning
+
+    def __init__(self, process_fn=None, capacity=None, overflow_policy=None, block_timeout_s=None,
+                 name="XBeeDecodeWorker", process_batch_fn=None):
+        if process_fn is None and process_batch_fn is None:
+            raise ValueError("DecodeWorker needs process_fn or process_batch_fn.")
+        self._process_fn = process_fn
+        self._process_batch_fn = process_batch_fn
+        self.capacity = int(capacity if capacity is not None else config.DECODE_QUEUE_CAPACITY)
+        self.overflow_policy = overflow_policy if overflow_policy is not None else config.DECODE_QUEUE_OVERFLOW_POLICY
+        self.block_timeout_s = block_timeout_s if block_timeout_s is not None else config.DECODE_QUEUE_BLOCK_TIMEOUT_S
+        if self.capacity <= 0:
+            raise ValueError(f"Decode queue capacity must be positive, got {self.capacity}.")
+        if self.overflow_policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown decode queue overflow policy '{self.overflow_policy}'. Expected one of {OVERFLOW_POLICIES}.")
+
+        self._queue = deque()
+        self._lock = threading.Lock()
+        self._not_empty = threading.Condition(self._lock)
+        self._not_full = threading.Condition(self._lock)
+        self._stop_requested = False
+        self._thread = None
+        self._name = name
+
+        self._dropped_frames = 0
+        self._processed_frames = 0
+        self._failed_frames = 0
+        self._high_watermark = 0
+        self._last_drop_warning_ts = 0.0
+
+    # ------------------------------------------------------------------ #
+    # Lifecycle
+    # ------------------------------------------------------------------ #
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop_requested = False
+        self._thread = threading.Thread(target=self._run, name=self._name, daemon=True)
+        self._thread.start()
+        app_logger.info(f"{self._name} started (capacity={self.capacity}, overflow_policy={self.overflow_policy}).")
+
+    def stop(self, timeout_s=2.0):
+        """Stops the worker after it drains whatever is already queued (bounded by timeout_s)."""
+        with self._lock:
+            self._stop_requested = True
+            self._not_empty.notify_all()
+            self._not_full.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout_s)
+            if self._thread.is_alive():
+                app_logger.warning(f"{self._name} did not stop within {timeout_s}s ({len(self._queue)} frames still queued).")
+            self._thread = None
+        app_logger.info(f"{self._name} stopped. Stats: {self.stats()}")
+
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    # ------------------------------------------------------------------ #
+    # Producer side (XBee reader thread)
+    # ------------------------------------------------------------------ #
+    def submit(self, item):
+        """Enqueues one frame. Returns False if the frame was dropped because the queue was full."""
+        with self._lock:
+            accepted, dropped = self._enqueue_locked(item)
+            dropped_total = self._dropped_frames
+        if dropped:
+            self._maybe_warn_dropped(dropped_total)
+        return accepted
+
+    def submit_many(self, items):
+        """
+        Enqueues a batch of frames under one lock acquisition. Returns how many were accepted.
+        Under "block" the whole batch waits at most block_timeout_s in total; frames that still
+        don't fit after that are dropped without further waiting.
+        """
+        accepted_count = 0
+        any_dropped = False
+        deadline = time.monotonic() + self.block_timeout_s
+        with self._lock:
+            for item in items:
+                accepted, dropped = self._enqueue_locked(item, deadline)
+                accepted_count += accepted
+                any_dropped = any_dropped or dropped
+            dropped_total = self._dropped_frames
+        if any_dropped:
+            self._maybe_warn_dropped(dropped_total)
+        return accepted_count
+
+    def _enqueue_locked(self, item, deadline=None):
+        """
+        Applies the overflow policy and appends item. Caller holds self._lock. "block" waits until
+        deadline (time.monotonic()), or block_timeout_s if None. Returns (accepted, dropped_any).
+        """
+        dropped_new_frame = False
+        evicted_oldest = False
+        if len(self._queue) >= self.capacity:
+            if self.overflow_policy == OVERFLOW_BLOCK:
+                timeout = self.block_timeout_s if deadline is None else max(0.0, deadline - time.monotonic())
+                has_space = self._not_full.wait_for(
+                    lambda: len(self._queue) < self.capacity or self._stop_requested, timeout=timeout)
+                dropped_new_frame = not has_space or self._stop_requested
+            else:
+                self._queue.popleft()
+                evicted_oldest = True
+        if dropped_new_frame or evicted_oldest:
+            self._dropped_frames += 1
+        if not dropped_new_frame:
+            self._queue.append(item)
+            if len(self._queue) > self._high_watermark:
+                self._high_watermark = len(self._queue)
+            self._not_empty.notify()
+        return not dropped_new_frame, dropped_new_frame or evicted_oldest
+
+    def _maybe_warn_dropped(self, dropped_total):
+        now = time.monotonic()
+        if now - self._last_drop_warning_ts >= self.DROP_WARNING_INTERVAL_S:
+            self._last_drop_warning_ts = now
+            app_logger.warning(f"{self._name}: decode queue full ({self.capacity} frames, policy={self.overflow_policy}). "
+                               f"{dropped_total} frames dropped so far.")
+
+    # ------------------------------------------------------------------ #
+    # Consumer side (worker thread)
+    # ------------------------------------------------------------------ #
+    def _run(self):
+        while True:
+            with self._lock:
+                while not self._queue and not self._stop_requested:
+                    self._not_empty.wait()
+                if not self._queue: # Stop requested and fully drained
+                    return
+                n = min(len(self._queue), self.DRAIN_BATCH_SIZE)
+                batch = [self._queue.popleft() for _ in range(n)]
+                self._not_full.notify_all()
+            if self._process_batch_fn is not None:
+                try:
+                    self._process_batch_fn(batch)
+                except Exception as e:
+                    self._failed_frames += len(batch)
+                    app_logger.error(f"{self._name}: error processing batch of {len(batch)} frames: {e}", exc_info=True)
+            else:
+                for item in batch:
+                    try:
+                        self._process_fn(item)
+                    except Exception as e:
+                        self._failed_frames += 1
+                        app_logger.error(f"{self._name}: error processing frame: {e}", exc_info=True)
+            self._processed_frames += len(batch)
+
+    # ------------------------------------------------------------------ #
+    # Counters
+    # ------------------------------------------------------------------ #
+    @property
+    def queue_depth(self):
+        return len(self._queue)
+
+    @property
+    def dropped_frames(self):
+        return self._dropped_frames
+
+    def stats(self):
+        return {
+            "queue_depth": len(self._queue),
+            "high_watermark": self._high_watermark,
+            "capacity": self.capacity,
+            "dropped_frames": self._dropped_frames,
+            "processed_frames": self._processed_frames,
+            "failed_frames": self._failed_frames,
+            "overflow_policy": self.overflow_policy,
+        }
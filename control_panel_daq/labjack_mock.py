@@ -0,0 +1,185 @@
+# labjack_mock.py
+"""
+Stand-in for labjack.ljm with no device attached.
+
+MockLjm implements the subset of the ljm API the control panel uses (openS,
+getHandleInfo, numberToIP, eWriteName, eReadName, namesToAddresses,
+eStreamStart/eStreamRead/eStreamStop, close) plus ljm.constants, ljm.errorcodes
+and ljm.LJMError, so DataProcessor and LabJackStreamEngine can be exercised on a
+laptop:
+
+    config.LABJACK_USE_MOCK_LJM = True   # DataProcessor then imports MockLjm() as ljm
+
+Each AIN returns a synthetic differential voltage: a per-channel load (in lbs, run
+backwards through the HSPDAQ.py scaling) plus a slow sine and Gaussian noise. In
+stream mode eStreamRead paces itself to the requested scan rate unless
+realtime=False, and dummy_fraction of samples come back as DUMMY_VALUE (-9999.0),
+which is what LJM inserts for scans lost to auto-recovery.
+"""
+import math
+import threading
+import time
+from types import SimpleNamespace
+
+import numpy as np
+
+# Values match labjack.ljm.constants / labjack.ljm.errorcodes so the same code paths work.
+constants = SimpleNamespace(
+    dtANY=0, dtT4=4, dtT7=7, dtT8=8,
+    ctANY=0, ctUSB=1, ctTCP=2, ctETHERNET=3, ctWIFI=4,
+    FLOAT32=3,
+    DUMMY_VALUE=-9999,
+)
+errorcodes = SimpleNamespace(
+    NOERROR=0,
+    INVALID_HANDLE=1223,
+    DEVICE_NOT_OPEN=1224,
+    DEVICE_DISCONNECTED=1226,
+    RECONNECT_FAILED=1239,
+    INVALID_NAME=1294,
+    STREAM_NOT_RUNNING=1303,
+    NO_SCANS_RETURNED=1309,
+    NO_DEVICES_FOUND=1314,
+)
+
+
+class LJMError(Exception):
+    def __init__(self, errorCode=None, errorAddress=None, errorString=None):
+        self.errorCode = errorCode
+        self.errorAddress = errorAddress
+        self.errorString = errorString or f"Mock LJM error {errorCode}"
+        super().__init__(self.errorString)
+
+    def __str__(self):
+        return self.errorString
+
+
+_AIN_ADDRESS_STRIDE = 2 # AIN#n lives at Modbus address 2*n (FLOAT32)
+_LJM_SCALE = 51412.0    # Inverse of DataProcessor._apply_differential_scaling_labjack
+_LJM_OFFSET = 2.0204
+_KG_PER_LB = 0.45359237
+
+
+def _ain_number(name):
+    if not name.startswith("AIN") or not name[3:].isdigit():
+        raise LJMError(errorcodes.INVALID_NAME, errorString=f"Mock LJM: unsupported register name {name!r}")
+    return int(name[3:])
+
+
+class MockLjm:
+    """One simulated T7. Attribute access mirrors the labjack.ljm module."""
+    constants = constants
+    errorcodes = errorcodes
+    LJMError = LJMError
+
+    def __init__(self, base_load_lbs=(40.0, 55.0, 35.0, 50.0), wave_amplitude_lbs=5.0, wave_period_s=4.0,
+                 noise_lbs=0.3, dummy_fraction=0.0, realtime=True, seed=0, fail_after_reads=None):
+        self.base_load_lbs = tuple(base_load_lbs)
+        self.wave_amplitude_lbs = wave_amplitude_lbs
+        self.wave_period_s = wave_period_s
+        self.noise_lbs = noise_lbs
+        self.dummy_fraction = dummy_fraction
+        self.realtime = realtime
+        self.fail_after_reads = fail_after_reads # Reads after this many raise DEVICE_DISCONNECTED (cable pull)
+        self._rng = np.random.default_rng(seed)
+        self._lock = threading.Lock()
+        self._next_handle = 1
+        self._open_handles = set()
+        self.registers = {} # (handle, name) -> last written value
+        self._stream = None # State of the running stream; one per mock device is enough here
+
+    # ------------------------------------------------------------------ #
+    # Device / register access
+    # ------------------------------------------------------------------ #
+    def openS(self, deviceType="ANY", connectionType="ANY", identifier="ANY"):
+        with self._lock:
+            handle = self._next_handle
+            self._next_handle += 1
+            self._open_handles.add(handle)
+        return handle
+
+    def _check_handle(self, handle):
+        if handle not in self._open_handles:
+            raise LJMError(errorcodes.DEVICE_NOT_OPEN, errorString="LJME_DEVICE_NOT_OPEN")
+
+    def getHandleInfo(self, handle):
+        self._check_handle(handle)
+        return (constants.dtT7, constants.ctUSB, 470000000 + handle, 0, 0, 64)
+
+    def numberToIP(self, number):
+        return ".".join(str((number >> shift) & 0xFF) for shift in (24, 16, 8, 0))
+
+    def eWriteName(self, handle, name, value):
+        self._check_handle(handle)
+        self.registers[(handle, name)] = value
+
+    def eReadName(self, handle, name):
+        self._check_handle(handle)
+        return float(self._voltages(np.array([_ain_number(name)]), np.array([time.time()]))[0, 0])
+
+    def namesToAddresses(self, numFrames, aNames, aAddresses=None, aDataTypes=None):
+        addresses = [_ain_number(name) * _AIN_ADDRESS_STRIDE for name in aNames[:numFrames]]
+        return addresses, [constants.FLOAT32] * len(addresses)
+
+    def close(self, handle):
+        with self._lock:
+            self._open_handles.discard(handle)
+            if self._stream is not None and self._stream["handle"] == handle:
+                self._stream = None
+
+    # ------------------------------------------------------------------ #
+    # Stream mode
+    # ------------------------------------------------------------------ #
+    def eStreamStart(self, handle, scansPerRead, numAddresses, aScanList, scanRate):
+        self._check_handle(handle)
+        if self._stream is not None:
+            raise LJMError(errorcodes.STREAM_NOT_RUNNING, errorString="Mock LJM: a stream is already running")
+        self._stream = {
+            "handle": handle,
+            "scans_per_read": int(scansPerRead),
+            "channels": np.array([a // _AIN_ADDRESS_STRIDE for a in aScanList[:numAddresses]]),
+            "scan_rate": float(scanRate),
+            "start": time.time(),
+            "scans_done": 0,
+            "reads": 0,
+        }
+        return float(scanRate)
+
+    def eStreamRead(self, handle):
+        self._check_handle(handle)
+        stream = self._stream
+        if stream is None or stream["handle"] != handle:
+            raise LJMError(errorcodes.STREAM_NOT_RUNNING, errorString="LJME_STREAM_NOT_RUNNING")
+        stream["reads"] += 1
+        if self.fail_after_reads is not None and stream["reads"] > self.fail_after_reads:
+            raise LJMError(errorcodes.DEVICE_DISCONNECTED, errorString="LJME_DEVICE_DISCONNECTED")
+        n_scans = stream["scans_per_read"]
+        first = stream["scans_done"]
+        stream["scans_done"] += n_scans
+        scan_times = stream["start"] + np.arange(first, first + n_scans) / stream["scan_rate"]
+        if self.realtime:
+            wait_s = scan_times[-1] - time.time()
+            if wait_s > 0:
+                time.sleep(wait_s)
+        data = self._voltages(stream["channels"], scan_times)
+        if self.dummy_fraction > 0:
+            data[self._rng.random(data.shape) < self.dummy_fraction] = constants.DUMMY_VALUE
+        # Like the real library: a flat, channel-interleaved list of floats.
+        return data.ravel().tolist(), 0, 0
+
+    def eStreamStop(self, handle):
+        self._check_handle(handle)
+        if self._stream is None or self._stream["handle"] != handle:
+            raise LJMError(errorcodes.STREAM_NOT_RUNNING, errorString="LJME_STREAM_NOT_RUNNING")
+        self._stream = None
+
+    # ------------------------------------------------------------------ #
+    # Signal model
+    # ------------------------------------------------------------------ #
+    def _voltages(self, ain_numbers, times):
+        """(len(times), len(ain_numbers)) differential voltages that scale back to the synthetic loads."""
+        base = np.array([self.base_load_lbs[n % len(self.base_load_lbs)] for n in ain_numbers])
+        phase = 2.0 * math.pi * np.asarray(times)[:, None] / self.wave_period_s
+        lbs = base + self.wave_amplitude_lbs * np.sin(phase + ain_numbers) \
+            + self._rng.normal(0.0, self.noise_lbs, (len(times), len(ain_numbers)))
+        return (_LJM_OFFSET - lbs * _KG_PER_LB) / _LJM_SCALE
@@ -0,0 +1,207 @@
+# labjack_stream.py
+"""
+LabJack stream-mode acquisition for the load cell channels.
+
+The polling path (DataProcessor._read_labjack_data_slot) issues one eReadName round
+trip per channel from a QTimer on the GUI thread, so the real sample rate depends on
+USB latency and on how busy the event loop is. In stream mode the device clocks the
+scans itself: eStreamStart configures a scan list and a scan rate, and LJM buffers
+the data until eStreamRead hands back scans_per_read scans at once (channel-
+interleaved). LabJackStreamEngine runs that read loop on its own thread and passes
+each block to a callback as NumPy arrays:
+
+    on_block(timestamps, voltages)
+        timestamps  float64[n_scans]               Unix time of each scan
+        voltages    float64[n_scans, n_channels]   NaN where LJM returned DUMMY_VALUE
+
+Scan timestamps are derived from the stream start time and the actual scan rate the
+device reported, so they are evenly spaced even though blocks arrive in bursts.
+
+The engine takes the ljm module as a parameter; pass labjack_mock.MockLjm() to run it
+without hardware.
+"""
+import threading
+import time
+
+import numpy as np
+
+from logger_setup import app_logger
+
+# Same scaling as DataProcessor._apply_differential_scaling_labjack (formula from HSPDAQ.py).
+_LOADCELL_VOLTS_TO_KG = 51412.0
+_LOADCELL_KG_OFFSET = 2.0204
+_KG_PER_LB = 0.45359237
+LOADCELL_SUM_OFFSET_LBS = 66.0 # Added to the summed channels, as in the polling path
+
+
+def scale_differential_voltages(voltages):
+    """Vectorized DataProcessor._apply_differential_scaling_labjack: volts -> lbs, element-wise."""
+    return (_LOADCELL_KG_OFFSET - np.asarray(voltages, dtype=np.float64) * _LOADCELL_VOLTS_TO_KG) / _KG_PER_LB
+
+
+def summed_load_lbs(voltages):
+    """Per-scan total load (lbs) from a (n_scans, n_channels) voltage block. A NaN channel makes the scan NaN."""
+    return scale_differential_voltages(voltages).sum(axis=1) + LOADCELL_SUM_OFFSET_LBS
+
+
+def connection_lost_codes(ljm):
+    """LJM error codes after which the device has to be reopened."""
+    names = ("DEVICE_NOT_OPEN", "DEVICE_DISCONNECTED", "RECONNECT_FAILED", "NO_DEVICES_FOUND", "INVALID_HANDLE")
+    return {getattr(ljm.errorcodes, name) for name in names if hasattr(ljm.errorcodes, name)}
+
+
+class LabJackStreamEngine:
+    """
+    Background eStreamRead loop for one open LabJack handle.
+
+    start() resolves the channel names, starts the stream and the reader thread; it
+    raises ljm.LJMError if the device refuses the stream. stop() ends the thread and
+    then the stream. on_block runs on the reader thread and must not touch Qt widgets.
+    If eStreamRead fails with a connection-lost code the loop ends and on_error(e) is
+    called (also on the reader thread); other read errors are logged and retried.
+    """
+
+    ERROR_RETRY_S = 0.1 # Pause after a non-fatal read error before trying again
+    BACKLOG_WARNING_INTERVAL_S = 5.0 # Rate limit for the "falling behind" warning
+
+    def __init__(self, ljm, handle, channels, scan_rate_hz, scans_per_read, on_block, on_error=None,
+                 settling_us=0, resolution_index=0, name="LabJackStream"):
+        if not channels:
+            raise ValueError("LabJack stream needs at least one channel.")
+        if scan_rate_hz <= 0 or scans_per_read <= 0:
+            raise ValueError(f"LabJack stream needs a positive scan rate and scans per read, got "
+                             f"{scan_rate_hz} Hz / {scans_per_read} scans.")
+        self._ljm = ljm
+        self.handle = handle
+        self.channels = list(channels)
+        self.requested_scan_rate_hz = float(scan_rate_hz)
+        self.scan_rate_hz = None # Actual rate reported by eStreamStart
+        self.scans_per_read = int(scans_per_read)
+        self.settling_us = settling_us # 0 = device default (auto)
+        self.resolution_index = resolution_index # 0 = device default
+        self._on_block = on_block
+        self._on_error = on_error
+        self._name = name
+        self._fatal_codes = connection_lost_codes(ljm)
+        self._dummy_value = float(getattr(ljm.constants, "DUMMY_VALUE", -9999))
+
+        self._stop_requested = threading.Event()
+        self._thread = None
+        self._stream_running = False
+        self._start_ts = 0.0
+
+        self._blocks = 0
+        self._scans = 0
+        self._dummy_samples = 0
+        self._read_errors = 0
+        self._callback_errors = 0
+        self._max_device_backlog = 0
+        self._max_ljm_backlog = 0
+        self._last_backlog_warning_ts = 0.0
+
+    # ------------------------------------------------------------------ #
+    # Lifecycle
+    # ------------------------------------------------------------------ #
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        # Free-running internal clock, no trigger; channel range/negative channel are configured by the caller.
+        for register, value in (("STREAM_TRIGGER_INDEX", 0), ("STREAM_CLOCK_SOURCE", 0),
+                                ("STREAM_SETTLING_US", self.settling_us),
+                                ("STREAM_RESOLUTION_INDEX", self.resolution_index)):
+            self._ljm.eWriteName(self.handle, register, value)
+        addresses, _ = self._ljm.namesToAddresses(len(self.channels), self.channels)
+        self.scan_rate_hz = float(self._ljm.eStreamStart(self.handle, self.scans_per_read, len(addresses),
+                                                         list(addresses), self.requested_scan_rate_hz))
+        self._start_ts = time.time()
+        self._stream_running = True
+        self._stop_requested.clear()
+        self._thread = threading.Thread(target=self._run, name=self._name, daemon=True)
+        self._thread.start()
+        app_logger.info(f"{self._name} started: {self.channels} at {self.scan_rate_hz:g} Hz "
+                        f"(requested {self.requested_scan_rate_hz:g} Hz), {self.scans_per_read} scans per read.")
+
+    def stop(self, timeout_s=2.0):
+        """Stops the reader thread, then the device stream. Safe to call more than once."""
+        self._stop_requested.set()
+        if self._thread is not None:
+            # eStreamRead returns within one block period, so the join is short.
+            self._thread.join(timeout_s)
+            if self._thread.is_alive():
+                app_logger.warning(f"{self._name} reader did not stop within {timeout_s}s.")
+            self._thread = None
+        if self._stream_running:
+            self._stream_running = False
+            try:
+                self._ljm.eStreamStop(self.handle)
+            except self._ljm.LJMError as e:
+                app_logger.warning(f"{self._name}: eStreamStop failed: {e} (Code: {e.errorCode})")
+        app_logger.info(f"{self._name} stopped. Stats: {self.stats()}")
+
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    # ------------------------------------------------------------------ #
+    # Reader thread
+    # ------------------------------------------------------------------ #
+    def _run(self):
+        n_channels = len(self.channels)
+        period_s = 1.0 / self.scan_rate_hz
+        scan_offsets = np.arange(self.scans_per_read) * period_s
+        while not self._stop_requested.is_set():
+            try:
+                data, device_backlog, ljm_backlog = self._ljm.eStreamRead(self.handle)
+            except self._ljm.LJMError as e:
+                self._read_errors += 1
+                if e.errorCode in self._fatal_codes:
+                    app_logger.error(f"{self._name}: LabJack connection lost during stream read: {e} (Code: {e.errorCode})")
+                    self._stream_running = False # Nothing left to stop on the device side
+                    if self._on_error is not None:
+                        self._on_error(e)
+                    return
+                app_logger.error(f"{self._name}: eStreamRead failed: {e} (Code: {e.errorCode})")
+                self._stop_requested.wait(self.ERROR_RETRY_S)
+                continue
+
+            voltages = np.asarray(data, dtype=np.float64).reshape(-1, n_channels)
+            is_dummy = voltages == self._dummy_value
+            if is_dummy.any():
+                # Scans LJM could not recover after a gap; keep their slots so timing stays aligned.
+                self._dummy_samples += int(is_dummy.sum())
+                voltages[is_dummy] = np.nan
+            n_scans = len(voltages)
+            timestamps = self._start_ts + self._scans * period_s + scan_offsets[:n_scans]
+            self._blocks += 1
+            self._scans += n_scans
+            self._track_backlog(device_backlog, ljm_backlog)
+            try:
+                self._on_block(timestamps, voltages)
+            except Exception as e:
+                self._callback_errors += 1
+                app_logger.error(f"{self._name}: error handling stream block: {e}", exc_info=True)
+
+    def _track_backlog(self, device_backlog, ljm_backlog):
+        self._max_device_backlog = max(self._max_device_backlog, device_backlog)
+        self._max_ljm_backlog = max(self._max_ljm_backlog, ljm_backlog)
+        # More than a couple of blocks waiting in LJM means on_block is slower than the device.
+        if ljm_backlog > 2 * self.scans_per_read:
+            now = time.monotonic()
+            if now - self._last_backlog_warning_ts >= self.BACKLOG_WARNING_INTERVAL_S:
+                self._last_backlog_warning_ts = now
+                app_logger.warning(f"{self._name} is falling behind: {ljm_backlog} scans waiting in LJM, "
+                                   f"{device_backlog} on the device.")
+
+    # ------------------------------------------------------------------ #
+    # Counters
+    # ------------------------------------------------------------------ #
+    def stats(self):
+        return {
+            "scan_rate_hz": self.scan_rate_hz,
+            "blocks": self._blocks,
+            "scans": self._scans,
+            "dummy_samples": self._dummy_samples,
+            "read_errors": self._read_errors,
+            "callback_errors": self._callback_errors,
+            "max_device_backlog": self._max_device_backlog,
+            "max_ljm_backlog": self._max_ljm_backlog,
+        }
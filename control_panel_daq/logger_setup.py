@@ -1,7 +1,125 @@
 # logger_setup.py
+import atexit
 import logging
+import logging.handlers
+import queue
+import sys
+import threading
+import time
 import config # Imports LOG_FILE_NAME, DATA_LOG_FILE_NAME, and now XBEE_RAW_PACKET_LOG_FILE_NAME
 
+# --- Asynchronous handlers ---
+# With config.ASYNC_LOGGING_ENABLED, every file/console handler gets its own bounded queue and
+# writer thread (QueueListener). The calling thread (XBee reader, decode worker, GUI) only creates
+# the LogRecord and enqueues it; message merging, formatting with asctime etc. and the disk/console
+# write all happen on the writer thread. If a queue is full the record is dropped and counted
+# rather than blocking -- except for the sensor data CSV, which is recorded data, not
+# diagnostics: its queue blocks the caller instead (BlockingQueueHandler).
+_async_listeners = [] # (name, queue handler, QueueListener)
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that drops (and counts) records instead of blocking once `capacity` are queued.
+    Uses a SimpleQueue (C implementation, no Condition round trip) with an approximate size bound.
+    """
+
+    DROP_REPORT_INTERVAL_S = 5.0
+
+    def __init__(self, capacity, name, report_logger=None):
+        super().__init__(queue.SimpleQueue())
+        self.capacity = capacity
+        self.name = name
+        self.report_logger = report_logger # Where drop summaries go; None = this handler's own output
+        self.dropped_records = 0
+        self._unreported_drops = 0
+        self._last_drop_report_ts = 0.0
+        self._drop_lock = threading.Lock()
+
+    def prepare(self, record):
+        # Records never leave the process, so skip the base class's eager format + copy:
+        # the listener's handler formats the record on the writer thread. Call sites here
+        # pass ready-made f-strings, so there are no mutable args to snapshot.
+        return record
+
+    def enqueue(self, record):
+        if self.queue.qsize() >= self.capacity:
+            with self._drop_lock:
+                self.dropped_records += 1
+                self._unreported_drops += 1
+            return
+        self.queue.put_nowait(record)
+        if self._unreported_drops:
+            self._report_drops()
+
+    def _report_drops(self):
+        # Writes a summary once there is room again (rate limited): to report_logger if set,
+        # else into this output (only used for the application log's own handlers).
+        now = time.monotonic()
+        with self._drop_lock:
+            if now - self._last_drop_report_ts < self.DROP_REPORT_INTERVAL_S or not self._unreported_drops:
+                return
+            n_dropped, self._unreported_drops = self._unreported_drops, 0
+            self._last_drop_report_ts = now
+        msg = f"Log queue '{self.name}' was full: dropped {n_dropped} records ({self.dropped_records} total)."
+        if self.report_logger is not None:
+            self.report_logger.warning(msg)
+            return
+        self.queue.put_nowait(logging.makeLogRecord({"name": "logger_setup", "levelno": logging.WARNING,
+                                                     "levelname": "WARNING", "msg": msg}))
+
+class BlockingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler for outputs that must not lose records: blocks the caller while `capacity` are queued."""
+
+    dropped_records = 0 # Never drops; kept for async_logging_stats()
+
+    def __init__(self, capacity, name):
+        super().__init__(queue.Queue(maxsize=capacity))
+        self.name = name
+
+    def prepare(self, record):
+        return record # See DroppingQueueHandler.prepare
+
+    def enqueue(self, record):
+        self.queue.put(record)
+
+def _make_async(handler, name, drop=True, report_logger=None):
+    """
+    Wraps handler so records reach it through a bounded queue and a dedicated writer thread.
+    With drop=False a full queue blocks the caller; otherwise records are dropped and a summary
+    goes to report_logger (or, if None, to this same output).
+    """
+    if not config.ASYNC_LOGGING_ENABLED:
+        return handler
+    if drop:
+        queue_handler = DroppingQueueHandler(config.LOG_QUEUE_CAPACITY, name, report_logger)
+    else:
+        queue_handler = BlockingQueueHandler(config.LOG_QUEUE_CAPACITY, name)
+    queue_handler.setLevel(handler.level) # Filter before enqueueing, not on the writer thread
+    listener = logging.handlers.QueueListener(queue_handler.queue, handler, respect_handler_level=True)
+    listener.start()
+    _async_listeners.append((name, queue_handler, listener))
+    return queue_handler
+
+def async_logging_stats():
+    """Per-output queue depth and dropped record counts for the asynchronous handlers."""
+    return {name: {"queue_depth": qh.queue.qsize(), "dropped_records": qh.dropped_records}
+            for name, qh, _ in _async_listeners}
+
+def stop_async_logging():
+    """Flushes every queue to its file/console and stops the writer threads. Safe to call more than once."""
+    while _async_listeners:
+        name, queue_handler, listener = _async_listeners.pop()
+        try:
+            listener.stop()
+        except Exception as e:
+            print(f"Error stopping log writer '{name}': {e}", file=sys.stderr)
+        if queue_handler.dropped_records:
+            print(f"Log queue '{name}' dropped {queue_handler.dropped_records} records in total.", file=sys.stderr)
+        for handler in listener.handlers:
+            handler.close()
+
+atexit.register(stop_async_logging)
+
 def setup_logger():
     """Sets up the main application logger."""
     logger = logging.getLogger("ControlPanelApp")
@@ -15,18 +133,32 @@ def setup_logger():
     fh.setLevel(logging.INFO) 
     formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
     fh.setFormatter(formatter)
-    logger.addHandler(fh)
+    logger.addHandler(_make_async(fh, "app_file"))
 
     # Console Handler
     ch = logging.StreamHandler()
     ch.setLevel(logging.DEBUG) 
     ch.setFormatter(formatter)
-    logger.addHandler(ch)
+    logger.addHandler(_make_async(ch, "app_console"))
     
     return logger
 
 app_logger = setup_logger()
 
+class SampleTimeFormatter(logging.Formatter):
+    """
+    Stamps a record with the time its sample was taken, passed as extra={"sample_ts": unix_s},
+    instead of the time it was logged (which for stream blocks and queued frames can be much later).
+    Records without sample_ts keep their creation time.
+    """
+
+    def format(self, record):
+        sample_ts = getattr(record, "sample_ts", None)
+        if sample_ts is not None:
+            record.created = sample_ts
+            record.msecs = (sample_ts - int(sample_ts)) * 1000
+        return super().format(record)
+
 def setup_data_logger():
     """Sets up the logger for parsed sensor data (CSV format)."""
     data_logger = logging.getLogger("SensorData")
@@ -36,9 +168,9 @@ def setup_data_logger():
         data_logger.handlers.clear()
         
     fh_data = logging.FileHandler(config.DATA_LOG_FILE_NAME, mode='a')
-    data_formatter = logging.Formatter('%(asctime)s,%(message)s') # CSV friendly
+    data_formatter = SampleTimeFormatter('%(asctime)s,%(message)s') # CSV friendly
     fh_data.setFormatter(data_formatter)
-    data_logger.addHandler(fh_data)
+    data_logger.addHandler(_make_async(fh_data, "sensor_data", drop=False)) # Every line is a sample
     
     try:
         with open(config.DATA_LOG_FILE_NAME, 'r') as f:
@@ -65,7 +197,7 @@ def setup_xbee_packet_logger():
     # Simple format: timestamp - packet string representation
     packet_formatter = logging.Formatter('%(asctime)s - %(message)s')
     fh_xbee.setFormatter(packet_formatter)
-    packet_logger.addHandler(fh_xbee)
+    packet_logger.addHandler(_make_async(fh_xbee, "xbee_packets", report_logger=app_logger))
     
     # Optionally, prevent propagation to the root logger if you don't want these in console/main log
     # packet_logger.propagate = False 
@@ -2,12 +2,13 @@
 import sys
 import signal # Import the signal module
 from PySide6.QtWidgets import QApplication
-from PySide6.QtCore import QTimer # QTimer is used by XBeeManager for autoconnect
+from PySide6.QtCore import QTimer, Qt # QTimer is used by XBeeManager for autoconnect
 
 import config # Ensures config is loaded
 from logger_setup import app_logger # Initializes logging
 from xbee_handler import XBeeManager
 from data_processor import DataProcessor
+from decode_worker import DecodeWorker
 from ui_control_panel import ControlPanelWindow
 
 # --- Signal Handler for Ctrl+C ---
@@ -35,11 +36,31 @@ def main():
     main_window = ControlPanelWindow(xbee_manager, data_processor)
 
     # --- Connect signals between components ---
-    xbee_manager.message_received.connect(data_processor.process_incoming_xbee_message)
+    # Batched mode delivers (timestamp, payload, source) tuples via frames_received; otherwise one dict per packet.
+    if config.XBEE_DECODE_IN_WORKER_THREAD:
+        # DirectConnection: submit()/submit_many() run in the emitting thread (the XBee reader, or
+        # XBeeManager's batch flush thread -- not the GUI thread) and only enqueue; parsing,
+        # logging and caching happen on the decode worker thread.
+        if xbee_manager.batch_delivery_enabled:
+            decode_worker = DecodeWorker(process_batch_fn=data_processor.process_incoming_xbee_batch)
+            xbee_manager.frames_received.connect(decode_worker.submit_many, Qt.DirectConnection)
+        else:
+            decode_worker = DecodeWorker(data_processor.process_incoming_xbee_message)
+            xbee_manager.message_received.connect(decode_worker.submit, Qt.DirectConnection)
+        decode_worker.start()
+        app.aboutToQuit.connect(decode_worker.stop)
+    elif xbee_manager.batch_delivery_enabled:
+        xbee_manager.frames_received.connect(data_processor.process_incoming_xbee_batch)
+    else:
+        xbee_manager.message_received.connect(data_processor.process_incoming_xbee_message)
+    # Connected after decode_worker.stop and the LabJack stream so samples drained at shutdown still reach the recorder.
+    app.aboutToQuit.connect(data_processor.close_labjack)
+    app.aboutToQuit.connect(data_processor.close_sensor_recorder)
+    app.aboutToQuit.connect(xbee_manager.close_packet_archive)
     
     # --- Threading considerations ---
     # The digi-xbee library typically manages its own threads for I/O and callbacks.
-    # UI updates via Qt Signals from those callback threads are safe.
+    # UI updates via Qt Signals from those callback threads (and from the decode worker) are safe.
     # XBeeManager's autodetect_and_connect is called with QTimer.singleShot from ControlPanelWindow,
     # and send_data_async is used, which should keep UI responsive.
 
@@ -0,0 +1,47 @@
+# message_router.py
+from collections import namedtuple
+
+# One decoded XBee/CAN frame as seen by a handler.
+# can_id is a can_parser.CanIdFields record; data is the CAN payload after the 4-byte ID.
+RoutedFrame = namedtuple("RoutedFrame", ["can_id", "data", "source_addr", "timestamp"])
+
+class MessageRouter:
+    """
+    Dispatch table from CAN component_type_id to a handler callable.
+
+    A handler takes a RoutedFrame and returns True if it fully handled the frame.
+    Frames with no registered handler, or whose handler returns False, are passed
+    to the fallback handler (if any). Dispatch is a single dict lookup per frame;
+    new message types are added with register() instead of editing a branch chain.
+    """
+
+    def __init__(self, fallback=None):
+        self._handlers = {}
+        self._fallback = fallback
+
+    def register(self, component_type_id, handler, replace=False):
+        """Registers handler for component_type_id. Refuses to silently replace an existing one."""
+        if component_type_id in self._handlers and not replace:
+            raise ValueError(f"A handler is already registered for component type {component_type_id}.")
+        self._handlers[component_type_id] = handler
+
+    def unregister(self, component_type_id):
+        self._handlers.pop(component_type_id, None)
+
+    def set_fallback(self, fallback):
+        self._fallback = fallback
+
+    def handler_for(self, component_type_id):
+        return self._handlers.get(component_type_id)
+
+    def registered_types(self):
+        return sorted(self._handlers)
+
+    def dispatch(self, frame):
+        """Routes one frame. Returns True if a handler (specific or fallback) handled it."""
+        handler = self._handlers.get(frame.can_id.component_type_id)
+        if handler is not None and handler(frame):
+            return True
+        if self._fallback is not None:
+            return bool(self._fallback(frame))
+        return False
@@ -0,0 +1,368 @@
+# packet_archive.py
+"""
+Rotating, compressed archive of raw XBee API frames.
+
+Frames are appended from the XBee reader thread into memory and written by a
+background thread into segment files:
+
+    <archive dir>/packets_YYYYmmdd_HHMMSS_NNNN.xba
+
+Each record is RECORD_HEADER (timestamp float64, frame length uint16, little-endian)
+followed by the unescaped API frame as returned by XBeePacket.output(), so
+digi.xbee.packets.factory.build_frame() can rebuild the packet on replay.
+
+A segment is closed after XBEE_PACKET_ARCHIVE_SEGMENT_MAX_BYTES or
+XBEE_PACKET_ARCHIVE_SEGMENT_MAX_S, then compressed (gzip, or zstd if the
+zstandard package is installed) on a separate thread. index.json lists every
+segment with its first/last frame time, so iter_frames() only opens the segments
+that overlap the requested window. Once the archive exceeds
+XBEE_PACKET_ARCHIVE_MAX_TOTAL_BYTES the oldest closed segments are deleted.
+
+    python packet_archive.py list [archive_dir]
+    python packet_archive.py dump [archive_dir] [--start TS] [--end TS]
+"""
+import argparse
+import gzip
+import json
+import os
+import struct
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import config
+from logger_setup import app_logger
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+RECORD_HEADER = struct.Struct("<dH")
+MAX_FRAME_BYTES = 0xFFFF
+SEGMENT_SUFFIX = ".xba"
+COMPRESSED_SUFFIXES = {"gzip": ".gz", "zstd": ".zst"}
+INDEX_FILE_NAME = "index.json"
+
+
+def _open_segment_for_read(path):
+    if path.endswith(".gz"):
+        return gzip.open(path, "rb")
+    if path.endswith(".zst"):
+        if zstandard is None:
+            raise RuntimeError(f"{path} is zstd-compressed but the zstandard package is not installed.")
+        return zstandard.ZstdDecompressor().stream_reader(open(path, "rb"), closefd=True)
+    return open(path, "rb")
+
+
+def read_segment(path):
+    """Yields (timestamp, frame_bytes) from one segment file (plain or compressed). A truncated tail is ignored."""
+    with _open_segment_for_read(path) as f:
+        while True:
+            header = f.read(RECORD_HEADER.size)
+            if len(header) < RECORD_HEADER.size:
+                return
+            timestamp, length = RECORD_HEADER.unpack(header)
+            frame = f.read(length)
+            if len(frame) < length:
+                return
+            yield timestamp, frame
+
+
+def load_index(directory):
+    try:
+        with open(os.path.join(directory, INDEX_FILE_NAME), "r") as f:
+            return json.load(f)["segments"]
+    except FileNotFoundError:
+        return []
+
+
+def iter_frames(directory=None, start_ts=None, end_ts=None):
+    """
+    Yields (timestamp, frame_bytes) for every archived frame with start_ts <= timestamp <= end_ts
+    (either bound may be None), in archive order. Segments outside the window are not opened.
+    """
+    directory = directory if directory is not None else config.XBEE_PACKET_ARCHIVE_DIR
+    for entry in load_index(directory):
+        if entry.get("open"):
+            pass # Still being written: no end time yet, always scan it
+        elif entry["frames"] == 0 or (start_ts is not None and entry["end_ts"] < start_ts) or \
+                (end_ts is not None and entry["start_ts"] > end_ts):
+            continue
+        path = os.path.join(directory, entry["file"])
+        if not os.path.exists(path):
+            continue # Deleted by the size cap between reading the index and getting here
+        for timestamp, frame in read_segment(path):
+            if (start_ts is None or timestamp >= start_ts) and (end_ts is None or timestamp <= end_ts):
+                yield timestamp, frame
+
+
+class PacketArchive:
+    """
+    append() may be called from any thread and only buffers in memory; a writer thread does
+    the file I/O and a one-thread pool compresses closed segments. start() before use, close() on exit.
+    """
+
+    def __init__(self, directory=None, segment_max_bytes=None, segment_max_s=None, compression=None,
+                 max_total_bytes=None, flush_interval_s=0.5):
+        self.directory = directory if directory is not None else config.XBEE_PACKET_ARCHIVE_DIR
+        self.segment_max_bytes = segment_max_bytes if segment_max_bytes is not None else config.XBEE_PACKET_ARCHIVE_SEGMENT_MAX_BYTES
+        self.segment_max_s = segment_max_s if segment_max_s is not None else config.XBEE_PACKET_ARCHIVE_SEGMENT_MAX_S
+        self.max_total_bytes = max_total_bytes if max_total_bytes is not None else config.XBEE_PACKET_ARCHIVE_MAX_TOTAL_BYTES
+        self.flush_interval_s = flush_interval_s
+        compression = compression if compression is not None else config.XBEE_PACKET_ARCHIVE_COMPRESSION
+        if compression == "zstd" and zstandard is None:
+            app_logger.warning("XBee packet archive: zstd requested but the zstandard package is not installed. Using gzip.")
+            compression = "gzip"
+        if compression not in COMPRESSED_SUFFIXES and compression != "none":
+            raise ValueError(f"Unknown packet archive compression '{compression}'. Expected 'gzip', 'zstd' or 'none'.")
+        self.compression = compression
+
+        self._lock = threading.Lock()
+        self._wake = threading.Condition(self._lock)
+        self._pending = [] # Packed records waiting for the writer thread
+        self._stop_requested = False
+        self._thread = None
+        self._compressor = None
+
+        self._index_lock = threading.Lock()
+        self._segments = [] # Index entries, oldest first
+        self._segment_file = None
+        self._segment_entry = None
+        self._segment_opened_at = 0.0
+        self._segment_seq = 0
+
+        self._frames_archived = 0
+        self._frames_dropped = 0
+
+    # ------------------------------------------------------------------ #
+    # Lifecycle
+    # ------------------------------------------------------------------ #
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        self._compressor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="PacketArchiveCompress")
+        with self._index_lock:
+            self._segments = load_index(self.directory)
+        self._recover_unclosed_segments()
+        self._stop_requested = False
+        self._thread = threading.Thread(target=self._run, name="PacketArchiveWriter", daemon=True)
+        self._thread.start()
+        app_logger.info(f"XBee packet archive writing to {self.directory} (compression={self.compression}, "
+                        f"{len(self._segments)} existing segments).")
+
+    def close(self, timeout_s=10.0):
+        """Writes everything buffered, closes and compresses the open segment, and waits for compression."""
+        with self._lock:
+            self._stop_requested = True
+            self._wake.notify()
+        if self._thread is not None:
+            self._thread.join(timeout_s)
+            if self._thread.is_alive():
+                app_logger.warning(f"XBee packet archive writer did not stop within {timeout_s}s.")
+            self._thread = None
+        if self._compressor is not None:
+            self._compressor.shutdown(wait=True)
+            self._compressor = None
+        app_logger.info(f"XBee packet archive closed. Stats: {self.stats()}")
+
+    # ------------------------------------------------------------------ #
+    # Producer side (XBee reader thread)
+    # ------------------------------------------------------------------ #
+    def append(self, frame, timestamp=None):
+        """Buffers one raw API frame (bytes/bytearray)."""
+        if len(frame) > MAX_FRAME_BYTES:
+            self._frames_dropped += 1
+            return
+        record = RECORD_HEADER.pack(time.time() if timestamp is None else timestamp, len(frame)) + bytes(frame)
+        with self._lock:
+            self._pending.append(record)
+
+    # ------------------------------------------------------------------ #
+    # Writer thread
+    # ------------------------------------------------------------------ #
+    def _run(self):
+        while True:
+            with self._lock:
+                if not self._stop_requested:
+                    self._wake.wait(self.flush_interval_s)
+                records, self._pending = self._pending, []
+                stopping = self._stop_requested
+            try:
+                if records:
+                    self._write_records(records)
+                if self._segment_file is not None and (stopping or time.time() - self._segment_opened_at >= self.segment_max_s):
+                    self._close_segment()
+            except Exception as e:
+                self._frames_dropped += len(records)
+                app_logger.error(f"XBee packet archive write failed in {self.directory}: {e}", exc_info=True)
+            if stopping:
+                return
+
+    def _write_records(self, records):
+        for record in records:
+            if self._segment_file is None:
+                self._open_segment()
+            self._segment_file.write(record)
+            entry = self._segment_entry
+            timestamp = RECORD_HEADER.unpack_from(record)[0]
+            if entry["start_ts"] is None:
+                entry["start_ts"] = timestamp
+            entry["end_ts"] = timestamp
+            entry["frames"] += 1
+            entry["bytes"] += len(record)
+            self._frames_archived += 1
+            if entry["bytes"] >= self.segment_max_bytes:
+                self._close_segment()
+        if self._segment_file is not None:
+            self._segment_file.flush()
+
+    def _open_segment(self):
+        self._segment_seq += 1
+        file_name = f"packets_{time.strftime('%Y%m%d_%H%M%S')}_{self._segment_seq:04d}{SEGMENT_SUFFIX}"
+        self._segment_file = open(os.path.join(self.directory, file_name), "ab")
+        self._segment_opened_at = time.time()
+        self._segment_entry = {"file": file_name, "start_ts": None, "end_ts": None, "frames": 0, "bytes": 0, "open": True}
+        with self._index_lock:
+            self._segments.append(self._segment_entry)
+            self._write_index_locked()
+
+    def _close_segment(self):
+        self._segment_file.close()
+        self._segment_file = None
+        entry, self._segment_entry = self._segment_entry, None
+        with self._index_lock:
+            entry.pop("open", None)
+            self._write_index_locked()
+        if self.compression != "none" and entry["frames"]:
+            self._compressor.submit(self._compress_segment, entry)
+        else:
+            self._enforce_size_cap()
+
+    # ------------------------------------------------------------------ #
+    # Compression / size cap (compressor thread)
+    # ------------------------------------------------------------------ #
+    def _compress_segment(self, entry):
+        src = os.path.join(self.directory, entry["file"])
+        dst_name = entry["file"] + COMPRESSED_SUFFIXES[self.compression]
+        dst = os.path.join(self.directory, dst_name)
+        try:
+            with open(src, "rb") as f_in, open(dst + ".tmp", "wb") as f_out:
+                if self.compression == "zstd":
+                    zstandard.ZstdCompressor(level=3).copy_stream(f_in, f_out)
+                else:
+                    with gzip.GzipFile(fileobj=f_out, mode="wb", compresslevel=6) as gz:
+                        while True:
+                            block = f_in.read(1 << 20)
+                            if not block:
+                                break
+                            gz.write(block)
+            os.replace(dst + ".tmp", dst)
+            with self._index_lock:
+                entry["file"] = dst_name
+                entry["stored_bytes"] = os.path.getsize(dst)
+                self._write_index_locked()
+            os.remove(src)
+        except Exception as e:
+            app_logger.error(f"XBee packet archive: compressing {src} failed, keeping it uncompressed: {e}", exc_info=True)
+        self._enforce_size_cap()
+
+    def _enforce_size_cap(self):
+        if not self.max_total_bytes:
+            return
+        with self._index_lock:
+            total = sum(e.get("stored_bytes", e["bytes"]) for e in self._segments)
+            removed = []
+            while total > self.max_total_bytes and len(self._segments) > 1 and not self._segments[0].get("open"):
+                entry = self._segments.pop(0)
+                total -= entry.get("stored_bytes", entry["bytes"])
+                removed.append(entry)
+            if removed:
+                self._write_index_locked()
+        for entry in removed:
+            try:
+                os.remove(os.path.join(self.directory, entry["file"]))
+            except FileNotFoundError:
+                pass
+            app_logger.warning(f"XBee packet archive over {self.max_total_bytes} bytes: deleted oldest segment {entry['file']}.")
+
+    # ------------------------------------------------------------------ #
+    # Index
+    # ------------------------------------------------------------------ #
+    def _write_index_locked(self):
+        path = os.path.join(self.directory, INDEX_FILE_NAME)
+        with open(path + ".tmp", "w") as f:
+            json.dump({"record_header": RECORD_HEADER.format, "segments": self._segments}, f, indent=1)
+        os.replace(path + ".tmp", path)
+
+    def _recover_unclosed_segments(self):
+        """Segments a previous run left open (crash, kill) are re-scanned, closed in the index and compressed."""
+        with self._index_lock:
+            known = {e["file"] for e in self._segments}
+            orphans = []
+            for name in sorted(os.listdir(self.directory)):
+                if not name.endswith(SEGMENT_SUFFIX) or name in known:
+                    continue
+                if any(name + suffix in known for suffix in COMPRESSED_SUFFIXES.values()):
+                    os.remove(os.path.join(self.directory, name)) # Compressed copy made it; only the delete didn't
+                    continue
+                orphans.append(name)
+            for entry in self._segments:
+                if entry.get("open"):
+                    orphans.append(entry["file"])
+            self._segments = [e for e in self._segments if not e.get("open")]
+        for name in orphans:
+            path = os.path.join(self.directory, name)
+            if not os.path.exists(path):
+                continue
+            entry = {"file": name, "start_ts": None, "end_ts": None, "frames": 0, "bytes": os.path.getsize(path)}
+            for timestamp, _ in read_segment(path):
+                if entry["start_ts"] is None:
+                    entry["start_ts"] = timestamp
+                entry["end_ts"] = timestamp
+                entry["frames"] += 1
+            with self._index_lock:
+                self._segments.append(entry)
+                self._segments.sort(key=lambda e: (e["start_ts"] is None, e["start_ts"] or 0.0))
+                self._write_index_locked()
+            app_logger.info(f"XBee packet archive: recovered unclosed segment {name} ({entry['frames']} frames).")
+            if self.compression != "none" and entry["frames"]:
+                self._compressor.submit(self._compress_segment, entry)
+
+    def stats(self):
+        with self._index_lock:
+            n_segments = len(self._segments)
+            total = sum(e.get("stored_bytes", e["bytes"]) for e in self._segments)
+        return {"segments": n_segments, "stored_bytes": total,
+                "frames_archived": self._frames_archived, "frames_dropped": self._frames_dropped}
+
+
+def _parse_ts(raw):
+    return None if raw is None else float(raw)
+
+
+def _cli():
+    parser = argparse.ArgumentParser(description="Inspect the raw XBee packet archive.")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p_list = sub.add_parser("list", help="List segments with their time span")
+    p_list.add_argument("archive_dir", nargs="?", default=config.XBEE_PACKET_ARCHIVE_DIR)
+    p_dump = sub.add_parser("dump", help="Print frames in a time window as hex, like xbee_raw_packets.log")
+    p_dump.add_argument("archive_dir", nargs="?", default=config.XBEE_PACKET_ARCHIVE_DIR)
+    p_dump.add_argument("--start", help="Unix time (s)")
+    p_dump.add_argument("--end", help="Unix time (s)")
+    args = parser.parse_args()
+
+    if args.cmd == "list":
+        for entry in load_index(args.archive_dir):
+            span = "open" if entry.get("open") or entry["start_ts"] is None else \
+                f"{time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(entry['start_ts']))} .. " \
+                f"{time.strftime('%H:%M:%S', time.localtime(entry['end_ts']))}"
+            print(f"{entry['file']:45s} {span:32s} {entry['frames']:9d} frames {entry.get('stored_bytes', entry['bytes']):12d} bytes")
+    elif args.cmd == "dump":
+        for timestamp, frame in iter_frames(args.archive_dir, _parse_ts(args.start), _parse_ts(args.end)):
+            print(f"{timestamp:.3f} RawFrameData={frame.hex()}")
+
+
+if __name__ == "__main__":
+    _cli()
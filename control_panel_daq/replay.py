@@ -0,0 +1,252 @@
+# replay.py
+"""
+Replays captured XBee frames through DataProcessor without a radio.
+
+Sources:
+  --archive DIR    the packet archive written by packet_archive.py (optionally --start/--end, Unix s)
+  --text-log PATH  an xbee_raw_packets.log ("... RawFrameData=<hex>" lines; lines logged as N/A are skipped)
+
+Only Receive (0x90) frames carry CAN data; their source address and RF payload are
+rebuilt exactly as XBeeManager does and handed to
+DataProcessor.process_incoming_xbee_message (or, with --batch-size > 1,
+process_incoming_xbee_batch). Pacing: --speed 1 is real time, --speed N is N times
+faster, --speed 0 (or --fast) is as fast as possible.
+
+The replay runs on its own thread while the Qt event loop runs the UI update timer,
+the same split as the live app with the decode worker. Headless by default (exits
+and prints throughput when done); --gui opens the control panel on the replayed data.
+
+    python replay.py --archive xbee_packet_archive --fast
+    python replay.py --text-log xbee_raw_packets.log --speed 4 --gui
+"""
+import argparse
+import re
+import sys
+import threading
+import time
+from collections import namedtuple
+
+from PySide6.QtCore import QObject, Signal
+
+import config
+# logger_setup opens its log files on import, and packet_archive/data_processor import it, so
+# those are imported inside functions, after _cli() has pointed config at the replay outputs.
+
+RECEIVE_PACKET_FRAME_TYPE = 0x90
+_API_START_DELIMITER = 0x7E
+_RX_HEADER_BYTES = 15 # Delimiter, length (2), frame type, 64-bit source (8), 16-bit source (2), options
+
+# One CAN-carrying frame ready for DataProcessor.
+ReplayFrame = namedtuple("ReplayFrame", ["timestamp", "can_payload", "source_addr_64"])
+
+
+def receive_payload_from_frame(frame):
+    """
+    Returns (source_addr_64, rf_data) for an unescaped Receive Packet API frame, or None if
+    the frame is another type or fails the length/checksum check. Matches what
+    XBeeManager._packet_received_callback extracts from a ReceivePacket.
+    """
+    if len(frame) <= _RX_HEADER_BYTES or frame[0] != _API_START_DELIMITER or frame[3] != RECEIVE_PACKET_FRAME_TYPE:
+        return None
+    if ((frame[1] << 8) | frame[2]) != len(frame) - 4 or (sum(frame[3:]) & 0xFF) != 0xFF:
+        return None
+    return bytes(frame[4:12]).hex().upper(), bytearray(frame[_RX_HEADER_BYTES:-1])
+
+
+_LOG_LINE_RE = re.compile(r"^(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}),(\d{3}) - .*?RawFrameData=([0-9a-fA-F]+)")
+
+def frames_from_text_log(path):
+    """Yields (timestamp, frame_bytes) from an xbee_raw_packets.log written by xbee_packet_logger."""
+    seconds_cache = {}
+    with open(path, "r", errors="replace") as f:
+        for line in f:
+            m = _LOG_LINE_RE.match(line)
+            if not m:
+                continue
+            whole_s = seconds_cache.get(m.group(1))
+            if whole_s is None:
+                whole_s = seconds_cache[m.group(1)] = time.mktime(time.strptime(m.group(1), "%Y-%m-%d %H:%M:%S"))
+            yield whole_s + int(m.group(2)) / 1000.0, bytes.fromhex(m.group(3))
+
+
+def frames_from_archive(directory, start_ts=None, end_ts=None):
+    import packet_archive
+    return packet_archive.iter_frames(directory, start_ts, end_ts)
+
+
+class Replayer:
+    """
+    Paces ReplayFrames from `frames` ((timestamp, raw API frame) pairs) into DataProcessor.
+    With preserve_timestamps the recorded receive times are passed through instead of the
+    replay wall-clock time.
+    """
+
+    def __init__(self, raw_frames, data_processor, speed=1.0, batch_size=1, preserve_timestamps=False):
+        if speed < 0:
+            raise ValueError(f"Replay speed must be >= 0, got {speed}.")
+        self.raw_frames = raw_frames
+        self.data_processor = data_processor
+        self.speed = speed
+        self.batch_size = max(1, int(batch_size))
+        self.preserve_timestamps = preserve_timestamps
+        self._stop_requested = threading.Event()
+        self.stats = {"frames_read": 0, "frames_replayed": 0, "frames_skipped": 0, "max_lag_s": 0.0, "wall_s": 0.0}
+
+    def stop(self):
+        self._stop_requested.set()
+
+    def _deliver(self, batch):
+        if self.batch_size == 1:
+            timestamp, can_payload, source_addr = batch[0]
+            self.data_processor.process_incoming_xbee_message(
+                {'timestamp': timestamp, 'can_payload': can_payload, 'source_addr_64': source_addr})
+        else:
+            self.data_processor.process_incoming_xbee_batch(batch)
+        self.stats["frames_replayed"] += len(batch)
+
+    def run(self):
+        wall_start = time.perf_counter()
+        first_ts = None
+        batch = []
+        for timestamp, frame in self.raw_frames:
+            if self._stop_requested.is_set():
+                break
+            self.stats["frames_read"] += 1
+            parsed = receive_payload_from_frame(frame)
+            if parsed is None:
+                self.stats["frames_skipped"] += 1
+                continue
+            if first_ts is None:
+                first_ts = timestamp
+            if self.speed > 0:
+                due = wall_start + (timestamp - first_ts) / self.speed
+                now = time.perf_counter()
+                if due > now:
+                    if batch: # Deliver what is already due before waiting for the next frame
+                        self._deliver(batch)
+                        batch = []
+                    time.sleep(due - now)
+                else:
+                    self.stats["max_lag_s"] = max(self.stats["max_lag_s"], now - due)
+            source_addr, can_payload = parsed
+            batch.append(ReplayFrame(timestamp if self.preserve_timestamps else time.time(), can_payload, source_addr))
+            if len(batch) >= self.batch_size:
+                self._deliver(batch)
+                batch = []
+        if batch:
+            self._deliver(batch)
+        self.stats["wall_s"] = time.perf_counter() - wall_start
+        return self.stats
+
+
+class OfflineXBeeManager(QObject):
+    """Stands in for XBeeManager under --gui: same signals, no radio. Commands are logged and dropped."""
+    xbee_connected = Signal(str)
+    xbee_disconnected = Signal(str)
+    connection_error = Signal(str)
+    transmit_status_update = Signal(dict)
+    log_message = Signal(str)
+    radio_status_updated = Signal(dict)
+
+    def autodetect_and_connect(self):
+        self.log_message.emit("Replay mode: no radio, not connecting.")
+
+    def disconnect_device(self):
+        pass
+
+    def send_command_to_configured_targets(self, command_value, command_name):
+        self.log_message.emit(f"Replay mode: command '{command_name}' not sent.")
+
+    def check_all_radio_statuses(self):
+        self.log_message.emit("Replay mode: radio health checks are disabled.")
+
+    def request_board_status_all_targets(self):
+        pass
+
+
+class _ReplayThread(QObject):
+    finished = Signal(dict)
+
+    def __init__(self, replayer):
+        super().__init__()
+        self.replayer = replayer
+        self._thread = threading.Thread(target=self._run, name="Replay", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def _run(self):
+        try:
+            stats = self.replayer.run()
+        except Exception as e:
+            from logger_setup import app_logger
+            app_logger.error(f"Replay failed: {e}", exc_info=True)
+            stats = dict(self.replayer.stats, error=str(e))
+        self.finished.emit(stats)
+
+
+def _cli():
+    parser = argparse.ArgumentParser(description="Replay captured XBee frames through the control panel pipeline.")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--archive", help="Packet archive directory")
+    source.add_argument("--text-log", help="xbee_raw_packets.log with RawFrameData hex")
+    parser.add_argument("--start", type=float, help="Archive only: first frame time (Unix s)")
+    parser.add_argument("--end", type=float, help="Archive only: last frame time (Unix s)")
+    parser.add_argument("--speed", type=float, default=1.0, help="1 = real time, N = N times faster, 0 = as fast as possible")
+    parser.add_argument("--fast", action="store_true", help="Same as --speed 0")
+    parser.add_argument("--batch-size", type=int, default=1, help="> 1: deliver via process_incoming_xbee_batch")
+    parser.add_argument("--preserve-timestamps", action="store_true", help="Pass recorded receive times through")
+    parser.add_argument("--sensor-output", default="replay_sensor_data.bin", help="Binary sensor recording for the replayed samples")
+    parser.add_argument("--parquet-output", help="Also write the replayed samples as a Parquet dataset here")
+    parser.add_argument("--data-log", default="replay_sensor_data_log.csv", help="Sensor data CSV log used during the replay")
+    parser.add_argument("--gui", action="store_true", help="Show the control panel instead of exiting when done")
+    args = parser.parse_args()
+
+    # Replay never touches hardware or the live recordings: samples go to the binary recorder at
+    # --sensor-output (and --parquet-output, if given), never the live CSV or Parquet dataset.
+    config.LABJACK_ENABLED = False
+    config.SENSOR_RECORDER_ENABLED = True
+    config.SENSOR_RECORD_FILE_NAME = args.sensor_output
+    config.SENSOR_RECORDER_PARQUET_DIR = args.parquet_output
+    config.DATA_LOG_FILE_NAME = args.data_log
+
+    if args.gui:
+        from PySide6.QtWidgets import QApplication
+        app = QApplication(sys.argv)
+    else:
+        from PySide6.QtCore import QCoreApplication
+        app = QCoreApplication(sys.argv)
+    from data_processor import DataProcessor
+    data_processor = DataProcessor()
+
+    ui_updates = [0]
+    data_processor.ui_update_sensor.connect(lambda *a: ui_updates.__setitem__(0, ui_updates[0] + 1))
+    if args.gui:
+        from ui_control_panel import ControlPanelWindow
+        main_window = ControlPanelWindow(OfflineXBeeManager(), data_processor)
+        main_window.show()
+
+    raw_frames = frames_from_archive(args.archive, args.start, args.end) if args.archive else frames_from_text_log(args.text_log)
+    replayer = Replayer(raw_frames, data_processor, speed=0.0 if args.fast else args.speed,
+                        batch_size=args.batch_size, preserve_timestamps=args.preserve_timestamps)
+    replay_thread = _ReplayThread(replayer)
+
+    def on_finished(stats):
+        rate = stats["frames_replayed"] / stats["wall_s"] if stats["wall_s"] > 0 else 0.0
+        summary = (f"Replay done: {stats['frames_replayed']} frames replayed ({stats['frames_skipped']} non-CAN/invalid skipped) "
+                   f"in {stats['wall_s']:.2f} s = {rate:,.0f} frames/s, max lag {stats['max_lag_s'] * 1000:.1f} ms, "
+                   f"{ui_updates[0]} UI sensor updates.")
+        print(summary)
+        if not args.gui:
+            data_processor.close_sensor_recorder()
+            app.quit()
+
+    replay_thread.finished.connect(on_finished)
+    app.aboutToQuit.connect(replayer.stop)
+    app.aboutToQuit.connect(data_processor.close_sensor_recorder)
+    replay_thread.start()
+    sys.exit(app.exec())
+
+
+if __name__ == "__main__":
+    _cli()
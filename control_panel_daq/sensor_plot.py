@@ -5,12 +5,31 @@
 -------------------------------------------
 * `Maximum value per tag` now prints both the value **and its unit symbol**.
 * Auto‑detects the unit column (`units` or `unit`) just like other columns.
+
+`filepath` may also be a Parquet dataset directory (hspdaq.columnar layout, from
+`sensor_recorder.py export --format parquet` or `python -m hspdaq.columnar convert`).
+Only the requested window is read. Its timestamps are true UTC, whereas CSV
+wall‑clock times are taken as UTC as they always have been.
+
+`sensor_plot.py batch FILE... --window START END [--window ...]` runs the same
+impulse/maxima (and optionally plots) over every file × window on a process
+pool and writes one summary table (CSV or JSON).
 """
 from __future__ import annotations
 
 import argparse
+import codecs
+import contextlib
+import csv
+import hashlib
+import io
+import json
+import os
 import re
 import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 from typing import Dict, List, Tuple
 
@@ -18,6 +37,13 @@ import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
 
+# Plot decimation is shared with the HSPDAQ app (sibling directory in this repo)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "HSPDaq-App"))
+from hspdaq import columnar  # noqa: E402
+from hspdaq.decimate import METHODS as DECIMATE_METHODS, decimate  # noqa: E402
+
+_SAVE_DPI = 150
+
 ###############################################################################
 # CLI timestamp helper
 ###############################################################################
@@ -80,27 +106,247 @@ def _map_columns(cols: pd.Index):
 # Stream rows in window
 ###############################################################################
 
-def stream_window(path: Path, start_ts: pd.Timestamp, end_ts: pd.Timestamp, *, verbose=False, debug=False):
+_BLOCK_BYTES = 64 << 20  # fast path parses ~64 MB of whole lines (~1M rows) at a time
+_NAT_NS = np.iinfo(np.int64).min
+
+
+def _line_blocks(path: Path, block_bytes: int = _BLOCK_BYTES, start: int | None = None, stop: int | None = None,
+                 complete_only: bool = False):
+    """
+    Yields (header, block, offset) with each block ending on a line boundary, so one block can be
+    re-parsed alone; offset is the block's absolute byte position. start (a line start) and stop bound
+    the bytes read; complete_only leaves out a final line with no newline yet (file still being written).
+    """
+    with open(path, "rb") as f:
+        header = f.readline()
+        if start is not None:
+            f.seek(start)
+        pos = f.tell()
+        if header.startswith(codecs.BOM_UTF8):
+            header = header[len(codecs.BOM_UTF8):]
+        tail = b""
+        while True:
+            want = block_bytes if stop is None else min(block_bytes, stop - pos - len(tail))
+            data = f.read(want) if want > 0 else b""
+            if not data:
+                if tail.strip() and not complete_only:
+                    yield header, tail, pos
+                return
+            data = tail + data
+            cut = data.rfind(b"\n") + 1
+            if not cut:  # one line longer than a block
+                tail = data
+                continue
+            tail = data[cut:]
+            yield header, data[:cut], pos
+            pos += cut
+
+
+_ROW_KEYS = ("date", "ms", "tag", "value", "unit")
+_TIME_KEYS = ("date", "ms")
+
+
+def _parse_fast(data: bytes, mapper, keys=_ROW_KEYS):
+    """C engine with typed columns; timestamps from the (few) distinct date strings plus the ms column."""
+    # Few distinct dates/tags/units per block: categoricals build each string once
+    dtypes = {"date": "category", "ms": "float64", "tag": "category", "value": object, "unit": "category"}
+    chunk = pd.read_csv(
+        io.BytesIO(data),
+        engine="c",
+        usecols=[mapper[k] for k in keys],
+        dtype={mapper[k]: dtypes[k] for k in keys},
+        skipinitialspace=True,
+        on_bad_lines="skip",
+        encoding="utf-8",
+    )
+    dates = chunk[mapper["date"]].cat
+    seconds = pd.to_datetime(dates.categories.str.strip(), format="%Y-%m-%d %H:%M:%S", errors="coerce", utc=True)
+    base_ns = np.append(seconds.as_unit("ns").asi8, _NAT_NS)  # code -1 (missing date) -> NaT
+    ns = base_ns[dates.codes]
+    ms = chunk[mapper["ms"]].to_numpy(dtype=np.float64)
+    ok = (ns != _NAT_NS) & np.isfinite(ms)
+    ns = np.where(ok, ns + np.nan_to_num(ms).astype(np.int64) * 1_000_000, _NAT_NS)
+    return ns, chunk
+
+
+def _parse_tolerant(chunk: pd.DataFrame, mapper):
+    """String columns from the Python engine, parsed the way sensor_plot always has."""
+    ts_str = chunk[mapper["date"]].str.strip() + "." + chunk[mapper["ms"]].str.zfill(3)
+    ts = pd.to_datetime(ts_str, format="%Y-%m-%d %H:%M:%S.%f", errors="coerce", utc=True)
+    ns = ts.dt.as_unit("ns").to_numpy(dtype="datetime64[ns]").view(np.int64)
+    return ns, chunk
+
+
+def _window_rows(ns, chunk, mapper, start_ns: int, end_ns: int):
+    """Rows with a valid timestamp in [start_ns, end_ns] and a numeric value, as timestamp/tag/value/unit."""
+    in_window = (ns != _NAT_NS) & (ns >= start_ns) & (ns <= end_ns)
+    if not in_window.any():
+        return None
+    values = pd.to_numeric(chunk[mapper["value"]].to_numpy()[in_window], errors="coerce")
+    keep = ~np.isnan(values)
+    rows = np.flatnonzero(in_window)[keep]
+    return pd.DataFrame({
+        "timestamp": pd.to_datetime(ns[rows], unit="ns", utc=True),
+        "tag": _take_column(chunk[mapper["tag"]], rows),
+        "value": values[keep],
+        "unit": _take_column(chunk[mapper["unit"]], rows),
+    })
+
+
+def _take_column(col: pd.Series, rows: np.ndarray) -> np.ndarray:
+    """Object array of col[rows]; categoricals are expanded from their categories (missing -> None)."""
+    if isinstance(col.dtype, pd.CategoricalDtype):
+        labels = np.append(col.cat.categories.to_numpy(dtype=object), None)
+        return labels[col.cat.codes.to_numpy()[rows]]
+    return col.to_numpy(dtype=object)[rows]
+
+
+def _tolerant_chunks(path: Path, mapper):
+    for chunk in _chunk_iter(path):
+        yield _parse_tolerant(chunk, mapper)
+
+
+def _parse_block(header: bytes, data: bytes, mapper, keys=_ROW_KEYS, *, verbose=False):
+    try:
+        return _parse_fast(header + data, mapper, keys)
+    except (ValueError, UnicodeDecodeError, pd.errors.ParserError) as exc:
+        # e.g. a non-numeric ms field; only this block goes through the Python engine
+        if verbose:
+            print(f"fast CSV parse failed ({exc}); re-parsing block with the Python engine")
+        chunk = pd.read_csv(io.BytesIO(header + data), dtype=str, header=0, engine="python",
+                            skipinitialspace=True, on_bad_lines="skip", encoding="utf-8")
+        return _parse_tolerant(chunk, mapper)
+
+
+def _fast_chunks(path: Path, mapper, *, byte_range=None, verbose=False):
+    start, stop = byte_range if byte_range is not None else (None, None)
+    for header, data, _offset in _line_blocks(path, start=start, stop=stop):
+        yield _parse_block(header, data, mapper, verbose=verbose)
+
+###############################################################################
+# Time index sidecar ("<csv>.tidx.json")
+###############################################################################
+# Every ~_INDEX_STRIDE_BYTES of whole lines the index stores the block's byte offset and its
+# min/max timestamp. Logged timestamps are only roughly ordered: several threads log, rows carry
+# their sample time (a LabJack block or a queued frame is logged after it was taken), and the
+# batch decoder writes a batch's PT rows before its other frames. So a window is located with the
+# running max of block maxima and the reverse running min of block minima, which never skips a
+# matching row whatever the order; disorder only widens the byte range that gets read.
+# The index is extended, not rebuilt, when the log has grown since it was written.
+
+_INDEX_VERSION = 1
+_INDEX_STRIDE_BYTES = 1 << 20
+_INDEX_PREFIX_BYTES = 1 << 16  # hashed to notice a log that was replaced rather than appended to
+_MAX_NS = np.iinfo(np.int64).max
+
+
+def index_path_for(path: Path) -> Path:
+    return Path(f"{path}.tidx.json")
+
+
+def _prefix_digest(path: Path, n_bytes: int) -> str:
+    with open(path, "rb") as f:
+        return hashlib.sha1(f.read(min(n_bytes, _INDEX_PREFIX_BYTES))).hexdigest()
+
+
+def _load_index(path: Path, header: bytes):
+    try:
+        with open(index_path_for(path), "r") as f:
+            index = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+    if (index.get("version") != _INDEX_VERSION or index.get("header") != header.decode("utf-8", "replace")
+            or index["indexed_bytes"] > os.path.getsize(path)
+            or index.get("prefix_sha1") != _prefix_digest(path, index["indexed_bytes"])):
+        return None
+    return index
+
+
+def update_time_index(path: Path, mapper, *, stride_bytes: int = _INDEX_STRIDE_BYTES, verbose=False):
+    """Loads the sidecar index, indexes any complete lines appended since, saves it, and returns it."""
+    with open(path, "rb") as f:
+        header = f.readline()
+    header_end = len(header)
+    header = header[len(codecs.BOM_UTF8):] if header.startswith(codecs.BOM_UTF8) else header
+    index = _load_index(path, header) or {
+        "version": _INDEX_VERSION, "header": header.decode("utf-8", "replace"), "stride_bytes": stride_bytes,
+        "indexed_bytes": header_end, "offsets": [], "t_min_ns": [], "t_max_ns": [],
+    }
+    start = index["indexed_bytes"]
+    if start >= os.path.getsize(path):
+        return index
+    t0 = time.perf_counter()
+    for _header, data, offset in _line_blocks(path, index["stride_bytes"], start=start, complete_only=True):
+        ns, _chunk = _parse_block(header, data, mapper, _TIME_KEYS)
+        valid = ns[ns != _NAT_NS]
+        index["offsets"].append(offset)
+        index["t_min_ns"].append(int(valid.min()) if len(valid) else _MAX_NS)
+        index["t_max_ns"].append(int(valid.max()) if len(valid) else _NAT_NS)
+        index["indexed_bytes"] = offset + len(data)
+    if index["indexed_bytes"] == start:
+        return index
+    index["prefix_sha1"] = _prefix_digest(path, index["indexed_bytes"])
+    tmp_path = f"{index_path_for(path)}.{os.getpid()}.tmp"  # batch workers may index the same file
+    try:
+        with open(tmp_path, "w") as f:
+            json.dump(index, f)
+        os.replace(tmp_path, index_path_for(path))
+    except OSError as exc:  # read-only data directory: use the index for this run only
+        print(f"Could not save time index {index_path_for(path)}: {exc}")
+    if verbose:
+        print(f"Time index: {len(index['offsets'])} blocks, indexed {index['indexed_bytes'] - start:,} new bytes "
+              f"in {time.perf_counter() - t0:.2f} s")
+    return index
+
+
+def _index_byte_range(index, start_ns: int, end_ns: int):
+    """(first byte, stop byte) of the blocks that can hold rows in [start_ns, end_ns], or None."""
+    if not index["offsets"]:
+        return None
+    max_so_far = np.maximum.accumulate(np.asarray(index["t_max_ns"], dtype=np.int64))
+    min_after = np.minimum.accumulate(np.asarray(index["t_min_ns"], dtype=np.int64)[::-1])[::-1]
+    first = int(np.searchsorted(max_so_far, start_ns, side="left"))
+    last = int(np.searchsorted(min_after, end_ns, side="right")) - 1
+    if first > last:
+        return None
+    offsets = index["offsets"]
+    stop = offsets[last + 1] if last + 1 < len(offsets) else index["indexed_bytes"]
+    return offsets[first], stop
+
+
+def stream_window(path: Path, start_ts: pd.Timestamp, end_ts: pd.Timestamp, *, verbose=False, debug=False,
+                  engine: str = "fast", use_index: bool = True):
+    """
+    Yields DataFrames (timestamp, tag, value, unit) of the rows in [start_ts, end_ts].
+    engine="fast" parses with the C engine and falls back per block; "python" is the old all-Python path.
+    With use_index (fast engine only) the time index sidecar is brought up to date and only the
+    byte range that can hold the window is read.
+    """
+    header = pd.read_csv(path, nrows=0, encoding="utf-8-sig", skipinitialspace=True, engine="python")
+    mapper = _map_columns(header.columns)
+    start_ns, end_ns = start_ts.as_unit("ns").value, end_ts.as_unit("ns").value
+    if engine == "fast":
+        byte_range = None
+        if use_index:
+            byte_range = _index_byte_range(update_time_index(path, mapper, verbose=verbose), start_ns, end_ns)
+            if byte_range is None:
+                if verbose or debug:
+                    print("Total rows kept: 0 (time index: no block overlaps the window)")
+                return
+            if verbose:
+                print(f"Time index: reading bytes {byte_range[0]:,}..{byte_range[1]:,}")
+        chunks = _fast_chunks(path, mapper, byte_range=byte_range, verbose=verbose)
+    else:
+        chunks = _tolerant_chunks(path, mapper)
     kept = 0
-    mapper = None
-    for idx, chunk in enumerate(_chunk_iter(path), 1):
-        if mapper is None:
-            mapper = _map_columns(chunk.columns)
-        ts_str = chunk[mapper["date"]].str.strip() + "." + chunk[mapper["ms"]].str.zfill(3)
-        ts = pd.to_datetime(ts_str, format="%Y-%m-%d %H:%M:%S.%f", errors="coerce", utc=True)
-        chunk["timestamp"] = ts
-        chunk.dropna(subset=["timestamp"], inplace=True)
-        chunk["value"] = pd.to_numeric(chunk[mapper["value"]], errors="coerce")
-        chunk.dropna(subset=["value"], inplace=True)
-        filt = chunk[(chunk["timestamp"] >= start_ts) & (chunk["timestamp"] <= end_ts)]
-        if not filt.empty:
+    for idx, (ns, chunk) in enumerate(chunks, 1):
+        filt = _window_rows(ns, chunk, mapper, start_ns, end_ns)
+        if filt is not None and not filt.empty:
             kept += len(filt)
-            yield filt[["timestamp", mapper["tag"], "value", mapper["unit"]]].rename(
-                columns={mapper["tag"]: "tag", mapper["unit"]: "unit"}
-            )
+            yield filt
         if debug and idx == 1:
-            print("[DEBUG] Timestamp sample:", ts.head(3).tolist())
-            print("[DEBUG] Rows in window (chunk 1):", len(filt))
+            print("[DEBUG] Timestamp sample:", pd.to_datetime(ns[:3], unit="ns", utc=True).tolist())
+            print("[DEBUG] Rows in window (chunk 1):", 0 if filt is None else len(filt))
         if verbose and idx % 25 == 0:
             print(f"chunk {idx}: cumulative kept rows = {kept}")
     if verbose or debug:
@@ -110,30 +356,63 @@ def stream_window(path: Path, start_ts: pd.Timestamp, end_ts: pd.Timestamp, *, v
 # Aggregate per tag (store unit once)
 ###############################################################################
 
-def collect_series(path: Path, start_ts: pd.Timestamp, end_ts: pd.Timestamp, *, verbose=False, debug=False):
-    series: Dict[str, Tuple[List[pd.Timestamp], List[float]]] = {}
+# Per tag: (int64 ns since the Unix epoch, float64 values), in file order.
+Series = Dict[str, Tuple[np.ndarray, np.ndarray]]
+
+
+def _collect_columnar(path: Path, start_ts: pd.Timestamp, end_ts: pd.Timestamp, *, verbose=False):
+    """Parquet dataset (hspdaq.columnar layout): only the window's row groups and needed columns are read."""
+    table = columnar.read_window(path, start_ts.value, end_ts.value,
+                                 columns=(columnar.TIME_COLUMN, "value", "unit"))
+    series: Series = {}
+    units: Dict[str, str] = {}
+    for tag, sub in columnar.iter_channels(table):
+        values = sub.column("value").to_numpy()
+        keep = ~np.isnan(values)
+        series[tag] = (sub.column(columnar.TIME_COLUMN).to_numpy()[keep], values[keep])
+        unit = sub.column("unit")[0].as_py()
+        if unit is not None:
+            units[tag] = unit
+    if verbose:
+        print(f"Total rows kept: {table.num_rows}")
+    return series, units
+
+
+def collect_series(path: Path, start_ts: pd.Timestamp, end_ts: pd.Timestamp, *, verbose=False, debug=False,
+                   engine: str = "fast", use_index: bool = True):
+    """
+    (series, units) for the window: per tag, int64 ns timestamps and float64 values. Chunks are
+    gathered as NumPy slices per tag and concatenated once at the end.
+    """
+    if columnar.is_dataset(path):
+        return _collect_columnar(path, start_ts, end_ts, verbose=verbose)
+    parts: Dict[str, Tuple[List[np.ndarray], List[np.ndarray]]] = {}
     units: Dict[str, str] = {}
-    for chunk in stream_window(path, start_ts, end_ts, verbose=verbose, debug=debug):
-        for tag, grp in chunk.groupby("tag", sort=False):
-            ts_list, val_list = series.setdefault(tag, ([], []))
-            ts_list.extend(grp["timestamp"].tolist())
-            val_list.extend(grp["value"].tolist())
-            if tag not in units and not grp["unit"].empty:
-                units[tag] = grp["unit"].iloc[0]
+    for chunk in stream_window(path, start_ts, end_ts, verbose=verbose, debug=debug, engine=engine,
+                                use_index=use_index):
+        ns = chunk["timestamp"].to_numpy(dtype="datetime64[ns]").view(np.int64)
+        values = chunk["value"].to_numpy(dtype=np.float64)
+        unit_col = chunk["unit"].to_numpy(dtype=object)
+        for tag, rows in chunk.groupby("tag", sort=False).indices.items():
+            ts_parts, val_parts = parts.setdefault(tag, ([], []))
+            ts_parts.append(ns[rows])
+            val_parts.append(values[rows])
+            if tag not in units and not pd.isna(unit_col[rows[0]]):
+                units[tag] = unit_col[rows[0]]
+    series: Series = {tag: (np.concatenate(ts_parts), np.concatenate(val_parts))
+                      for tag, (ts_parts, val_parts) in parts.items()}
     return series, units
 
 ###############################################################################
 # Impulse (LC-only)
 ###############################################################################
 
-def compute_impulses(series):
+def compute_impulses(series: Series):
     impulses = {}
-    for tag, (ts_list, val_list) in series.items():
-        if not tag.upper().startswith("LC") or len(ts_list) < 2:
+    for tag, (ns, v) in series.items():
+        if not tag.upper().startswith("LC") or len(ns) < 2:
             continue
-        t = np.array([t.timestamp() for t in ts_list])
-        v = np.array(val_list, dtype=float)
-        dt = np.diff(t)
+        dt = np.diff(ns) / 1e9
         impulses[tag] = float(np.sum(0.5 * (v[:-1] + v[1:]) * dt))
     return impulses
 
@@ -141,24 +420,34 @@ def compute_impulses(series):
 # Max per tag
 ###############################################################################
 
-def compute_maxes(series):
-    return {tag: float(np.nanmax(vals)) for tag, (_, vals) in series.items() if vals}
+def compute_maxes(series: Series):
+    return {tag: float(np.nanmax(vals)) for tag, (_, vals) in series.items() if len(vals)}
 
 ###############################################################################
-# Plotting (unchanged)
+# Plotting (decimated to the figure width)
 ###############################################################################
 
-def plot_series(series, *, out_dir: Path, interactive: bool):
+def _decimated(ns: np.ndarray, values: np.ndarray, width_px: int, method: str):
+    """Reduce one tag's series to what a `width_px`-wide axis can show; x comes back as datetimes."""
+    secs = (ns - ns[0]) / 1e9  # relative seconds keep float precision
+    x, y = decimate(secs, values, width_px, method)
+    return pd.to_datetime(ns[0] + np.round(x * 1e9).astype(np.int64), unit="ns", utc=True), y
+
+
+def plot_series(series: Series, *, out_dir: Path, interactive: bool, decimate_method: str = "minmax"):
     if not series:
         print("No numeric sensor data found in the specified window.")
         return
     if not interactive:
         out_dir.mkdir(parents=True, exist_ok=True)
-    for tag, (ts_list, val_list) in series.items():
-        if not ts_list:
+    for tag, (ns, values) in series.items():
+        if not len(ns):
             continue
-        plt.figure()
-        plt.plot(ts_list, val_list, linewidth=1)
+        fig = plt.figure()
+        # Never hand matplotlib more points than the saved/displayed figure has pixel columns
+        width_px = int(fig.get_figwidth() * (fig.dpi if interactive else _SAVE_DPI))
+        xs, ys = _decimated(ns, values, width_px, decimate_method)
+        plt.plot(xs, ys, linewidth=1)
         plt.title(tag)
         plt.xlabel("Timestamp (UTC)")
         plt.ylabel("Value")
@@ -168,32 +457,157 @@ def plot_series(series, *, out_dir: Path, interactive: bool):
             plt.show(block=False)
         else:
             fname = out_dir / f"{tag.replace('/', '_')}.png"
-            plt.savefig(fname, dpi=150)
+            plt.savefig(fname, dpi=_SAVE_DPI)
             plt.close()
             print(f"Saved {fname}")
     if interactive:
         print("Close all plot windows to return to the shell…")
         plt.show()
 
+###############################################################################
+# Batch mode: many files × many windows in worker processes
+###############################################################################
+# python sensor_plot.py batch day1.csv day2.csv --window START END [--window ...] \
+#        [--windows-file burns.csv] [--summary summary.csv|.json] [--plots-dir DIR] [--jobs N]
+
+_SUMMARY_FIELDS = ("file", "window", "start", "end", "tag", "unit", "samples", "max", "impulse")
+
+
+def _read_windows_file(path: Path):
+    """CSV with start,end columns (CLI timestamp formats) and an optional label column."""
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        return [(row.get("label") or f"w{i}", _cli_to_timestamp(row["start"]), _cli_to_timestamp(row["end"]))
+                for i, row in enumerate(csv.DictReader(f), 1)]
+
+
+def _init_worker():
+    import matplotlib
+    matplotlib.use("Agg")  # no GUI in worker processes
+
+
+def _index_file(path: Path):
+    """Bring a CSV's time index up to date once, before its window jobs run concurrently."""
+    header = pd.read_csv(path, nrows=0, encoding="utf-8-sig", skipinitialspace=True, engine="python")
+    update_time_index(path, _map_columns(header.columns))
+    return path
+
+
+def _plot_names(files):
+    """
+    A distinct PNG directory prefix per input file: the stem, or parent_stem when stems repeat
+    (every control-panel log is sensor_data_log.csv), plus the file's position if that still collides.
+    """
+    stems = Counter(p.stem for p in files)
+    names = [p.stem if stems[p.stem] == 1 else f"{p.parent.name}_{p.stem}" for p in files]
+    counts = Counter(names)
+    return [name if counts[name] == 1 else f"{i}_{name}" for i, name in enumerate(names, 1)]
+
+
+def _analyze_window(path: Path, plot_name: str, label: str, start_ts: pd.Timestamp, end_ts: pd.Timestamp,
+                    plots_dir: Path | None, decimate_method: str):
+    """One (file, window) job: summary rows per tag, plus Agg-rendered PNGs when plots_dir is set."""
+    series, units = collect_series(path, start_ts, end_ts)
+    impulses = compute_impulses(series)
+    maxes = compute_maxes(series)
+    rows = [{
+        "file": str(path), "window": label, "start": start_ts.isoformat(), "end": end_ts.isoformat(),
+        "tag": tag, "unit": units.get(tag, ""), "samples": int(len(series[tag][0])),
+        "max": maxes.get(tag), "impulse": impulses.get(tag),
+    } for tag in series]
+    if plots_dir is not None:
+        with contextlib.redirect_stdout(io.StringIO()):  # "Saved ..." per PNG would interleave across workers
+            plot_series(series, out_dir=plots_dir / f"{plot_name}_{label}", interactive=False,
+                        decimate_method=decimate_method)
+    return rows
+
+
+def run_batch(files, windows, *, jobs=None, plots_dir: Path | None = None, decimate_method: str = "minmax"):
+    """Runs every (file, window) pair on a process pool; returns the summary rows in input order."""
+    tasks = [(path, plot_name, *window) for path, plot_name in zip(files, _plot_names(files)) for window in windows]
+    results: Dict[int, List[dict]] = {}
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker) as pool:
+        csv_files = [p for p in files if not columnar.is_dataset(p)]
+        for future in as_completed([pool.submit(_index_file, p) for p in csv_files]):
+            future.result()
+        futures = {pool.submit(_analyze_window, path, plot_name, label, start, end, plots_dir, decimate_method): i
+                   for i, (path, plot_name, label, start, end) in enumerate(tasks)}
+        for n_done, future in enumerate(as_completed(futures), 1):
+            i = futures[future]
+            results[i] = future.result()
+            path, _, label = tasks[i][:3]
+            print(f"[{n_done}/{len(tasks)}] {path.name} {label}: {len(results[i])} tags")
+    return [row for i in range(len(tasks)) for row in results[i]]
+
+
+def write_summary(rows, out_path: Path):
+    """Summary table as JSON (by suffix) or CSV."""
+    if out_path.suffix.lower() == ".json":
+        with open(out_path, "w") as f:
+            json.dump(rows, f, indent=1)
+        return
+    with open(out_path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=_SUMMARY_FIELDS)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def _batch_main(argv):
+    p = argparse.ArgumentParser(prog="sensor_plot.py batch",
+                                description="Impulse and maxima over many files and windows, in parallel.")
+    p.add_argument("files", nargs="+", type=Path, help="CSV logs and/or Parquet dataset directories")
+    p.add_argument("--window", nargs=2, action="append", default=[], metavar=("START", "END"),
+                   type=_cli_to_timestamp, help="Analysis window; repeat for several burns")
+    p.add_argument("--windows-file", type=Path, help="CSV of windows: label,start,end")
+    p.add_argument("--summary", type=Path, default=Path("summary.csv"), help="Combined table (.csv or .json)")
+    p.add_argument("--plots-dir", type=Path, help="Also render PNGs to DIR/<file>_<window>/")
+    p.add_argument("--decimate", choices=DECIMATE_METHODS, default="minmax")
+    p.add_argument("--jobs", type=int, default=os.cpu_count(), help="Worker processes (default: all cores)")
+    args = p.parse_args(argv)
+
+    windows = [(f"w{i}", start, end) for i, (start, end) in enumerate(args.window, 1)]
+    if args.windows_file:
+        windows += _read_windows_file(args.windows_file)
+    if not windows:
+        p.error("give at least one --window or a --windows-file")
+    for label, start, end in windows:
+        if end < start:
+            p.error(f"window {label}: end time precedes start time")
+    missing = [str(f) for f in args.files if not f.exists()]
+    if missing:
+        sys.exit(f"File not found: {', '.join(missing)}")
+
+    t0 = time.perf_counter()
+    rows = run_batch(args.files, windows, jobs=args.jobs, plots_dir=args.plots_dir, decimate_method=args.decimate)
+    write_summary(rows, args.summary)
+    print(f"{len(args.files)} file(s) × {len(windows)} window(s) on {args.jobs} workers in "
+          f"{time.perf_counter() - t0:.1f} s; summary: {args.summary}")
+
 ###############################################################################
 # CLI glue
 ###############################################################################
 
 def _cli():
     p = argparse.ArgumentParser(description="Plot sensor readings, load-cell impulse, and per-tag maxima with units.")
-    p.add_argument("filepath", type=Path)
+    p.add_argument("filepath", type=Path, help="sensor_data_log.csv, or a Parquet dataset directory")
     p.add_argument("start_time", type=_cli_to_timestamp)
     p.add_argument("end_time", type=_cli_to_timestamp)
     p.add_argument("--output_dir", default="plots", type=Path)
     p.add_argument("--interactive", action="store_true")
+    p.add_argument("--decimate", choices=DECIMATE_METHODS, default="minmax",
+                   help="Point reduction before plotting: min/max envelope (keeps peaks), LTTB, or none")
+    p.add_argument("--no-index", action="store_true",
+                   help="Scan the whole CSV instead of building/using the <file>.tidx.json time index")
     p.add_argument("--verbose", action="store_true")
     p.add_argument("--debug", action="store_true")
     return p.parse_args()
 
 
 def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "batch":
+        _batch_main(sys.argv[2:])
+        return
     args = _cli()
-    if not args.filepath.is_file():
+    if not args.filepath.exists():
         sys.exit(f"File not found: {args.filepath}")
     if args.end_time < args.start_time:
         sys.exit("End time must not precede start time.")
@@ -201,7 +615,8 @@ def main():
     window_s = (args.end_time - args.start_time).total_seconds()
     print(f"Total window duration: {window_s:.3f} s")
 
-    series, units = collect_series(args.filepath, args.start_time, args.end_time, verbose=args.verbose, debug=args.debug)
+    series, units = collect_series(args.filepath, args.start_time, args.end_time, verbose=args.verbose, debug=args.debug,
+                                   use_index=not args.no_index)
 
     impulses = compute_impulses(series)
     if impulses:
@@ -221,7 +636,7 @@ def main():
     else:
         print("No numeric data to compute maxima.")
 
-    plot_series(series, out_dir=args.output_dir, interactive=args.interactive)
+    plot_series(series, out_dir=args.output_dir, interactive=args.interactive, decimate_method=args.decimate)
 
 if __name__ == "__main__":
     main()
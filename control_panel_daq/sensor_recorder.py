@@ -0,0 +1,460 @@
+# sensor_recorder.py
+"""
+Binary high-rate recorder for decoded sensor samples.
+
+Replaces per-sample text logging to sensor_data_log.csv on the decode hot path. Each
+sample is one fixed-width little-endian record (RECORD_STRUCT, 16 bytes):
+
+    timestamp  float64  Unix time the sample was received/read
+    channel    uint16   Index into the channel table in the sidecar file
+    value      float32  Decoded value (NaN for text-valued channels)
+    raw        uint16   Raw ADC count where there is one (PTs), else 0
+
+Records are packed into a preallocated bytearray; full buffers (and, every
+flush_interval_s, the partly filled one) are handed to a background thread that
+writes them to disk in large blocks. Channel metadata (name, unit, board,
+component_type, instance_id and, for text-valued samples such as servo states,
+the text itself) lives in "<record file>.channels.json" next to the data. Only a
+fixed set of enumerated strings (text_values, by default config.SERVO_STATES)
+gets text channels; free-form strings are rejected so the table stays small.
+
+Run "python sensor_recorder.py export sensor_data.bin" (writes sensor_data.csv) to
+produce the CSV schema sensor_plot.py reads, or add "--format parquet" for a
+channel-partitioned Parquet dataset (hspdaq.columnar layout, which sensor_plot.py
+also reads). With config.SENSOR_RECORDER_PARQUET_DIR set, the writer thread
+produces that dataset directly alongside the binary file.
+"""
+import argparse
+import json
+import math
+import os
+import struct
+import sys
+import threading
+import time
+from collections import deque
+
+import config
+from logger_setup import app_logger
+
+RECORD_STRUCT = struct.Struct("<dHfH")
+RECORD_SIZE = RECORD_STRUCT.size
+RECORD_FIELDS = ("timestamp", "channel", "value", "raw")
+CHANNEL_FIELDS = ("name", "unit", "board", "component_type", "instance_id", "text")
+MAX_CHANNELS = 0xFFFF # channel is a uint16
+
+# Header written by the exporter; the first two columns are the two halves of
+# logging's asctime ("YYYY-MM-DD HH:MM:SS,mmm") as they appear in the legacy CSV.
+CSV_HEADER = "timestamp,timestamp_ms,name,value,unit,board,component_type,instance_id"
+
+
+def channel_file_for(record_path):
+    return f"{record_path}.channels.json"
+
+
+class SensorRecorder:
+    """
+    Append-only binary sample log. log_sample()/record() may be called from any
+    thread; they only pack into memory. Call start() before use and close() on exit.
+    """
+
+    def __init__(self, path=None, buffer_records=None, flush_interval_s=None, parquet_dir=None, text_values=None):
+        self.path = path if path is not None else config.SENSOR_RECORD_FILE_NAME
+        self.parquet_dir = parquet_dir if parquet_dir is not None else config.SENSOR_RECORDER_PARQUET_DIR
+        self.channel_path = channel_file_for(self.path)
+        self.text_values = frozenset(text_values if text_values is not None else config.SERVO_STATES.values())
+        self.buffer_records = int(buffer_records if buffer_records is not None else config.SENSOR_RECORDER_BUFFER_RECORDS)
+        self.flush_interval_s = flush_interval_s if flush_interval_s is not None else config.SENSOR_RECORDER_FLUSH_INTERVAL_S
+        if self.buffer_records <= 0:
+            raise ValueError(f"Sensor recorder buffer must hold at least one record, got {self.buffer_records}.")
+
+        self._lock = threading.Lock()
+        self._flush_requested = threading.Condition(self._lock)
+        self._buffer = bytearray(self.buffer_records * RECORD_SIZE)
+        self._spare_buffers = [bytearray(self.buffer_records * RECORD_SIZE)]
+        self._n_records = 0
+        self._pending = deque() # (buffer, n_records) waiting for the writer thread
+        self._closing = False
+        self._thread = None
+        self._file = None
+        self._columnar = None # hspdaq.columnar.ColumnarWriter when parquet_dir is set
+
+        # Channel table. Appending to an existing recording keeps its channel ids.
+        self._channels = self._load_channels()
+        self._channel_ids = {tuple(ch[f] for f in CHANNEL_FIELDS): i for i, ch in enumerate(self._channels)}
+        self._channels_written = len(self._channels)
+
+        self._records_written = 0
+        self._records_dropped = 0
+        self._rejected_text_names = set() # Warned once per name
+
+    # ------------------------------------------------------------------ #
+    # Lifecycle
+    # ------------------------------------------------------------------ #
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._file = open(self.path, "ab")
+        if self._file.tell() % RECORD_SIZE:
+            # A previous run died mid-write; pad to the next record boundary so new records stay aligned.
+            pad = RECORD_SIZE - self._file.tell() % RECORD_SIZE
+            app_logger.warning(f"Sensor record file {self.path} ends with a partial record; padding {pad} bytes.")
+            self._file.write(bytes(pad))
+        if self.parquet_dir and self._columnar is None:
+            try:
+                self._columnar = _columnar_module().ColumnarWriter(self.parquet_dir, flush_rows=self.buffer_records)
+            except ImportError as e:
+                app_logger.error(f"Sensor recorder cannot write Parquet to {self.parquet_dir}: {e}. Binary file only.")
+        self._closing = False
+        self._thread = threading.Thread(target=self._run, name="SensorRecorder", daemon=True)
+        self._thread.start()
+        app_logger.info(f"Sensor recorder writing to {self.path} ({len(self._channels)} known channels).")
+
+    def flush(self):
+        """Hands the current buffer to the writer thread without waiting for it to hit disk."""
+        with self._lock:
+            self._swap_buffer_locked()
+            self._flush_requested.notify()
+
+    def close(self, timeout_s=5.0):
+        with self._lock:
+            self._swap_buffer_locked()
+            self._closing = True
+            self._flush_requested.notify()
+        if self._thread is not None:
+            self._thread.join(timeout_s)
+            if self._thread.is_alive():
+                # The writer still owns the file and the (not thread-safe) ColumnarWriter; closing
+                # them under it would corrupt the output. A later close() call can try again.
+                app_logger.warning(f"Sensor recorder did not finish writing within {timeout_s}s; leaving its files open.")
+                return
+            self._thread = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self._columnar is not None:
+            try:
+                self._columnar.close()
+            except Exception as e:
+                app_logger.error(f"Sensor recorder failed finishing Parquet dataset {self.parquet_dir}: {e}", exc_info=True)
+            self._columnar = None
+        app_logger.info(f"Sensor recorder closed. Stats: {self.stats()}")
+
+    # ------------------------------------------------------------------ #
+    # Producer side (decode worker / GUI thread)
+    # ------------------------------------------------------------------ #
+    def channel_id(self, name, unit, board, component_type, instance_id, text=None):
+        """Returns the channel id for this sample source, registering it on first use (None if the table is full)."""
+        key = (name, unit, board, component_type, instance_id, text)
+        channel = self._channel_ids.get(key)
+        if channel is not None:
+            return channel
+        with self._lock:
+            channel = self._channel_ids.get(key)
+            if channel is None:
+                if len(self._channels) >= MAX_CHANNELS:
+                    app_logger.error(f"Sensor recorder channel table full; dropping samples for {key}.")
+                    return None
+                channel = len(self._channels)
+                self._channels.append(dict(zip(CHANNEL_FIELDS, key)))
+                self._channel_ids[key] = channel
+            return channel
+
+    def record(self, channel, value, raw=0, timestamp=None):
+        """Appends one record. value is stored as float32; raw must fit in uint16."""
+        with self._lock:
+            RECORD_STRUCT.pack_into(self._buffer, self._n_records * RECORD_SIZE,
+                                    time.time() if timestamp is None else timestamp, channel, value, raw)
+            self._n_records += 1
+            if self._n_records >= self.buffer_records:
+                self._swap_buffer_locked()
+                self._flush_requested.notify()
+
+    def log_sample(self, name, value, unit, board, component_type, instance_id, timestamp=None, raw=0):
+        """
+        Records one decoded sample, with the same fields sensor_data_logger lines carry.
+        Text values from text_values (servo states) become their own channel with value NaN;
+        any other text is dropped, since each distinct string would need a channel.
+        """
+        if isinstance(value, str):
+            if value not in self.text_values:
+                self._records_dropped += 1
+                if name not in self._rejected_text_names:
+                    self._rejected_text_names.add(name)
+                    app_logger.error(f"Sensor recorder only records enumerated text values; dropping {name}={value!r}.")
+                return
+            channel = self.channel_id(name, unit, board, component_type, instance_id, value)
+            value = math.nan
+        else:
+            channel = self.channel_id(name, unit, board, component_type, instance_id)
+        if channel is None:
+            self._records_dropped += 1
+            return
+        try:
+            self.record(channel, value, raw, timestamp)
+        except (struct.error, OverflowError) as e: # e.g. |value| beyond float32 or raw outside uint16
+            self._records_dropped += 1
+            app_logger.error(f"Sensor recorder could not pack sample {name}={value!r} (raw={raw!r}): {e}")
+
+    def record_block(self, channel, timestamps, values, raw=None):
+        """
+        Appends len(values) records for one channel from NumPy-compatible arrays (e.g. a
+        LabJack stream block). Packs the whole block with one NumPy cast instead of one
+        pack_into per sample; float32 overflow becomes +-inf rather than an error.
+        """
+        import numpy as np
+        block = np.empty(len(values), dtype=record_dtype())
+        block["timestamp"] = timestamps
+        block["channel"] = channel
+        with np.errstate(over="ignore"):
+            block["value"] = values
+        block["raw"] = 0 if raw is None else raw
+        data = memoryview(block.tobytes())
+        n_block = len(block)
+        done = 0
+        with self._lock:
+            while done < n_block:
+                take = min(n_block - done, self.buffer_records - self._n_records)
+                start = self._n_records * RECORD_SIZE
+                self._buffer[start:start + take * RECORD_SIZE] = data[done * RECORD_SIZE:(done + take) * RECORD_SIZE]
+                self._n_records += take
+                done += take
+                if self._n_records >= self.buffer_records:
+                    self._swap_buffer_locked()
+                    self._flush_requested.notify()
+
+    def log_block(self, name, values, unit, board, component_type, instance_id, timestamps, raw=None):
+        """Block counterpart of log_sample() for numeric channels: one record per element of values/timestamps."""
+        channel = self.channel_id(name, unit, board, component_type, instance_id)
+        if channel is None:
+            self._records_dropped += len(values)
+            return
+        self.record_block(channel, timestamps, values, raw)
+
+    def _swap_buffer_locked(self):
+        if not self._n_records:
+            return
+        self._pending.append((self._buffer, self._n_records))
+        if self._spare_buffers:
+            self._buffer = self._spare_buffers.pop()
+        else:
+            # Writer is behind; grow rather than block the decode path.
+            self._buffer = bytearray(self.buffer_records * RECORD_SIZE)
+            app_logger.warning(f"Sensor recorder writer is behind ({len(self._pending)} buffers pending).")
+        self._n_records = 0
+
+    # ------------------------------------------------------------------ #
+    # Writer thread
+    # ------------------------------------------------------------------ #
+    def _run(self):
+        while True:
+            with self._lock:
+                if not self._pending and not self._closing:
+                    self._flush_requested.wait(self.flush_interval_s)
+                    if not self._pending:
+                        self._swap_buffer_locked() # Periodic flush of a partly filled buffer
+                pending = list(self._pending)
+                self._pending.clear()
+                channels = self._channels[self._channels_written:]
+                all_channels = list(self._channels) if channels else None
+                columnar_channels = list(self._channels) if self._columnar is not None and pending else None
+                closing = self._closing
+            try:
+                if all_channels is not None:
+                    # Metadata goes out before any record that references the new channels.
+                    self._write_channels(all_channels)
+                    self._channels_written = len(all_channels)
+                for buffer, n_records in pending:
+                    self._file.write(memoryview(buffer)[:n_records * RECORD_SIZE])
+                    self._records_written += n_records
+                if pending:
+                    self._file.flush()
+            except Exception as e:
+                app_logger.error(f"Sensor recorder failed writing to {self.path}: {e}", exc_info=True)
+                self._records_dropped += sum(n for _, n in pending)
+            if columnar_channels is not None:
+                try:
+                    for buffer, n_records in pending:
+                        write_columnar(self._columnar, _records_in(buffer, n_records), columnar_channels)
+                except Exception as e: # The binary file stays authoritative; keep recording
+                    app_logger.error(f"Sensor recorder failed writing Parquet to {self.parquet_dir}: {e}", exc_info=True)
+            with self._lock:
+                for buffer, _ in pending:
+                    if len(self._spare_buffers) < 2:
+                        self._spare_buffers.append(buffer)
+            if closing and not pending:
+                return
+
+    def _load_channels(self):
+        try:
+            with open(self.channel_path, "r") as f:
+                return load_channel_table(f)
+        except FileNotFoundError:
+            return []
+        except (ValueError, KeyError) as e:
+            app_logger.error(f"Could not read sensor channel table {self.channel_path}: {e}. Starting a new one.")
+            return []
+
+    def _write_channels(self, channels):
+        tmp_path = f"{self.channel_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"record_format": RECORD_STRUCT.format, "record_fields": RECORD_FIELDS,
+                       "channels": [dict(ch, id=i) for i, ch in enumerate(channels)]}, f, indent=1)
+        os.replace(tmp_path, self.channel_path)
+
+    # ------------------------------------------------------------------ #
+    # Counters
+    # ------------------------------------------------------------------ #
+    def stats(self):
+        return {
+            "channels": len(self._channels),
+            "records_written": self._records_written,
+            "records_buffered": self._n_records + sum(n for _, n in self._pending),
+            "records_dropped": self._records_dropped,
+        }
+
+
+def load_channel_table(fp):
+    """Reads a .channels.json sidecar into a list of channel dicts indexed by channel id."""
+    meta = json.load(fp)
+    if meta.get("record_format", RECORD_STRUCT.format) != RECORD_STRUCT.format:
+        raise ValueError(f"Unsupported record format {meta['record_format']!r}")
+    channels = sorted(meta["channels"], key=lambda ch: ch["id"])
+    if [ch["id"] for ch in channels] != list(range(len(channels))):
+        raise ValueError("Channel ids are not contiguous.")
+    return [{f: ch.get(f) for f in CHANNEL_FIELDS} for ch in channels]
+
+
+# --------------------------------------------------------------------------- #
+# Reading / CSV export
+# --------------------------------------------------------------------------- #
+def record_dtype():
+    """NumPy structured dtype with the same layout as RECORD_STRUCT."""
+    import numpy as np
+    dtype = np.dtype([("timestamp", "<f8"), ("channel", "<u2"), ("value", "<f4"), ("raw", "<u2")])
+    assert dtype.itemsize == RECORD_SIZE
+    return dtype
+
+
+def read_records(record_path, chunk_records=1_000_000):
+    """Yields the record file as NumPy structured arrays of up to chunk_records rows."""
+    import numpy as np
+    dtype = record_dtype()
+    n_records = os.path.getsize(record_path) // RECORD_SIZE # A trailing partial record is ignored
+    records = np.memmap(record_path, dtype=dtype, mode="r", shape=(n_records,)) if n_records else np.empty(0, dtype)
+    for start in range(0, n_records, chunk_records):
+        yield records[start:start + chunk_records]
+
+
+def _records_in(buffer, n_records):
+    import numpy as np
+    return np.frombuffer(buffer, dtype=record_dtype(), count=n_records)
+
+
+def _columnar_module():
+    """hspdaq.columnar lives in the sibling HSPDaq-App directory; only imported when Parquet is used."""
+    hspdaq_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "HSPDaq-App")
+    if hspdaq_dir not in sys.path:
+        sys.path.insert(0, hspdaq_dir)
+    from hspdaq import columnar
+    return columnar
+
+
+def write_columnar(writer, records, channels):
+    """
+    Adds a chunk of records to an hspdaq.columnar.ColumnarWriter with one write per channel.
+    Text-valued channels (value NaN, state in the channel table) have no numeric column and are skipped.
+    """
+    import numpy as np
+    if not len(records):
+        return
+    order = np.argsort(records["channel"], kind="stable") # Keeps time order within each channel
+    by_channel = records["channel"][order]
+    starts = np.flatnonzero(np.r_[True, by_channel[1:] != by_channel[:-1]])
+    for start, end in zip(starts, np.r_[starts[1:], len(order)]):
+        channel = int(by_channel[start])
+        if channel >= len(channels) or channels[channel]["text"] is not None:
+            continue
+        rows = records[order[start:end]]
+        writer.write(channels[channel]["name"], np.round(rows["timestamp"] * 1e9).astype(np.int64),
+                     rows["value"], channels[channel]["unit"])
+
+
+def export_parquet(record_path, out_dir, channel_path=None):
+    """Writes a binary recording as a channel-partitioned Parquet dataset. Returns the number of samples written."""
+    with open(channel_path or channel_file_for(record_path), "r") as f:
+        channels = load_channel_table(f)
+    writer = _columnar_module().ColumnarWriter(out_dir, flush_rows=4_000_000)
+    for chunk in read_records(record_path):
+        write_columnar(writer, chunk, channels)
+    writer.close()
+    return writer.rows_written
+
+
+def _format_value(value, text):
+    if text is not None:
+        return f'"{text}"'
+    return "NaN" if math.isnan(value) else f"{value:.2f}"
+
+
+def export_csv(record_path, csv_path, channel_path=None):
+    """
+    Writes the legacy sensor_data_log.csv layout (one line per sample, local time,
+    logging's asctime format) so sensor_plot.py and other CSV tools keep working.
+    Returns the number of rows written.
+    """
+    with open(channel_path or channel_file_for(record_path), "r") as f:
+        channels = load_channel_table(f)
+    # Everything after the value column is constant per channel, so format it once.
+    tails = [f"{ch['unit']},{ch['board']},{ch['component_type']},{ch['instance_id']}" for ch in channels]
+    names = [ch["name"] for ch in channels]
+    texts = [ch["text"] for ch in channels]
+    seconds_cache = {}
+    n_rows = 0
+    with open(csv_path, "w", newline="") as out:
+        out.write(CSV_HEADER + "\n")
+        for chunk in read_records(record_path):
+            lines = []
+            for ts, channel, value, _raw in zip(chunk["timestamp"].tolist(), chunk["channel"].tolist(),
+                                                 chunk["value"].tolist(), chunk["raw"].tolist()):
+                if channel >= len(channels):
+                    continue # Record written after the last metadata update that made it to disk
+                whole_s = int(ts)
+                date_str = seconds_cache.get(whole_s)
+                if date_str is None:
+                    if len(seconds_cache) > 100_000:
+                        seconds_cache.clear()
+                    date_str = seconds_cache[whole_s] = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(whole_s))
+                lines.append(f"{date_str},{int((ts - whole_s) * 1000):03d},{names[channel]},"
+                             f"{_format_value(value, texts[channel])},{tails[channel]}\n")
+            out.writelines(lines)
+            n_rows += len(lines)
+    return n_rows
+
+
+def _cli():
+    parser = argparse.ArgumentParser(description="Binary sensor recording tools.")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p_export = sub.add_parser("export", help="Convert a binary recording to the sensor_data_log.csv schema or Parquet")
+    p_export.add_argument("record_file", nargs="?", default=config.SENSOR_RECORD_FILE_NAME)
+    p_export.add_argument("-o", "--output", help="Output file/directory (default: <record_file without extension>"
+                                                   ".csv or .parquet, by --format)")
+    p_export.add_argument("--format", choices=("csv", "parquet"), default="csv")
+    p_export.add_argument("--channels", help="Channel sidecar (default: <record_file>.channels.json)")
+    p_export.add_argument("--force", action="store_true", help="Overwrite the output if it already exists")
+    args = parser.parse_args()
+
+    if args.cmd == "export":
+        output = args.output or f"{os.path.splitext(args.record_file)[0]}.{args.format}"
+        if os.path.exists(output) and not args.force:
+            # e.g. sensor_data_log.csv: the live CSV log, or everything logged before the binary recorder
+            parser.error(f"{output} already exists; pass --force to overwrite it or -o to pick another output")
+        if args.format == "parquet":
+            n_rows = export_parquet(args.record_file, output, args.channels)
+        else:
+            n_rows = export_csv(args.record_file, output, args.channels)
+        print(f"Wrote {n_rows} rows to {output}")
+
+
+if __name__ == "__main__":
+    _cli()
@@ -1234,6 +1234,7 @@ if __name__ == '__main__':
                     self._ui_update_timer.stop()
 
         def process_incoming_xbee_message(self, msg): pass # No action needed in mock
+        def process_incoming_xbee_batch(self, frames): pass
 
         @Slot()
         def simulate_periodic_updates(self):
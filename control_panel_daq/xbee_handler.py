@@ -1,4 +1,5 @@
 # xbee_handler.py
+import logging
 import sys
 import re
 import time
@@ -13,12 +14,14 @@ from digi.xbee.exception import TimeoutException, XBeeException, InvalidOperatin
 from PySide6.QtCore import QObject, Signal, QTimer
 import config  # Ensure this imports your updated config.py
 from logger_setup import app_logger, xbee_packet_logger
+from packet_archive import PacketArchive
 
 class XBeeManager(QObject):
     xbee_connected = Signal(str)
     xbee_disconnected = Signal(str)
     connection_error = Signal(str)
     message_received = Signal(dict)
+    frames_received = Signal(list) # Batched mode: list of (timestamp, can_payload, source_addr_64) tuples
     transmit_status_update = Signal(dict)
     log_message = Signal(str)
     radio_status_updated = Signal(dict) # Emits dict of a single radio's status
@@ -58,6 +61,34 @@ class XBeeManager(QObject):
         
         self._board_status_request_timer = QTimer(self)
         self._board_status_request_timer.timeout.connect(self.request_board_status_all_targets)
+
+        # Batched delivery: frames accumulate here (from the XBee reader thread) until the batch
+        # reaches XBEE_BATCH_MAX_FRAMES or is XBEE_BATCH_WINDOW_MS old. The reader thread checks
+        # both on every frame; when traffic stops, a small flush thread (not the GUI thread, since
+        # frames_received feeds the decode queue directly) delivers the last partial batch.
+        self.batch_delivery_enabled = config.XBEE_BATCH_DELIVERY_ENABLED
+        self._rx_batch = []
+        self._rx_batch_started = 0.0 # time.monotonic() of the oldest pending frame
+        self._rx_batch_lock = threading.Lock()
+        self._rx_emit_lock = threading.Lock() # Held across take + emit so batches go out in order
+        self._rx_batch_window_s = max(1, int(config.XBEE_BATCH_WINDOW_MS)) / 1000.0
+        self._rx_flush_thread = None
+        self._rx_flush_stop = threading.Event()
+
+        self.raw_packet_log_mode = config.XBEE_RAW_PACKET_LOG_MODE
+        if self.raw_packet_log_mode not in ("hex", "full", "off"):
+            app_logger.warning(f"Unknown XBEE_RAW_PACKET_LOG_MODE '{self.raw_packet_log_mode}'. Using 'hex'.")
+            self.raw_packet_log_mode = "hex"
+
+        # Every received API frame is archived (buffered here, written/compressed on background threads)
+        self.packet_archive = None
+        if config.XBEE_PACKET_ARCHIVE_ENABLED:
+            try:
+                self.packet_archive = PacketArchive()
+                self.packet_archive.start()
+            except Exception as e:
+                app_logger.error(f"Could not start XBee packet archive: {e}. Raw packets will not be archived.", exc_info=True)
+                self.packet_archive = None
         app_logger.info("XBeeManager initialized.")
 
     def _schedule_subsequent_board_status_request(self, original_command_description: str):
@@ -291,6 +322,11 @@ class XBeeManager(QObject):
                     if interval_ms <= 0 : interval_ms = 3000 
                     self._board_status_request_timer.start(interval_ms)
                     app_logger.info(f"Periodic board status request timer started (Interval: {interval_ms}ms).")
+                if self.batch_delivery_enabled and self._rx_flush_thread is None:
+                    self._rx_flush_stop.clear()
+                    self._rx_flush_thread = threading.Thread(target=self._flush_stale_batches, name="XBeeBatchFlush", daemon=True)
+                    self._rx_flush_thread.start()
+                    app_logger.info(f"Batched frame delivery enabled (window {config.XBEE_BATCH_WINDOW_MS}ms, max {config.XBEE_BATCH_MAX_FRAMES} frames).")
                 
                 QTimer.singleShot(1000, self.perform_radio_healthcheck_all_targets) 
                 QTimer.singleShot(1500, self.request_board_status_all_targets) 
@@ -316,6 +352,11 @@ class XBeeManager(QObject):
         if self._board_status_request_timer.isActive(): 
             self._board_status_request_timer.stop()
             app_logger.info("Periodic board status request timer stopped.")
+        if self._rx_flush_thread is not None:
+            self._rx_flush_stop.set()
+            self._rx_flush_thread.join(1.0)
+            self._rx_flush_thread = None
+        self.flush_received_frames() # Deliver anything received before the disconnect
         for addr, radio_info in self.target_radios_status.items():
             self._stop_dedicated_health_check_timer(addr) 
             radio_info['is_connection_lost'] = False
@@ -347,6 +388,11 @@ class XBeeManager(QObject):
         
         return port_that_was_disconnected
 
+    def close_packet_archive(self):
+        if self.packet_archive is not None:
+            self.packet_archive.close()
+            self.packet_archive = None
+
     def disconnect_device(self):
         with self._connection_lock:
             if not self._is_connected and not self.device: 
@@ -369,14 +415,25 @@ class XBeeManager(QObject):
             self.xbee_disconnected.emit(msg) 
 
     def _packet_received_callback(self, packet: XBeePacket):
-        try:
-            packet_type_name = type(packet).__name__
-            raw_frame_data_hex = "N/A"
-            if hasattr(packet, '_frame_data') and packet._frame_data is not None:
-                raw_frame_data_hex = packet._frame_data.hex()
-            xbee_packet_logger.info(f"Type={packet_type_name}, RawFrameData={raw_frame_data_hex}, PacketDetails={str(packet)}")
-        except Exception as log_e:
-            app_logger.error(f"Error during initial XBee packet logging: {log_e}", exc_info=True)
+        raw_frame = None
+        archive = self.packet_archive # Local copy: close_packet_archive may run on the GUI thread at shutdown
+        if archive is not None:
+            try:
+                raw_frame = packet.output() # Unescaped API frame; build_frame() turns it back into a packet
+                archive.append(raw_frame)
+            except Exception as arch_e:
+                app_logger.error(f"Error archiving XBee packet: {arch_e}")
+        if self.raw_packet_log_mode != "off" and xbee_packet_logger.isEnabledFor(logging.INFO):
+            try:
+                packet_type_name = type(packet).__name__
+                # digi-xbee packets have no _frame_data; output() gives the whole API frame.
+                raw_frame_data_hex = (raw_frame if raw_frame is not None else packet.output()).hex()
+                if self.raw_packet_log_mode == "full":
+                    xbee_packet_logger.info(f"Type={packet_type_name}, RawFrameData={raw_frame_data_hex}, PacketDetails={str(packet)}")
+                else: # "hex": str(packet) decodes every field and dominates the cost of this callback
+                    xbee_packet_logger.info(f"Type={packet_type_name}, RawFrameData={raw_frame_data_hex}")
+            except Exception as log_e:
+                app_logger.error(f"Error during initial XBee packet logging: {log_e}", exc_info=True)
         is_receive_packet = isinstance(packet, ReceivePacket)
         is_tx_status_packet = isinstance(packet, TransmitStatusPacket)
         is_modem_status_packet = isinstance(packet, ModemStatusPacket)
@@ -399,11 +456,11 @@ class XBeeManager(QObject):
                     can_payload = b'' 
                 
                 # app_logger.info(f"Message from {source_addr_64_str}: Payload len={len(can_payload)}, Hex: {can_payload.hex() if can_payload else 'N/A'}")
-                self.message_received.emit({'can_payload': can_payload, 'source_addr_64': source_addr_64_str})
+                self._deliver_received_frame(can_payload, source_addr_64_str)
             except Exception as e_rp:
                 app_logger.error(f"Error processing fields of ReceivePacket: {e_rp}", exc_info=True)
                 final_source_addr = source_addr_64_str if source_addr_64_str != "UNKNOWN_SOURCE_ADDR" else "ERROR_PARSING_ADDR"
-                self.message_received.emit({'can_payload': b'', 'source_addr_64': final_source_addr})
+                self._deliver_received_frame(b'', final_source_addr)
         elif is_tx_status_packet:
             actual_fid_from_packet = packet.frame_id 
             status_val_enum = packet.transmit_status
@@ -495,6 +552,39 @@ class XBeeManager(QObject):
         else:
             app_logger.debug(f"Received unhandled XBeePacket type: {type(packet).__name__}, Details: {str(packet)}")
 
+    def _deliver_received_frame(self, can_payload: bytes, source_addr_64_str: str):
+        if not self.batch_delivery_enabled:
+            # Stamped here, at receipt: the decode worker may dequeue it much later.
+            self.message_received.emit({'timestamp': time.time(), 'can_payload': can_payload, 'source_addr_64': source_addr_64_str})
+            return
+        now = time.monotonic()
+        with self._rx_batch_lock:
+            if not self._rx_batch:
+                self._rx_batch_started = now
+            self._rx_batch.append((time.time(), can_payload, source_addr_64_str))
+            due = (len(self._rx_batch) >= config.XBEE_BATCH_MAX_FRAMES
+                   or now - self._rx_batch_started >= self._rx_batch_window_s)
+        if due:
+            self.flush_received_frames()
+
+    def flush_received_frames(self):
+        """Emits all pending received frames as one frames_received batch. Safe to call from any thread."""
+        with self._rx_emit_lock:
+            with self._rx_batch_lock:
+                if not self._rx_batch:
+                    return
+                batch, self._rx_batch = self._rx_batch, []
+            self.frames_received.emit(batch)
+
+    def _flush_stale_batches(self):
+        """Flush thread: delivers a partial batch once it is a window old and no new frame has flushed it."""
+        window_s = self._rx_batch_window_s
+        while not self._rx_flush_stop.wait(window_s):
+            with self._rx_batch_lock:
+                stale = self._rx_batch and time.monotonic() - self._rx_batch_started >= window_s
+            if stale:
+                self.flush_received_frames()
+
     def _calculate_tracking_fid(self, fid_from_get_next_frame_id: int) -> int:
         if fid_from_get_next_frame_id == 0xFF:
             return 1
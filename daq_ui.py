@@ -1,9 +1,16 @@
+import os
 import random
+import sys
 import time
 import threading
 import dearpygui.dearpygui as dpg
 from threading import Lock
 
+# Shared NumPy ring buffers live in the HSPDaq-App package next to this script
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "HSPDaq-App"))
+from hspdaq.decimate import decimate
+from hspdaq.timeseries import TimeSeriesStore
+
 #Open first availbe labjack in Demo mode
 #handle = ljm.openS(“ANY”, “ANY”, “-2”) 
 
@@ -20,8 +27,9 @@ except ImportError:
 running = True
 fake_data_mode = True  # Start with fake data if no LabJack is detected
 labjack_device = None
-data_buffer = {"pressure": [], "temperature": [], "thrust": []}
+data_buffer = TimeSeriesStore(["pressure", "temperature", "thrust"], capacity=100)  # last 100 points per channel
 data_lock = Lock()
+PLOT_WIDTH_PX = 300  # each dashboard plot; series are decimated to this many pixel columns
 
 # Function to initialize LabJack
 def initialize_labjack():
@@ -58,14 +66,8 @@ def fetch_data():
             thrust = random.uniform(110, 120)
 
         with data_lock:
-            # Update data buffers
-            data_buffer["pressure"].append(pressure)
-            data_buffer["temperature"].append(temperature)
-            data_buffer["thrust"].append(thrust)
-
-            # Keep only the last 100 data points
-            for key in data_buffer:
-                data_buffer[key] = data_buffer[key][-100:]
+            # Update data buffers (the ring keeps only the last 100 points)
+            data_buffer.append(time.time(), {"pressure": pressure, "temperature": temperature, "thrust": thrust})
 
         time.sleep(0.1)  # Simulate real-time data update
 
@@ -73,20 +75,20 @@ def fetch_data():
 def update_dashboard():
     global data_buffer
     with data_lock:
+        data_types = list(data_buffer.channels)
         x_data = list(range(len(data_buffer["pressure"])))
         for i in range(9):
             # Cycle through the available data types for the plots
-            data_type = list(data_buffer.keys())[i % len(data_buffer)]
-            y_data = data_buffer[data_type]
-            dpg.set_value(f"plot_series_{i}", [x_data, y_data])
+            ring = data_buffer[data_types[i % len(data_types)]]
+            _, y_view = ring.window()
+            x_plot, y_plot = decimate(x_data, y_view, PLOT_WIDTH_PX)
+            dpg.set_value(f"plot_series_{i}", [x_plot.tolist(), y_plot.tolist()])
             # Update the x-axis limits to create a sliding window effect
             if len(x_data) > 1:
                 dpg.set_axis_limits(f"x_axis_{i}", x_data[0], x_data[-1])
             # Dynamically adjust the y-axis to fit the data
-            if len(y_data) > 0:
-                y_min = min(y_data)
-                y_max = max(y_data)
-                dpg.set_axis_limits(f"y_axis_{i}", y_min, y_max)
+            if len(ring) > 0:
+                dpg.set_axis_limits(f"y_axis_{i}", ring.min(), ring.max())
 
 # Function to handle fake data toggle
 def toggle_fake_data():
@@ -127,7 +129,7 @@ def setup_ui():
                     with dpg.group(horizontal=True):
                         for row in range(3):
                             plot_index = col * 3 + row
-                            with dpg.plot(label=f"Graph {plot_index + 1}", height=200, width=300):
+                            with dpg.plot(label=f"Graph {plot_index + 1}", height=200, width=PLOT_WIDTH_PX):
                                 x_axis = dpg.add_plot_axis(dpg.mvXAxis, label="Time", tag=f"x_axis_{plot_index}")
                                 y_axis = dpg.add_plot_axis(dpg.mvYAxis, label="Value", tag=f"y_axis_{plot_index}")
                                 dpg.add_line_series([], [], label="Data", parent=y_axis, tag=f"plot_series_{plot_index}")
@@ -1,29 +1,14 @@
 import csv
+import os
+import sys
 import time
 from datetime import datetime
 from labjack import ljm
 import numpy as np
 
-# --- NIST Type J Table ---
-temp_table = np.array([
-    -200, -190, -180, -170, -160, -150, -140, -130, -120, -110,
-    -100,  -90,  -80,  -70,  -60,  -50,  -40,  -30,  -20,  -10,
-       0,   10,   20,   30,   40,   50,   60,   70,   80,   90,
-     100,  110,  120,  130,  140,  150,  160,  170,  180,  190,
-     200
-])
-
-mv_table = np.array([
-    -8.095, -7.890, -7.659, -7.403, -7.123, -6.821, -6.500, -6.159, -5.801, -5.426,
-    -5.037, -4.633, -4.215, -3.786, -3.344, -2.893, -2.431, -1.961, -1.482, -0.995,
-    -0.501,  0.000,  0.507,  1.019,  1.537,  2.059,  2.585,  3.116,  3.650,  4.187,
-     4.726,  5.269,  5.814,  6.360,  6.909,  7.459,  8.010,  8.562,  9.115,  9.669,
-    10.224
-])
-
-def type_j_temp_from_mv(voltage_mv):
-    """Convert a measured thermocouple voltage (mV) to temperature (°C)."""
-    return np.interp(voltage_mv, mv_table, temp_table)
+# --- Thermocouple conversion (NIST ITS-90 Type J, shared with HSPDaq-App) ---
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "HSPDaq-App"))
+from hspdaq.thermocouple import thermocouple_voltage_to_temperature
 
 # --- Configuration ---
 AIN_CHANNELS = ["AIN0", "AIN1", "AIN2", "AIN3", "AIN120", "AIN122"]  # Single-ended inputs
@@ -82,8 +67,9 @@ def main():
                 total_scaled_weight = sum(scaled_diffs)
 
                 # Read Thermocouple Differential Voltages
+                cj_temp_c = ljm.eReadName(handle, "TEMPERATURE_DEVICE_K") - 273.15  # cold junction: the LabJack's own temperature
                 tc_voltages = [ljm.eReadName(handle, pair[0]) for pair in TC_PAIRS]
-                tc_temps = [type_j_temp_from_mv(v * 1000.0)*(9/2) +32 for v in tc_voltages]  # Convert V to mV and to °F
+                tc_temps = thermocouple_voltage_to_temperature(np.array(tc_voltages), cj_temp_c, "J").tolist()  # V -> °F
 
                 # Print Data
                 print(f"{timestamp} | AIN Scaled: {', '.join(f'{v:.2f}' for v in scaled_ain_values)} "
@@ -1,9 +1,8 @@
 import PySimpleGUI as sg
 import numpy as np
-import pandas as pd
-from sklearn.ensemble import RandomForestRegressor
-from sklearn.model_selection import train_test_split
 import os 
+import sys
+from pathlib import Path
 import time as timer
 import random
 import string
@@ -16,63 +15,16 @@ from labjack import ljm
 import numpy as np
 
 
-# 1. Load your historical dataset.
-# Assume your CSV has columns: time, supply_pressure, supply_temperature, run_pressure, run_temperature, current_mass, and full_fill_time.
-# full_fill_time is the time (in seconds) from the measurement to when the run tank reaches the target mass.
+# ETA model: fitted offline (python -m hspdaq.model train) and saved next to
+# trainingData.csv. It loads on a background thread so the window opens at once;
+# it is only refitted when trainingData.csv changes.
 script_dir = os.path.dirname(os.path.abspath(__file__))
 file_path = os.path.join(script_dir, 'trainingData.csv')
-data = pd.read_csv(file_path)
-# 2. Define features and target.
-# Here, our features are the current sensor readings.
-features = data[['supply_pressure', 'supply_temperature', 'run_pressure', 'run_temperature', 'current_mass']]
-target = data['full_fill_time']
-
-columns = ['supply_pressure', 'supply_temperature', 'run_pressure', 'run_temperature', 'current_mass']
-
-# 3. Split data into training and testing sets.
-X_train, X_test, y_train, y_test = train_test_split(features, target, test_size=0.2, random_state=42)
-
-# 4. Create and train the regression model.
-model = RandomForestRegressor(n_estimators=100, random_state=42)
-model.fit(X_train, y_train)
-
-# --- NIST Type J Table ---
-temp_table = np.array([
-	-200, -190, -180, -170, -160, -150, -140, -130, -120, -110,
-	-100,  -90,  -80,  -70,  -60,  -50,  -40,  -30,  -20,  -10,
-	   0,   10,   20,   30,   40,   50,   60,   70,   80,   90,
-	 100,  110,  120,  130,  140,  150,  160,  170,  180,  190,
-	 200
-])
-
-mv_table = np.array([
-	-8.095, -7.890, -7.659, -7.403, -7.123, -6.821, -6.500, -6.159, -5.801, -5.426,
-	-5.037, -4.633, -4.215, -3.786, -3.344, -2.893, -2.431, -1.961, -1.482, -0.995,
-	-0.501,  0.000,  0.507,  1.019,  1.537,  2.059,  2.585,  3.116,  3.650,  4.187,
-	 4.726,  5.269,  5.814,  6.360,  6.909,  7.459,  8.010,  8.562,  9.115,  9.669,
-	10.224
-])
-
-def type_j_temp_from_mv(voltage_mv):
-	"""Convert a measured thermocouple voltage (mV) to temperature (°C)."""
-	return np.interp(voltage_mv, mv_table, temp_table)
-def thermocouple_voltage_to_temperature(thermo_voltage, cj_temp_c):
-	"""
-	Convert thermocouple voltage (in volts) to temperature in °F.
-	
-	This uses a simple linear approximation:
-	  - K-type thermocouple sensitivity is approximately 41 µV/°C.
-	  - dT (°C) = thermo_voltage (V) / 0.000041
-	  - Thermocouple temperature (°C) = Cold Junction Temperature (°C) + dT
-	  - Then convert °C to °F.
-	
-	Note: This linear approximation is valid only over a narrow temperature range.
-	"""
-	# Calculate the temperature difference from the thermocouple voltage
-	dT_c = thermo_voltage / 0.000041  # in °C
-	tc_temp_c = cj_temp_c + dT_c        # thermocouple temperature in °C
-	tc_temp_f = (tc_temp_c * 9/5) + 32    # convert °C to °F
-	return tc_temp_f
+sys.path.insert(0, os.path.join(script_dir, os.pardir, 'HSPDaq-App'))
+from hspdaq.eta import DISPLAY_METHODS, EtaEngine, FillSample, ForestEstimator, QuadraticFitEstimator, ReferenceCurveEstimator
+from hspdaq.model import ModelHandle
+from hspdaq.thermocouple import thermocouple_voltage_to_temperature  # NIST ITS-90, Type K by default
+etaModel = ModelHandle(Path(script_dir) / 'eta_model.joblib', Path(file_path)).start()
 
 # --- Configuration ---
 # ETH1 ETH2 NO1 NO2 NO3 CHO1
@@ -396,16 +348,18 @@ offsetY = 14
 FILE_PATH = 'trimmedblowup.csv'
 
 def main():
-	mass = []
-	massTime1 = []
-	timestart = True
 	lastDataPoint = 0
 	firstTare = True
-	massTime1 = []
 	smallX = 0
 	coefficientstwo = np.array([1.72501276, -24.80675432, 95.42369204])
-	methodtwo = list(range(0, 200, 1))
-	methodtwoList = (np.polyval(coefficientstwo, np.array(list(range(0, 200, 1))))).tolist()
+	fillStart = 0.0
+	# ETA estimators shown as Method1..4 (see hspdaq/eta.py); each update is O(1)
+	etaEngine = EtaEngine({
+		'live_fit': QuadraticFitEstimator(),  # quadratic time-vs-mass fit over this fill
+		'forest': ForestEstimator(etaModel),  # random forest on the current readings
+		'seeded_fit': QuadraticFitEstimator(reference=coefficientstwo),  # same fit, seeded with the reference curve
+		'reference': ReferenceCurveEstimator(coefficientstwo),  # reference curve alone
+	})
 
 	global x
 	line = ""
@@ -441,7 +395,7 @@ def main():
 				cj_temp_c = cj_temp_k -273.15
 				tc_voltages = [ljm.eReadName(handle, pair[0]) for pair in TC_PAIRS]
 				print(tc_voltages[0]*1)
-				tc_temps = [ (thermocouple_voltage_to_temperature(v, cj_temp_c)) for v in tc_voltages]  # Convert V to mV and to °F
+				tc_temps = thermocouple_voltage_to_temperature(np.array(tc_voltages), cj_temp_c).tolist()  # V -> °F, cold-junction compensated
 
 				# Print Data
 				print(f"{timestamp}, {', '.join(f'{v:.2f}' for v in scaled_ain_values)} "
@@ -478,61 +432,20 @@ def main():
 				x+=1
 
 				if float(lineValues[4]) > 400.00:
+					clockNow = int(runTime[0]) * 3600 + int(runTime[1]) * 60 + int(runTime[2]) + int(runTime[3]) * 0.001
 					if firstTare:
 						loadTare = abs(float(lineValues[7]))
-						firstTare = False	
-					
-
-					live_data = {
-						'supply_pressure': [lineValues[3]],
-						'supply_temperature': [lineValues[8]],
-						'run_pressure': [lineValues[4]],
-						'run_temperature': [lineValues[9]],
-						'current_mass': [abs(float(lineValues[7])) - loadTare]
-					}
-
-					live_features = pd.DataFrame(live_data, columns=columns)
-					predicted_remaining_time = model.predict(live_features)
-					print("Predicted remaining time (seconds):", predicted_remaining_time[0])
-					window['Method2'].update(round(predicted_remaining_time[0], 2))
-
-					if (abs(float(lineValues[7])) - loadTare) >= 5:
-					
-						if timestart:
-							hourTare = int(runTime[0])
-							minTare = int(runTime[1])
-							secTare = int(runTime[2])
-							nanSecTare = int(runTime[3])
-							timestart = False
-						
-						timeNow = (hourTare - int(runTime[0])) * 3600 + (minTare - int(runTime[1])) * 60 + (secTare - int(runTime[2])) + (nanSecTare - int(runTime[3])) * 0.001
-
-						mass.append(abs(float(lineValues[7])) - loadTare)
-						methodtwo.append(mass[-1])
-						massTime1.append(abs(timeNow))
-						methodtwoList.append(massTime1[-1])
-						
-						massSamples = np.array(mass, dtype='float32')
-						massTime = np.array(massTime1, dtype='float32')
-						methodtwoArray = np.array(methodtwo, dtype='float32')
-						methodtwoListArray = np.array(methodtwoList, dtype='float32')
-						
-						# Remove NaN and infinite values
-						valid_indices = ~(np.isnan(methodtwoArray) | np.isnan(methodtwoListArray) | np.isinf(methodtwoArray) | np.isinf(methodtwoListArray))
-						methodtwoArray = methodtwoArray[valid_indices]
-						methodtwoListArray = methodtwoListArray[valid_indices]
-
-						# Remove NaN and infinite values
-						valid_indices = ~(np.isnan(massSamples) | np.isnan(massTime) | np.isinf(massSamples) | np.isinf(massTime))
-						massSamples = massSamples[valid_indices]
-						massTime = massTime[valid_indices]
-
-						if len(massSamples) >= 3 and len(np.unique(massTime)) > 1:
-							coefficients = np.polyfit(massSamples, massTime, 2)
-							newCoefficients = np.polyfit(methodtwoArray, methodtwoListArray, 2)
-							window['Method1'].update(str(round(np.polyval(coefficients, 17) - massTime1[-1])))
-							window['Method3'].update(str(round(np.polyval(newCoefficients, 17) - massTime[-1])))
-							window['Method4'].update(str(round(np.polyval(coefficientstwo, 17) - massTime[-1])))
+						fillStart = clockNow
+						firstTare = False
+
+					# seconds since fill start, supply_pressure, supply_temperature, run_pressure, run_temperature, tared mass
+					etaEngine.update(FillSample(clockNow - fillStart, float(lineValues[3]), float(lineValues[8]), float(lineValues[4]), float(lineValues[9]), abs(float(lineValues[7])) - loadTare))
+					etas = etaEngine.predictions()
+					if etas['forest'] is not None:
+						print("Predicted remaining time (seconds):", etas['forest'])
+					for key, name in DISPLAY_METHODS.items():
+						if etas[name] is not None:
+							window[key].update(str(round(etas[name], 2) if name == 'forest' else round(etas[name])))
 						
 				Place_Button('PID_PTN01', 715 + offsetX, 596 + offsetY) # (7,7)
 				Place_Button('PID_PTN02', 411 + offsetX, 387 + offsetY) # (7,7)